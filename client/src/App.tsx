@@ -1,6 +1,6 @@
 import React, { useState } from 'react'
 import './index.css'
-import { tailorResume, previewResume } from './api'
+import { tailorResume, renderModel, previewResumeStream, PreviewEvent } from './api'
 
 export default function App() {
     const [jd, setJd] = useState<File | null>(null)
@@ -9,14 +9,29 @@ export default function App() {
     const [baseUrl, setBaseUrl] = useState('http://localhost:8000')
     const [status, setStatus] = useState('')
     const [preview, setPreview] = useState<any | null>(null)
+    // token-by-token text of rewrites still in flight, keyed "experience:0" / "summary"
+    const [drafts, setDrafts] = useState<Record<string, string>>({})
+    // last result's id: re-running after an edit only re-tailors the entries that changed
+    const [modelId, setModelId] = useState<string | null>(null)
+    // the files the current preview was made from: downloading it again only needs a render
+    const [previewed, setPreviewed] = useState<{ jd: File; resume: File } | null>(null)
 
     const onSubmit = async (e: React.FormEvent) => {
         e.preventDefault()
         if (!jd || !resume) { alert('Please attach both files.'); return; }
         try {
             setBusy(true)
-            setStatus('Uploading and tailoring…')
-            const blob = await tailorResume(baseUrl, jd, resume)
+            let blob: Blob | null = null
+            if (modelId && previewed && previewed.jd === jd && previewed.resume === resume) {
+                setStatus('Rendering PDF…')
+                blob = await renderModel(baseUrl, modelId).catch(() => null)   // expired: tailor again below
+            }
+            if (!blob) {
+                setStatus('Uploading and tailoring…')
+                const out = await tailorResume(baseUrl, jd, resume, modelId)
+                blob = out.blob
+                if (out.modelId) setModelId(out.modelId)
+            }
             const url = URL.createObjectURL(blob)
             const a = document.createElement('a')
             a.href = url
@@ -36,9 +51,42 @@ export default function App() {
         try {
             setBusy(true)
             setStatus('Generating preview…')
-            const data = await previewResume(baseUrl, jd, resume)
-            setPreview(data)
-            setStatus('Preview ready below.')
+            setPreview(null)
+            setPreviewed(null)
+            setDrafts({})
+            let total = 0, ready = 0
+            const onEvent = ({ event, data }: PreviewEvent) => {
+                if (event === 'skeleton') {
+                    total = data.total
+                    setPreview({ ...data, summary: [] })
+                    setStatus(`Tailoring ${total} entries…`)
+                } else if (event === 'token') {
+                    setDrafts(d => ({ ...d, [data.target]: (data.restart ? '' : d[data.target] || '') + data.text }))
+                } else if (event === 'entry') {
+                    const field = data.section === 'experience' ? 'experience_entries' : 'project_entries'
+                    setPreview((p: any) => {
+                        const entries = [...p[field]]
+                        entries[data.index] = data.entry
+                        return { ...p, [field]: entries }
+                    })
+                    setDrafts(d => { const { [`${data.section}:${data.index}`]: _, ...rest } = d; return rest })
+                    ready += 1
+                    setStatus(`Tailoring… ${ready}/${total} entries ready`)
+                } else if (event === 'summary') {
+                    setPreview((p: any) => ({ ...p, summary: data.summary }))
+                    setDrafts(d => { const { summary: _, ...rest } = d; return rest })
+                } else if (event === 'done') {
+                    setPreview(data)
+                    setDrafts({})
+                }
+            }
+            const model = await previewResumeStream(baseUrl, jd, resume, onEvent, true, modelId)
+            setModelId(model?.model_id || null)
+            setPreviewed({ jd, resume })
+            const inc = model?.meta?.incremental
+            setStatus(inc?.base_found && !inc.jd_changed
+                ? `Preview ready below (${inc.recomputed.length} changed entries re-tailored, ${inc.reused} reused).`
+                : 'Preview ready below.')
         } catch (err: any) {
             setStatus(err?.message || 'Preview failed.')
         } finally {
@@ -87,6 +135,7 @@ export default function App() {
 
                     <h3>Summary</h3>
                     <ul>{(preview.summary || []).map((s: string, i: number) => <li key={i}>{s}</li>)}</ul>
+                    {drafts.summary && <p className="draft">{drafts.summary}</p>}
 
                     <h3>Skills</h3>
                     <p>{(preview.skills || []).join(', ')}</p>
@@ -99,6 +148,7 @@ export default function App() {
                                 <span>{e.dates}</span>
                             </div>
                             <ul>{(e.bullets || []).map((b: string, j: number) => <li key={j}>{b}</li>)}</ul>
+                            {drafts[`experience:${i}`] && <pre className="draft">{drafts[`experience:${i}`]}</pre>}
                         </div>
                     ))}
 
@@ -110,6 +160,7 @@ export default function App() {
                                 <span>{p.dates}</span>
                             </div>
                             <ul>{(p.bullets || []).map((b: string, j: number) => <li key={j}>{b}</li>)}</ul>
+                            {drafts[`projects:${i}`] && <pre className="draft">{drafts[`projects:${i}`]}</pre>}
                         </div>
                     ))}
 
@@ -1,9 +1,28 @@
-export async function tailorResume(baseUrl: string, jd: File, resume: File): Promise<Blob> {
+// baseModelId: model_id of an earlier result for this resume; unchanged entries are reused
+function query(params: Record<string, string | boolean | null | undefined>): string {
+    const q = new URLSearchParams();
+    for (const [k, v] of Object.entries(params)) if (v) q.set(k, String(v));
+    const s = q.toString();
+    return s ? `?${s}` : '';
+}
+
+export async function tailorResume(
+    baseUrl: string, jd: File, resume: File, baseModelId?: string | null,
+): Promise<{ blob: Blob; modelId: string | null }> {
     const form = new FormData();
     form.append('jd', jd);
     form.append('resume', resume);
 
-    const res = await fetch(`${baseUrl}/api/tailor`, { method: 'POST', body: form });
+    const res = await fetch(`${baseUrl}/api/tailor${query({ base_model_id: baseModelId })}`, { method: 'POST', body: form });
+    if (!res.ok) throw new Error(`Server error: ${res.status}`);
+    return { blob: await res.blob(), modelId: res.headers.get('X-Model-Id') };
+}
+
+// PDF of a stored model (e.g. right after a preview): no LLM calls, just rendering
+export async function renderModel(baseUrl: string, modelId: string, edits?: Record<string, any>): Promise<Blob> {
+    const res = await fetch(`${baseUrl}/api/models/${encodeURIComponent(modelId)}/pdf`, edits
+        ? { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(edits) }
+        : { method: 'GET' });
     if (!res.ok) throw new Error(`Server error: ${res.status}`);
     return await res.blob();
 }
@@ -18,3 +37,43 @@ export async function previewResume(baseUrl: string, jd: File, resume: File) {
     return res.json();
 }
 
+
+export type PreviewEvent = { event: string; data: any };
+
+// POST /api/preview/stream: Server-Sent Events over fetch (EventSource cannot POST files)
+export async function previewResumeStream(
+    baseUrl: string, jd: File, resume: File, onEvent: (ev: PreviewEvent) => void, tokens = false,
+    baseModelId?: string | null,
+) {
+    const formData = new FormData();
+    formData.append("jd", jd);
+    formData.append("resume", resume);
+
+    const url = `${baseUrl}/api/preview/stream${query({ tokens, base_model_id: baseModelId })}`;
+    const res = await fetch(url, { method: "POST", body: formData });
+    if (!res.ok || !res.body) throw new Error("Preview request failed");
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buf = "";
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buf += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buf.indexOf("\n\n")) >= 0) {
+            const block = buf.slice(0, sep);
+            buf = buf.slice(sep + 2);
+            let event = "message", data = "";
+            for (const line of block.split("\n")) {
+                if (line.startsWith("event: ")) event = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+            }
+            const parsed = data ? JSON.parse(data) : null;
+            if (event === "error") throw new Error(parsed?.detail || "Preview failed");
+            onEvent({ event, data: parsed });
+            if (event === "done") return parsed;
+        }
+    }
+    throw new Error("Preview stream ended early");
+}
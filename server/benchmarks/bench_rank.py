@@ -0,0 +1,75 @@
+"""
+Resume ranking: one sparse matrix-vector product over the corpus index vs
+scoring each resume's text with matcher.coverage() in a loop.
+
+    python benchmarks/bench_rank.py [n_resumes]
+
+Builds a synthetic corpus (Zipf-distributed words plus a few skills per resume)
+in a temporary RANK_DB, then prints index build time, incremental add time, and
+per-query latency of both scorers and how many of their top-10 scores agree.
+They can differ slightly: the index counts bigrams across a stopword the way
+JD term extraction does (count_terms), coverage() only matches adjacent words.
+"""
+import os, sys, time, random, tempfile, statistics
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from matcher import coverage
+from ranking import CorpusIndex, jd_query
+
+SKILLS = ["python", "java", "go", "kubernetes", "docker", "aws", "gcp", "terraform", "react", "typescript",
+          "sql", "postgresql", "kafka", "spark", "pytorch", "machine learning", "ci/cd", "code review"]
+WORDS = [f"word{i}" for i in range(5000)]
+WEIGHTS = [1 / (i + 1) for i in range(len(WORDS))]   # Zipf: a few common words, a long tail
+
+JD = """Senior backend engineer. Python and Go services on Kubernetes (AWS, Terraform), Kafka and
+PostgreSQL. Machine learning platform experience with PyTorch is a plus. Strong code review,
+documentation, distributed systems and design patterns; secure, scalable and reliable infrastructure."""
+
+def resume(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, WEIGHTS, k=400) + rng.sample(SKILLS, rng.randint(2, 8)))
+
+def loop_rank(texts, query, k):
+    # the per-resume path: weighted coverage of the JD terms in each text
+    terms, total = list(query), sum(query.values())
+    scores = []
+    for doc_id, text in texts:
+        matched = set(coverage(text, terms).matched)
+        scores.append((sum(query[t] for t in matched) / total, doc_id))
+    return [round(s, 4) for s, _ in sorted(scores, key=lambda s: (-s[0], s[1]))[:k]]
+
+def timed(fn, rounds: int):
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, out
+
+def main(n: int):
+    rng = random.Random(7)
+    docs = [(f"r{i:06d}", f"r{i:06d}", f"sha{i}", resume(rng)) for i in range(n)]
+    index = CorpusIndex(os.path.join(tempfile.mkdtemp(), "rank.sqlite3"))
+
+    t0 = time.perf_counter()
+    index.add(docs)
+    build = time.perf_counter() - t0
+    extra = [(f"x{i}", f"x{i}", f"shx{i}", resume(rng)) for i in range(10)]
+    t0 = time.perf_counter()
+    index.add(extra)
+    incremental = (time.perf_counter() - t0) * 1000
+    stats = index.stats()
+    print(f"{stats['documents']} resumes, {stats['vocabulary']} terms, {stats['nonzeros']} nonzeros")
+    print(f"index build: {build:.2f} s ({build / n * 1000:.2f} ms/resume); +10 resumes: {incremental:.1f} ms")
+
+    texts = [(d, text) for d, _, _, text in docs + extra]
+    query = jd_query(JD)
+    vec_ms, (ranked, _) = timed(lambda: index.rank(JD, 10), 20)
+    loop_ms, looped = timed(lambda: loop_rank(texts, query, 10), 3)
+    agree = sum((Counter(r.score for r in ranked) & Counter(looped)).values())
+    print(f"{'scorer':<12}{'ms/query':>10}")
+    print(f"{'vectorized':<12}{vec_ms:>10.1f}")
+    print(f"{'loop':<12}{loop_ms:>10.1f}   speedup {loop_ms / vec_ms:.0f}x, top-10 scores agreeing: {agree}/{len(looped)}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
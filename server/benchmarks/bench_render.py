@@ -0,0 +1,76 @@
+"""
+PDF rendering: in-memory render_pdf with cached styles vs the old path
+(fresh stylesheet per call, render into a NamedTemporaryFile, read it back).
+
+    python benchmarks/bench_render.py [rounds]
+
+Prints median per-resume render time and tracemalloc peak for each path.
+"""
+import os, sys, time, statistics, tracemalloc
+from tempfile import NamedTemporaryFile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pdf_builder
+from pdf_builder import render_pdf, build_pdf
+
+MODEL = {
+    "name": "Jane Doe",
+    "contact": "jane@example.com | (555) 555-5555 | Austin, TX",
+    "summary": ["Highly motivated CS candidate with hands-on Python, AWS and distributed systems experience; "
+                "collaborates across QA and security teams to ship scalable, reliable services."],
+    "skills": ["Python", "Java", "Docker", "Kubernetes", "AWS"],
+    "skills_grouped": {
+        "Languages": ["Python", "Java", "TypeScript", "SQL"],
+        "Frameworks & Libraries": ["FastAPI", "React", "pandas"],
+        "Data & Cloud": ["AWS", "Docker", "Kubernetes", "PostgreSQL"],
+        "DevOps": ["Git", "GitHub Actions", "Terraform"],
+    },
+    "experience_entries": [
+        {"header": f"Software Engineer — Company {i}", "dates": "Jun 2021 – Present",
+         "bullets": [f"Designed and shipped a scalable Python service #{j} handling 2M requests/day with 99.9% uptime"
+                     for j in range(5)]}
+        for i in range(4)
+    ],
+    "project_entries": [
+        {"header": f"Project {i} — FastAPI, React", "dates": "2023",
+         "bullets": [f"Built feature {j} applying design patterns to keep the codebase testable" for j in range(3)]}
+        for i in range(3)
+    ],
+    "education": ["State University, B.S. Computer Science — 2022"],
+}
+
+def old_render(model: dict) -> bytes:
+    pdf_builder._STYLES = None  # the old code rebuilt every style on every call
+    tmp = NamedTemporaryFile(delete=False, suffix=".pdf")
+    tmp.close()
+    build_pdf(model, tmp.name)
+    with open(tmp.name, "rb") as f:
+        data = f.read()
+    os.unlink(tmp.name)  # the old handler leaked this file; removed here to keep the bench clean
+    return data
+
+def measure(fn, rounds: int):
+    fn(MODEL)  # warm-up (font loading etc.)
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(MODEL)
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(MODEL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times) * 1000, peak / 1024
+
+def main(rounds: int):
+    print(f"{'path':<28}{'median ms':>12}{'peak KiB':>12}")
+    results = {}
+    for name, fn in (("before: temp file + styles", old_render), ("after: in-memory, cached", render_pdf)):
+        ms, kib = measure(fn, rounds)
+        results[name] = ms
+        print(f"{name:<28}{ms:>12.2f}{kib:>12.0f}")
+    before, after = results.values()
+    print(f"\nspeedup: {before / after:.2f}x   pdf size: {len(render_pdf(MODEL)) / 1024:.1f} KiB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,104 @@
+"""
+Cold start: import time per module for `import main`, and how long a fresh
+uvicorn process takes to answer /healthz and to report ready on /readyz.
+
+    python benchmarks/bench_startup.py [rounds]
+
+Every round runs in a new interpreter (python -X importtime). Prints the median
+cumulative import time of each module main imports directly, then whether the
+heavy libraries were loaded at import (they should only appear after warm-up).
+"""
+import os, sys, time, json, socket, statistics, subprocess, urllib.request, urllib.error
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("openai", "httpx", "reportlab", "docx", "fitz", "pdfminer", "PyPDF2", "textract", "sklearn")
+
+def import_profile() -> Tuple[float, Dict[str, float], List[str]]:
+    """(total ms, {direct import of main: cumulative ms}, heavy top-level packages loaded)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=SERVER_DIR,
+                         capture_output=True, text=True, check=True).stderr
+    total, direct, loaded = 0.0, {}, set()
+    # children are printed before their parent, so collect depth-1 lines until main's own line
+    pending: Dict[str, float] = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue   # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        module = name.strip()
+        if module.split(".")[0] in HEAVY:
+            loaded.add(module.split(".")[0])
+        if depth == 1:
+            pending[module] = int(cumulative) / 1000
+        elif depth == 0:
+            if module == "main":
+                total, direct = int(cumulative) / 1000, pending
+            pending = {}
+    return total, direct, sorted(loaded)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+def serve_timings(timeout: float = 60) -> Tuple[Optional[float], Optional[float], dict]:
+    """Seconds from process start to the first /healthz 200 and to /readyz 200, plus the warm-up report."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                            cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    healthy: Optional[float] = None
+    ready: Optional[float] = None
+    report: dict = {}
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if healthy is None and _status(base + "/healthz") == 200:
+                healthy = time.perf_counter() - t0
+            if healthy is not None and _status(base + "/readyz") == 200:
+                ready = time.perf_counter() - t0
+                with urllib.request.urlopen(base + "/readyz", timeout=1) as r:
+                    report = json.load(r)
+                break
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return healthy, ready, report
+
+def main(rounds: int):
+    totals, per_module = [], defaultdict(list)
+    loaded: List[str] = []
+    for _ in range(rounds):
+        total, direct, loaded = import_profile()
+        totals.append(total)
+        for name, ms in direct.items():
+            per_module[name].append(ms)
+    print(f"import main: median {statistics.median(totals):.1f} ms over {rounds} runs\n")
+    print(f"{'module':<28}{'median ms':>12}")
+    for name, ms in sorted(per_module.items(), key=lambda kv: -statistics.median(kv[1])):
+        if statistics.median(ms) >= 1:
+            print(f"{name:<28}{statistics.median(ms):>12.1f}")
+    print(f"\nheavy packages loaded by `import main`: {', '.join(loaded) or 'none'}")
+
+    healthy, ready, report = serve_timings()
+    fmt = lambda t: f"{t:.2f}s" if t is not None else "timed out"
+    print(f"\nuvicorn: /healthz after {fmt(healthy)}, /readyz after {fmt(ready)}")
+    for step, info in report.get("steps", {}).items():
+        print(f"  warm-up {step:<12}{info['ms']:>9.1f} ms{'  ERROR ' + info['error'] if 'error' in info else ''}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,65 @@
+"""
+JD term extraction: terms.top_terms vs the old per-request CountVectorizer.
+
+    python benchmarks/bench_terms.py [jd.txt ...]
+
+Checks that both return the same top-100 terms and prints per-call latency.
+Needs scikit-learn for the baseline (it is no longer a runtime dependency).
+"""
+import os, sys, time, statistics
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terms import top_terms
+
+SAMPLE_JD = """
+We're hiring a Senior Software Engineer to design, build and operate scalable backend services.
+You will own distributed systems in Python and Go, run them on AWS with Docker and Kubernetes,
+and partner with QA, security and product teams. Requirements: 5+ years of software engineering,
+strong knowledge of design patterns, REST API design, SQL and NoSQL databases, CI/CD pipelines,
+code review and documentation. Nice to have: Kafka, Redis, Terraform, observability (Prometheus,
+Grafana). We offer competitive salary, equity, 401k matching, health, dental and vision benefits.
+We are an equal opportunity employer and value diversity at our company.
+"""
+
+def vectorizer_terms(jd_text: str, top_n: int = 100):
+    from sklearn.feature_extraction.text import CountVectorizer
+    vect = CountVectorizer(stop_words="english", ngram_range=(1, 2))
+    X = vect.fit_transform([jd_text.lower()])
+    freq = Counter(dict(zip(vect.get_feature_names_out(), X.toarray()[0])))
+    return [t for t, _ in freq.most_common(top_n)]
+
+def bench(fn, text: str, rounds: int = 200) -> float:
+    fn(text)  # warm-up
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(text)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+def main(paths):
+    docs = {"sample": SAMPLE_JD, "sample x10": SAMPLE_JD * 10}
+    for p in paths:
+        with open(p, "r", encoding="utf-8", errors="ignore") as f:
+            docs[os.path.basename(p)] = f.read()
+
+    try:
+        import sklearn  # noqa: F401
+        have_sklearn = True
+    except ImportError:
+        have_sklearn = False
+        print("scikit-learn not installed: showing new extractor only\n")
+
+    print(f"{'document':<18}{'words':>8}{'new ms':>10}{'old ms':>10}{'speedup':>9}  same top-100")
+    for name, text in docs.items():
+        new_ms = bench(top_terms, text)
+        line = f"{name:<18}{len(text.split()):>8}{new_ms:>10.3f}"
+        if have_sklearn:
+            old_ms = bench(vectorizer_terms, text)
+            same = top_terms(text) == vectorizer_terms(text)
+            line += f"{old_ms:>10.3f}{old_ms / new_ms:>8.1f}x  {same}"
+        print(line)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,193 @@
+import os, re, math, threading, contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from matcher import matcher_for
+
+# ---------------------------------------------------------------------
+# Token estimates (tiktoken when installed, ~4 chars/token otherwise)
+# ---------------------------------------------------------------------
+JD_PROMPT_TOKENS = int(os.getenv("JD_PROMPT_TOKENS", "350"))          # compressed JD size per prompt (0 = send it whole)
+REQUEST_TOKEN_BUDGET = int(os.getenv("REQUEST_TOKEN_BUDGET", "40000"))  # prompt + completion per request (0 = unlimited)
+PROMPT_TERMS = int(os.getenv("PROMPT_TERMS", "24"))                    # "additional keywords" listed per prompt
+REWRITE_MAX_TOKENS = 900                                               # max_tokens a rewrite call used before per-entry sizing
+
+try:
+    import tiktoken  # optional, exact counts for OpenAI models
+    _enc = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _enc = None
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _enc is not None:
+        return len(_enc.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+# ---------------------------------------------------------------------
+# JD compression: drop boilerplate, keep the sentences densest in terms
+# ---------------------------------------------------------------------
+# whole boilerplate phrases only: a lone "benefits" / "compensation" / "religion" can be a
+# real requirement ("benefits administration systems", "build compensation analytics")
+BOILERPLATE_RX = re.compile(
+    r"equal (employment )?opportunity|\beeo\b|affirmative action|without regard to|regardless of (race|age|sex|gender)|"
+    r"race, colou?r|colou?r, religion|religion, (sex|creed)|sexual orientation|gender identity|national origin|"
+    r"(protected )?veteran status|disability status|individuals with disabilities|reasonable accommodations?|"
+    r"diversity, equity,? (and|&) inclusion|"
+    r"we offer|(competitive|comprehensive|generous|great) (salary|pay|compensation|benefits)|benefits (package|include)|"
+    r"401\(?k\)?|(medical|health(care)?),? dental|dental,? (and )?vision|vision insurance|paid time off|\bpto\b|"
+    r"parental leave|salary range|pay range|base pay|compensation (package|range)|stock options|"
+    r"perks (include|and benefits)|wellness (program|stipend)|"
+    r"background check|drug (test|screen)|e-verify|privacy (policy|notice)|recruit(ing|ment) (agencies|fraud)|"
+    r"how to apply|apply now|click apply|about (us|the company)|our mission|we are proud",
+    re.I,
+)
+REQUIREMENT_RX = re.compile(
+    r"\b(required|requirements?|must|qualifications?|experience (with|in)|proficien|familiar|"
+    r"you will|you'll|responsibilit|responsible for|build|design|develop|own|knowledge of|skills?)\b",
+    re.I,
+)
+_SPLIT_RX = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+class CompressedJD(NamedTuple):
+    text: str
+    original_tokens: int
+    tokens: int
+
+def _sentences(jd_text: str) -> List[str]:
+    out, seen = [], set()
+    for s in _SPLIT_RX.split(jd_text or ""):
+        s = re.sub(r"^[\s\-•*·]+", "", s).strip()
+        norm = " ".join(s.lower().split())
+        if len(s) > 2 and norm not in seen:   # postings often repeat whole paragraphs
+            seen.add(norm)
+            out.append(s)
+    return out
+
+def content_sentences(jd_text: str) -> List[str]:
+    """The JD's sentences without boilerplate (EEO, benefits, how to apply), deduplicated."""
+    return [s for s in _sentences(jd_text) if not BOILERPLATE_RX.search(s)]
+
+def compress_jd(jd_text: str, terms: Sequence[str], critical_terms: Sequence[str] = (),
+                max_tokens: int = JD_PROMPT_TOKENS) -> CompressedJD:
+    """
+    Extractive: boilerplate sentences go first, then the remaining sentences are
+    ranked by (critical terms x2 + other terms) per sqrt(length) plus a requirement
+    cue bonus, and the best are kept, in their original order, until max_tokens.
+    """
+    original = estimate_tokens(jd_text)
+    if max_tokens <= 0:
+        return CompressedJD(jd_text, original, original)
+    sents = content_sentences(jd_text)
+    sizes = [estimate_tokens(s) for s in sents]
+    if sum(sizes) <= max_tokens:
+        text = "\n".join(sents)
+        return CompressedJD(text, original, estimate_tokens(text))
+
+    all_m, crit_m = matcher_for(terms), matcher_for(critical_terms)
+    scored = []
+    for i, (s, n) in enumerate(zip(sents, sizes)):
+        hits = len(all_m.find_all(s)) + 2 * len(crit_m.find_all(s))
+        cue = 1.0 if REQUIREMENT_RX.search(s) else 0.0
+        scored.append(((hits + cue) / math.sqrt(max(n, 1)), i))
+    keep, used = set(), 0
+    for score, i in sorted(scored, key=lambda x: (-x[0], x[1])):
+        if score <= 0:
+            break
+        if used + sizes[i] > max_tokens:
+            continue
+        keep.add(i)
+        used += sizes[i]
+    text = "\n".join(s for i, s in enumerate(sents) if i in keep)
+    return CompressedJD(text, original, estimate_tokens(text))
+
+def prompt_terms(all_terms: Sequence[str], critical_terms: Sequence[str], limit: int = PROMPT_TERMS) -> List[str]:
+    """'Additional keywords' for a prompt: the top terms not already listed as critical."""
+    crit = set(critical_terms)
+    return [t for t in all_terms if t not in crit][:limit]
+
+def rewrite_max_tokens(bullets: Sequence[str]) -> int:
+    # ≤ 28 words per bullet ≈ 45 tokens, plus the "- " prefixes and some slack
+    return min(REWRITE_MAX_TOKENS, 60 + 55 * max(1, len(bullets)))
+
+# ---------------------------------------------------------------------
+# Per-request budget, carried in a contextvar like the telemetry trace
+# ---------------------------------------------------------------------
+JD_KINDS = ("rewrite", "rewrite_retry", "summary", "batch")   # calls whose prompt embeds the JD
+
+class BudgetExceeded(Exception):
+    pass
+
+class TokenBudget:
+    """
+    Each LLM call reserves its estimated prompt tokens + max_tokens up front and is
+    refused once the request would go over `limit`; actual usage replaces the
+    reservation when the call returns.
+    """
+    def __init__(self, limit: int = REQUEST_TOKEN_BUDGET, jd: Optional[CompressedJD] = None):
+        self.limit = limit
+        self.jd = jd
+        self.reserved = 0
+        self.used = {"prompt": 0, "completion": 0}
+        self.calls: Dict[str, int] = {}
+        self.refused = 0
+        self.max_tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, kind: str, prompt: str, max_tokens: int) -> int:
+        amount = estimate_tokens(prompt) + max_tokens
+        with self._lock:
+            spent = self.used["prompt"] + self.used["completion"] + self.reserved
+            if self.limit and spent + amount > self.limit:
+                self.refused += 1
+                raise BudgetExceeded(f"request token budget ({self.limit}) exhausted")
+            self.reserved += amount
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+        return amount
+
+    def settle(self, amount: int, prompt: str, usage: Any = None, completion: str = "") -> None:
+        p = getattr(usage, "prompt_tokens", None) if usage is not None else None
+        c = getattr(usage, "completion_tokens", None) if usage is not None else None
+        with self._lock:
+            self.reserved -= amount
+            self.used["prompt"] += int(p) if p is not None else estimate_tokens(prompt)
+            self.used["completion"] += int(c) if c is not None else estimate_tokens(completion)
+
+    def release(self, amount: int) -> None:
+        with self._lock:
+            self.reserved -= amount
+
+    def note_max_tokens(self, default: int, sized: int) -> None:
+        with self._lock:
+            self.max_tokens_saved += max(0, default - sized)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            jd_calls = sum(n for k, n in self.calls.items() if k in JD_KINDS)
+            out: Dict[str, Any] = {
+                "budget": self.limit,
+                "prompt_tokens": self.used["prompt"],
+                "completion_tokens": self.used["completion"],
+                "calls": dict(self.calls),
+                "refused_calls": self.refused,
+                "max_tokens_saved": self.max_tokens_saved,
+            }
+        if self.jd is not None:
+            out["jd_tokens"] = self.jd.original_tokens
+            out["jd_prompt_tokens"] = self.jd.tokens
+            out["prompt_tokens_saved"] = (self.jd.original_tokens - self.jd.tokens) * jd_calls
+        return out
+
+_budget: contextvars.ContextVar[Optional[TokenBudget]] = contextvars.ContextVar("token_budget", default=None)
+
+def current_budget() -> Optional[TokenBudget]:
+    return _budget.get()
+
+@contextmanager
+def activate(budget: TokenBudget) -> Iterator[TokenBudget]:
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
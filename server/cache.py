@@ -0,0 +1,190 @@
+import os, copy, json, time, sqlite3, hashlib, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data"))
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serializable parts (order-sensitive)."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+# ---------------------------------------------------------------------
+# In-process tier: LRU bounded by (approximate) bytes, with TTL
+# ---------------------------------------------------------------------
+class LRUCache:
+    def __init__(self, max_bytes: int, ttl: float = 0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, size, expires = item
+            if expires and expires < time.time():
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None) -> None:
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (value, size, time.time() + ttl if ttl else 0)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                self._drop(next(iter(self._data)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+# ---------------------------------------------------------------------
+# Shared tier: SQLite file that every uvicorn worker can read/write
+# ---------------------------------------------------------------------
+PURGE_EVERY = 500   # writes between expiry sweeps of the shared file
+
+class SQLiteCache:
+    def __init__(self, path: str, ttl: float = 0):
+        self.path = path
+        self.ttl = ttl
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # short-lived connections: safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5)
+
+    def lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        """(value, expires) of a live row; expires is 0 for rows that never expire."""
+        try:
+            with self._conn() as db:
+                row = db.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"[CACHE ERROR] {e}")
+            return None
+        if not row:
+            return None
+        value, expires = row
+        if expires and expires < time.time():
+            return None
+        return value, expires
+
+    def get(self, key: str) -> Optional[str]:
+        hit = self.lookup(key)
+        return hit[0] if hit else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            with self._conn() as db:
+                db.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                           (key, value, time.time() + ttl if ttl else 0))
+        except sqlite3.Error as e:
+            print(f"[CACHE ERROR] {e}")
+            return
+        # rows are only skipped once expired; the sweep is what keeps the file from growing forever
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        try:
+            with self._conn() as db:
+                cur = db.execute("DELETE FROM cache WHERE expires > 0 AND expires < ?", (time.time(),))
+                return cur.rowcount
+        except sqlite3.Error as e:
+            print(f"[CACHE ERROR] {e}")
+            return 0
+
+# ---------------------------------------------------------------------
+# Two-tier cache for LLM rewrites
+# ---------------------------------------------------------------------
+class RewriteCache:
+    """
+    Memory LRU in front of a shared SQLite file. Values are JSON-serializable
+    (bullet lists / summary strings). Either tier can be disabled.
+    """
+    def __init__(self, memory_bytes: int, db_path: Optional[str], ttl: float, enabled: bool = True):
+        self.enabled = enabled
+        self.memory = LRUCache(memory_bytes, ttl)
+        self.disk = SQLiteCache(db_path, ttl) if (enabled and db_path) else None
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """A copy of the cached value: callers may edit it without touching the cache."""
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return copy.deepcopy(value)
+        if self.disk is not None:
+            hit = self.disk.lookup(key)
+            if hit is not None:
+                raw, expires = hit
+                value = json.loads(raw)
+                # promoted with what is left of the row's lifetime, not a fresh TTL
+                ttl = max(expires - time.time(), 1e-3) if expires else None
+                self.memory.set(key, value, len(key) + len(raw), ttl)
+                self._count("disk_hits")
+                return copy.deepcopy(value)
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        raw = json.dumps(value, ensure_ascii=False)
+        self.memory.set(key, copy.deepcopy(value), len(key) + len(raw))
+        if self.disk is not None:
+            self.disk.set(key, raw)
+        self._count("writes")
+
+    def purge_expired(self) -> int:
+        return self.disk.purge_expired() if self.disk is not None else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.stats)
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_ratio"] = round((out["memory_hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        out["memory_entries"] = len(self.memory)
+        out["memory_bytes"] = self.memory.nbytes
+        return out
+
+rewrite_cache = RewriteCache(
+    memory_bytes=int(float(os.getenv("REWRITE_CACHE_MB", "32")) * 1024 * 1024),
+    db_path=os.getenv("REWRITE_CACHE_DB", os.path.join(DATA_DIR, "rewrites.sqlite3")) or None,
+    ttl=float(os.getenv("REWRITE_CACHE_TTL", str(7 * 24 * 3600))),
+    enabled=os.getenv("REWRITE_CACHE", "1") != "0",
+)
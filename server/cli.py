@@ -0,0 +1,213 @@
+"""
+Bulk tailoring from the command line: every resume in one directory against
+every JD in another, without the web server.
+
+    python cli.py --resumes resumes/ --jds postings/ --out out/ [--concurrency 8] [--workers 4]
+
+Resumes and JDs are read and parsed once each in a process pool, pairs are
+tailored on threads (their LLM calls run concurrently) and rendered back in the
+process pool. Every finished pair is appended to OUT/manifest.jsonl; rerunning
+the same command skips pairs already recorded as ok (matched by file hashes,
+so an edited resume or JD is tailored again). Failed pairs are retried.
+"""
+import os, sys, json, time, hashlib, argparse, statistics
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from parsers import read_text, file_kind
+from workers import CPU_WORKERS
+
+MANIFEST = "manifest.jsonl"
+
+# ---------------------------------------------------------------------
+# Process-pool work (module-level so it pickles under spawn)
+# ---------------------------------------------------------------------
+def _load_jd(path: str) -> Dict[str, Any]:
+    from extractor import extract_keywords
+    with open(path, "rb") as f:
+        data = f.read()
+    _, text = read_text(path, data)
+    info = extract_keywords(text, k=25) if text.strip() else {"skills": [], "keywords": []}
+    return {"sha256": hashlib.sha256(data).hexdigest(), "text": text, **info}
+
+def _load_resume(path: str) -> Dict[str, Any]:
+    from tailoring import parse_resume
+    with open(path, "rb") as f:
+        data = f.read()
+    _, text = read_text(path, data)
+    return {"sha256": hashlib.sha256(data).hexdigest(), "text": text,
+            "parsed": parse_resume(text) if text.strip() else {}}
+
+def _render(model: Dict[str, Any], out_path: str) -> int:
+    from pdf_builder import build_pdf
+    tmp = out_path + ".part"
+    build_pdf(model, tmp)
+    os.replace(tmp, out_path)   # a crash mid-render never leaves a truncated PDF behind
+    return os.path.getsize(out_path)
+
+# ---------------------------------------------------------------------
+# Inputs and manifest
+# ---------------------------------------------------------------------
+def find_inputs(root: str) -> List[str]:
+    """Readable documents under root (recursive), as sorted relative paths."""
+    out = []
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            if not name.startswith(".") and file_kind(name) != "unknown":
+                out.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(out)
+
+def _stem(rel: str) -> str:
+    """
+    Readable, collision-free part of an output name: the flattened relative path
+    with its extension, plus a hash of the path itself (resume.pdf / resume.docx and
+    a/b.txt / a_b.txt would otherwise flatten to the same name).
+    """
+    flat = rel.replace(os.sep, "_").replace(" ", "_").replace(".", "_")
+    return f"{flat}-{hashlib.sha256(rel.encode('utf-8')).hexdigest()[:8]}"
+
+def pdf_name(resume_rel: str, jd_rel: str) -> str:
+    return f"{_stem(resume_rel)}__{_stem(jd_rel)}.pdf"
+
+def pair_key(pdf: str, resume_sha: str, jd_sha: str) -> str:
+    # the output name ties the record to one pair of paths; the hashes to their content
+    return f"{pdf}:{resume_sha}:{jd_sha}"
+
+def read_manifest(path: str, out_dir: str) -> Set[str]:
+    """Pairs already done: recorded as ok and their PDF is still there."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue   # torn last line from an interrupted run
+            if rec.get("status") == "ok" and os.path.exists(os.path.join(out_dir, rec.get("pdf", ""))):
+                done.add(pair_key(rec["pdf"], rec["resume_sha256"], rec["jd_sha256"]))
+    return done
+
+# ---------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------
+def _tailor_pair(resume: Dict[str, Any], jd: Dict[str, Any], out_dir: str, pdf_name: str,
+                 procs: ProcessPoolExecutor, use_cache: bool) -> Dict[str, Any]:
+    from tailoring import build_tailored_model
+    t0 = time.perf_counter()
+    if not resume["text"].strip():
+        raise ValueError("could not parse resume text")
+    if not jd["text"].strip():
+        raise ValueError("could not parse JD text")
+    model = build_tailored_model(resume["text"], jd["skills"], jd["keywords"], jd["text"],
+                                 use_cache=use_cache, parsed=resume["parsed"])
+    t1 = time.perf_counter()
+    size = procs.submit(_render, model, os.path.join(out_dir, pdf_name)).result()
+    t2 = time.perf_counter()
+    meta = model.get("meta", {})
+    return {"pdf": pdf_name, "bytes": size, "tailor_s": round(t1 - t0, 3), "render_s": round(t2 - t1, 3),
+            "tokens": meta.get("tokens", {}), "coverage_repair": meta.get("coverage_repair", {})}
+
+def _load_all(paths: List[str], root: str, fn: Any, procs: ProcessPoolExecutor, what: str) -> Dict[str, Dict[str, Any]]:
+    futures = {procs.submit(fn, os.path.join(root, rel)): rel for rel in paths}
+    out: Dict[str, Dict[str, Any]] = {}
+    for fut in as_completed(futures):
+        rel = futures[fut]
+        try:
+            out[rel] = fut.result()
+        except Exception as e:
+            print(f"[CLI ERROR] {what} {rel}: {e}")
+    return out
+
+def run(args: argparse.Namespace) -> int:
+    resumes, jds = find_inputs(args.resumes), find_inputs(args.jds)
+    if not resumes or not jds:
+        print(f"[CLI ERROR] nothing to do: {len(resumes)} resumes, {len(jds)} JDs")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST)
+    done = read_manifest(manifest_path, args.out)
+
+    t_start = time.perf_counter()
+    # spawn: the tailoring threads are already running when render tasks are submitted
+    procs = ProcessPoolExecutor(max_workers=args.workers, mp_context=mp.get_context("spawn"))
+    threads = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="pair")
+    latencies: List[float] = []
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+    try:
+        jd_docs = _load_all(jds, args.jds, _load_jd, procs, "JD")
+        res_docs = _load_all(resumes, args.resumes, _load_resume, procs, "resume")
+        t_parsed = time.perf_counter()
+        print(f"[CLI] parsed {len(res_docs)} resumes and {len(jd_docs)} JDs in {t_parsed - t_start:.1f}s")
+
+        futures: Dict[Future, Tuple[str, str, float]] = {}
+        for r in resumes:
+            for j in jds:
+                if r not in res_docs or j not in jd_docs:
+                    counts["error"] += 1
+                    continue
+                out_name = pdf_name(r, j)
+                if pair_key(out_name, res_docs[r]["sha256"], jd_docs[j]["sha256"]) in done:
+                    counts["skipped"] += 1
+                    continue
+                fut = threads.submit(_tailor_pair, res_docs[r], jd_docs[j], args.out, out_name, procs, not args.nocache)
+                futures[fut] = (r, j, time.perf_counter())
+
+        total = len(futures)
+        with open(manifest_path, "a", encoding="utf-8") as manifest:
+            for n, fut in enumerate(as_completed(futures), 1):
+                r, j, submitted = futures[fut]
+                rec: Dict[str, Any] = {"resume": r, "jd": j, "resume_sha256": res_docs[r]["sha256"],
+                                       "jd_sha256": jd_docs[j]["sha256"], "finished_at": round(time.time(), 3)}
+                try:
+                    rec.update(fut.result(), status="ok")
+                    counts["ok"] += 1
+                    latencies.append(rec["tailor_s"] + rec["render_s"])
+                    for k in tokens:
+                        tokens[k] += int(rec["tokens"].get(k, 0))
+                except Exception as e:
+                    rec.update(status="error", error=str(e) or type(e).__name__)
+                    counts["error"] += 1
+                    print(f"[CLI ERROR] {r} × {j}: {rec['error']}")
+                manifest.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                manifest.flush()   # resumable: every finished pair is on disk before the next one
+                if not args.quiet:
+                    print(f"[CLI] {n}/{total} {rec['status']:<5} {r} × {j}")
+    except KeyboardInterrupt:
+        print("[CLI] interrupted; rerun the same command to resume")
+        threads.shutdown(wait=False, cancel_futures=True)
+        procs.shutdown(wait=False, cancel_futures=True)
+        return 130
+    threads.shutdown()
+    procs.shutdown()
+
+    wall = time.perf_counter() - t_start
+    print(f"\n{'pairs':<22}{counts['ok']} ok, {counts['error']} failed, {counts['skipped']} skipped (already done)")
+    print(f"{'wall time':<22}{wall:.1f}s")
+    if latencies:
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{'throughput':<22}{counts['ok'] / wall * 60:.1f} pairs/min")
+        print(f"{'per pair':<22}p50 {statistics.median(latencies):.2f}s  p95 {p95:.2f}s")
+        print(f"{'LLM tokens':<22}{tokens['prompt_tokens']} prompt, {tokens['completion_tokens']} completion")
+    print(f"{'manifest':<22}{manifest_path}")
+    return 0 if counts["error"] == 0 else 2
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Tailor every resume against every JD and write PDFs + a manifest.")
+    ap.add_argument("--resumes", required=True, help="directory of resumes (.pdf/.docx/.txt/.md, recursive)")
+    ap.add_argument("--jds", required=True, help="directory of job descriptions")
+    ap.add_argument("--out", required=True, help="output directory for PDFs and manifest.jsonl")
+    ap.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "4")),
+                    help="pairs tailored at once (each runs its own LLM calls concurrently)")
+    ap.add_argument("--workers", type=int, default=max(1, CPU_WORKERS), help="processes for parsing and rendering")
+    ap.add_argument("--nocache", action="store_true", help="skip rewrite-cache reads")
+    ap.add_argument("--quiet", action="store_true", help="only print errors and the summary")
+    return run(ap.parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os, json, asyncio, hashlib
+from typing import Any, Dict, Tuple
+
+from cache import LRUCache
+from parsers import read_text, sniff_kind, use_pymupdf, pdf_page_count, pdf_page_chunks, pdf_deadline, extract_pdf_pages
+from tailoring import parse_resume
+from workers import run_cpu, run_io
+from telemetry import span
+
+# ---------------------------------------------------------------------
+# Parsed-document cache keyed by SHA-256 of the uploaded bytes.
+# Preview → download uploads the same files twice; this parses them once.
+# ---------------------------------------------------------------------
+document_cache = LRUCache(
+    max_bytes=int(float(os.getenv("DOC_CACHE_MB", "64")) * 1024 * 1024),
+    ttl=float(os.getenv("DOC_CACHE_TTL", "3600")),
+)
+
+def upload_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _key(kind: str, filename: str, data: bytes) -> str:
+    # the parser is chosen from the content, so the bytes alone identify the result
+    return f"{kind}:{upload_digest(data)}"
+
+def load_text(filename: str, data: bytes) -> str:
+    """Extracted plain text for any upload (JD or resume)."""
+    key = _key("text", filename, data)
+    hit = document_cache.get(key)
+    if hit is not None:
+        return hit
+    with span("read_text") as attrs:
+        attrs["kind"], text = read_text(filename, data)
+    document_cache.set(key, text, len(key) + len(text))
+    return text
+
+def _parse(text: str) -> Dict[str, Any]:
+    return parse_resume(text) if text.strip() else {}
+
+def _store_resume(key: str, text: str, parsed: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    size = len(key) + len(text) + len(json.dumps(parsed, ensure_ascii=False))
+    document_cache.set(key, (text, parsed), size)
+    return text, parsed
+
+def load_resume(filename: str, data: bytes) -> Tuple[str, Dict[str, Any]]:
+    """(text, parse_resume(text)) for a resume upload. Callers must not mutate the result."""
+    key = _key("resume", filename, data)
+    hit = document_cache.get(key)
+    if hit is not None:
+        return hit
+    text = load_text(filename, data)
+    return _store_resume(key, text, _parse(text))
+
+# ---------------------------------------------------------------------
+# Async variants for the API: cache misses are parsed off the event loop
+# ---------------------------------------------------------------------
+async def _aread_pdf(data: bytes) -> str:
+    """pdfminer is pure Python: long PDFs are split into page chunks across the process pool."""
+    deadline = pdf_deadline()
+    chunks = pdf_page_chunks(await run_cpu(pdf_page_count, data))
+    if len(chunks) <= 1:
+        return await run_cpu(extract_pdf_pages, data, None, deadline)
+    parts = await asyncio.gather(*(run_cpu(extract_pdf_pages, data, pages, deadline) for pages in chunks))
+    return "".join(parts)
+
+async def aload_text(filename: str, data: bytes) -> str:
+    key = _key("text", filename, data)
+    hit = document_cache.get(key)
+    if hit is not None:
+        return hit
+    kind = sniff_kind(data)
+    # timed here: extraction itself may run in another process
+    with span("read_text", kind=kind):
+        if kind == "pdf" and not use_pymupdf():
+            text = await _aread_pdf(data)
+        else:
+            _, text = await run_cpu(read_text, filename, data)
+    document_cache.set(key, text, len(key) + len(text))
+    return text
+
+async def aload_resume(filename: str, data: bytes) -> Tuple[str, Dict[str, Any]]:
+    key = _key("resume", filename, data)
+    hit = document_cache.get(key)
+    if hit is not None:
+        return hit
+    text = await aload_text(filename, data)
+    # a worker thread, not the process pool: workers would have to import tailoring (and the
+    # OpenAI client) just for this, and the thread keeps the parse_resume span on the request trace
+    return _store_resume(key, text, await run_io(_parse, text))
@@ -1,15 +1,25 @@
-import re
 from collections import Counter
 from typing import List, Dict
+from terms import tokenize, SKILL_RX
+from skills import get_index
+from matcher import TermMatcher
 
 # ---------------------------------------------------------------------
 # Clean and tokenize text
 # ---------------------------------------------------------------------
 def _tokenize(text: str) -> List[str]:
-    text = text.lower()
-    # keep alphanumeric and + / . / #
-    tokens = re.findall(r"[a-z0-9\+\-/\.#]+", text)
-    return [t for t in tokens if len(t) > 2]
+    # keep alphanumeric and + / . / # (shared tokenizer, skill-friendly pattern)
+    return tokenize(text, SKILL_RX, min_len=3)
+
+TECHNICAL_MARKERS = [
+    "python", "java", "c++", "javascript", "node", "react", "angular",
+    "vue", "sql", "aws", "azure", "gcp", "docker", "kubernetes",
+    "tensorflow", "pytorch", "ai", "ml", "machine", "learning",
+    "deep", "neural", "api", "database", "security", "devops",
+    "git", "linux", "unix", "testing", "automation", "distributed",
+    "system", "architecture", "backend", "frontend", "fullstack"
+]
+_TECH_MATCHER = TermMatcher(TECHNICAL_MARKERS, word_boundary=False)
 
 # ---------------------------------------------------------------------
 # Extract skills and keywords from a job description
@@ -27,31 +37,27 @@ def extract_keywords(jd_text: str, seed_skills: List[str] = None, k: int = 25) -
     toks = _tokenize(jd_text)
     freq = Counter(toks)
 
-    # --- Optional: seed boost for known skills list (e.g., from skills_seed.txt)
+    # --- Seed boost for known skills: explicit list, else the skill taxonomy (skills_seed.txt)
     if seed_skills:
         for s in seed_skills:
             if s.lower() in freq:
                 freq[s.lower()] += 3
+    else:
+        index = get_index()
+        for tok in freq:
+            if index.is_seed(tok):
+                freq[tok] += 3
 
     # --- Compute top terms
     top_terms = [w for w, _ in freq.most_common(80)]
 
     # --- Split into likely technical vs general keywords
-    technical_markers = [
-        "python", "java", "c++", "javascript", "node", "react", "angular",
-        "vue", "sql", "aws", "azure", "gcp", "docker", "kubernetes",
-        "tensorflow", "pytorch", "ai", "ml", "machine", "learning",
-        "deep", "neural", "api", "database", "security", "devops",
-        "git", "linux", "unix", "testing", "automation", "distributed",
-        "system", "architecture", "backend", "frontend", "fullstack"
-    ]
-
     skills = []
     keywords = []
 
     for term in top_terms:
-        # technical
-        if any(t in term for t in technical_markers):
+        # technical (plain substring match against the markers, as before)
+        if _TECH_MATCHER.contains_any(term):
             skills.append(term)
         # skip stopwords
         elif term not in [
@@ -80,9 +86,6 @@ if __name__ == "__main__":
 
 
 import os
-import textract
-from PyPDF2 import PdfReader
-from docx import Document
 
 def extract_text_from_file(file_path: str) -> str:
     """
@@ -90,6 +93,12 @@ def extract_text_from_file(file_path: str) -> str:
     Returns a single plain-text string.
     """
     try:
+        # imported per call: this path is only used by scripts, and textract/PyPDF2
+        # would otherwise load with every server start
+        import textract
+        from PyPDF2 import PdfReader
+        from docx import Document
+
         ext = os.path.splitext(file_path)[-1].lower()
 
         if ext == ".txt":
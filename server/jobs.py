@@ -0,0 +1,223 @@
+import os, json, time, uuid, sqlite3, asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from cache import DATA_DIR
+from workers import run_io
+
+# ---------------------------------------------------------------------
+# Background job queue: submit returns an id, workers run
+# parse → tailor → render, clients poll for status / fetch the result
+# ---------------------------------------------------------------------
+JOBS_DB = os.getenv("JOBS_DB", os.path.join(DATA_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))            # jobs processed at once per server process
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "200"))    # submissions beyond this get 503
+JOB_TTL = float(os.getenv("JOB_TTL", str(24 * 3600)))       # seconds a finished job (and its result) is kept
+JOB_POLL = float(os.getenv("JOB_POLL", "2"))                # idle workers re-check the store this often
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+class JobCancelled(Exception):
+    pass
+
+_COLUMNS = ("id", "kind", "status", "stage", "done", "total", "error", "created", "updated", "expires")
+
+class JobStore:
+    """
+    SQLite-backed job table. Inputs are kept until the job finishes so queued
+    jobs survive a restart; results are kept until `expires`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,
+                stage TEXT NOT NULL DEFAULT '', done INTEGER NOT NULL DEFAULT 0, total INTEGER NOT NULL DEFAULT 0,
+                error TEXT, options TEXT NOT NULL DEFAULT '{}',
+                jd_name TEXT, jd_data BLOB, resume_name TEXT, resume_data BLOB,
+                model TEXT, pdf BLOB,
+                created REAL NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL DEFAULT 0)""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # short-lived connections: safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5)
+
+    def create(self, kind: str, jd_name: str, jd_data: bytes, resume_name: str, resume_data: bytes,
+               options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._conn() as db:
+            db.execute("""INSERT INTO jobs (id, kind, status, options, jd_name, jd_data, resume_name, resume_data, created, updated)
+                          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                       (job_id, kind, QUEUED, json.dumps(options or {}), jd_name, jd_data, resume_name, resume_data, now, now))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._conn() as db:
+            row = db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        if job["expires"] and job["expires"] < time.time():
+            return None
+        return job
+
+    def count_queued(self) -> int:
+        with self._conn() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Oldest queued job, atomically moved to running (several processes may share the file)."""
+        with self._conn() as db:
+            while True:
+                row = db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)).fetchone()
+                if not row:
+                    return None
+                cur = db.execute("UPDATE jobs SET status = ?, stage = 'queued', updated = ? WHERE id = ? AND status = ?",
+                                 (RUNNING, time.time(), row[0], QUEUED))
+                if cur.rowcount:
+                    db.commit()
+                    job = db.execute("SELECT id, kind, options, jd_name, jd_data, resume_name, resume_data FROM jobs WHERE id = ?",
+                                     (row[0],)).fetchone()
+                    keys = ("id", "kind", "options", "jd_name", "jd_data", "resume_name", "resume_data")
+                    out = dict(zip(keys, job))
+                    out["options"] = json.loads(out["options"])
+                    return out
+
+    def progress(self, job_id: str, stage: Optional[str] = None, done: Optional[int] = None,
+                 total: Optional[int] = None) -> bool:
+        """Record progress; False once the job has been cancelled (the worker should stop)."""
+        with self._conn() as db:
+            cur = db.execute("""UPDATE jobs SET stage = COALESCE(?, stage), done = COALESCE(?, done),
+                                total = COALESCE(?, total), updated = ? WHERE id = ? AND status = ?""",
+                             (stage, done, total, time.time(), job_id, RUNNING))
+            return bool(cur.rowcount)
+
+    def finish(self, job_id: str, status: str, model: Optional[Dict[str, Any]] = None,
+               pdf: Optional[bytes] = None, error: Optional[str] = None) -> bool:
+        """False when the job had already finished (e.g. it completed before a cancel got in)."""
+        now = time.time()
+        with self._conn() as db:
+            # inputs are not needed any more; results live until the job expires
+            cur = db.execute("""UPDATE jobs SET status = ?, stage = ?, error = ?, model = ?, pdf = ?, jd_data = NULL,
+                                resume_data = NULL, updated = ?, expires = ? WHERE id = ? AND status IN (?, ?)""",
+                             (status, status, error, json.dumps(model, ensure_ascii=False) if model is not None else None,
+                              pdf, now, now + JOB_TTL if JOB_TTL else 0, job_id, QUEUED, RUNNING))
+            return bool(cur.rowcount)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return False
+        return self.finish(job_id, CANCELLED)
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._conn() as db:
+            row = db.execute("SELECT model, pdf FROM jobs WHERE id = ? AND status = ?", (job_id, DONE)).fetchone()
+        if not row:
+            return None
+        return {"model": json.loads(row[0]) if row[0] else None, "pdf": row[1]}
+
+    def requeue_running(self) -> int:
+        """Jobs that were running when the server stopped start over (call once at startup)."""
+        with self._conn() as db:
+            cur = db.execute("UPDATE jobs SET status = ?, stage = '', done = 0, updated = ? WHERE status = ?",
+                             (QUEUED, time.time(), RUNNING))
+            return cur.rowcount
+
+    def purge_expired(self) -> int:
+        with self._conn() as db:
+            cur = db.execute("DELETE FROM jobs WHERE expires > 0 AND expires < ?", (time.time(),))
+            return cur.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._conn() as db:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+# ---------------------------------------------------------------------
+# Worker pool (asyncio tasks; the heavy lifting goes to the shared pools)
+# ---------------------------------------------------------------------
+# runner(job, progress) → (model, pdf or None); progress(stage, done, total) raises JobCancelled
+Runner = Callable[[Dict[str, Any], Callable[..., None]], Awaitable[Any]]
+
+class JobQueue:
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wake: Optional[asyncio.Event] = None
+
+    async def start(self, runner: Runner) -> None:
+        requeued = await run_io(self.store.requeue_running)
+        if requeued:
+            print(f"[JOBS] re-queued {requeued} interrupted job(s)")
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(runner)) for _ in range(max(1, self.workers))]
+
+    async def stop(self) -> None:
+        # interrupted jobs stay "running" in the store and are re-queued on the next start
+        tasks = self._tasks + list(self._running.values())
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def cancel(self, job_id: str) -> bool:
+        ok = await run_io(self.store.cancel, job_id)
+        task = self._running.get(job_id)
+        if ok and task is not None:
+            task.cancel()
+        return ok
+
+    async def _worker(self, runner: Runner) -> None:
+        last_purge = 0.0
+        while True:
+            # the store is SQLite: every call goes through run_io, off the event loop
+            if time.time() - last_purge > 60:
+                await run_io(self.store.purge_expired)
+                last_purge = time.time()
+            job = await run_io(self.store.claim)
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), JOB_POLL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run(runner, job))
+            self._running[job["id"]] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise   # the worker itself is being stopped
+            finally:
+                self._running.pop(job["id"], None)
+
+    async def _run(self, runner: Runner, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+
+        def progress(stage: Optional[str] = None, done: Optional[int] = None, total: Optional[int] = None) -> None:
+            # called from worker threads too; a cancelled job stops at its next checkpoint
+            if not self.store.progress(job_id, stage, done, total):
+                raise JobCancelled(job_id)
+
+        try:
+            model, pdf = await runner(job, progress)
+            await run_io(self.store.finish, job_id, DONE, model=model, pdf=pdf)
+        except (JobCancelled, asyncio.CancelledError):
+            print(f"[JOBS] {job_id} cancelled")
+        except Exception as e:
+            print(f"[JOBS ERROR] {job_id}: {e}")
+            await run_io(self.store.finish, job_id, FAILED, error=str(e) or type(e).__name__)
+
+job_store = JobStore(JOBS_DB)
+job_queue = JobQueue(job_store)
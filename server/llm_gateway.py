@@ -0,0 +1,266 @@
+import os, time, random, threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+# ---------------------------------------------------------------------
+# Shared LLM gateway: connection pool, rate limits, retries, adaptive
+# concurrency and a circuit breaker in front of every chat call
+# ---------------------------------------------------------------------
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))                  # seconds per HTTP attempt
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+LLM_KEEPALIVE = int(os.getenv("LLM_KEEPALIVE", "32"))
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))                            # requests/min, per process (0 = off)
+LLM_TPM = float(os.getenv("LLM_TPM", "0"))                            # tokens/min, per process (0 = off)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))        # seconds, doubled per attempt
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+LLM_MAX_WAIT = float(os.getenv("LLM_MAX_WAIT", "30"))                 # longest wait for a rate-limit slot
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "32"))           # adaptive concurrency ceiling
+LLM_MIN_INFLIGHT = int(os.getenv("LLM_MIN_INFLIGHT", "2"))            # ... and floor
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))            # consecutive upstream failures that open it
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))         # seconds before a probe call is let through
+
+class LLMUnavailable(Exception):
+    """The gateway refused the call (breaker open / no rate-limit slot in time); use the local fallback."""
+
+def make_http_client() -> "httpx.Client":
+    """One pooled, keep-alive HTTP client shared by every LLM call in the process."""
+    import httpx, openai   # slow imports: deferred until the first client is built
+    return openai.DefaultHttpxClient(
+        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_KEEPALIVE,
+                            keepalive_expiry=30),
+    )
+
+# ---------------------------------------------------------------------
+# Building blocks
+# ---------------------------------------------------------------------
+class TokenBucket:
+    """`rate` units per minute, bursts up to `capacity`. acquire() blocks until they are available."""
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def acquire(self, amount: float, timeout: float) -> bool:
+        amount = min(amount, self.capacity)   # an oversized request still goes through, alone
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return True
+                wait = (amount - self.level) / self.rate
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(min(wait, left))
+
+    def give_back(self, amount: float) -> None:
+        """Return an over-estimate once the real usage is known."""
+        if amount <= 0:
+            return
+        with self._cond:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+            self._cond.notify_all()
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: +1/limit per success, halved on every 429."""
+    def __init__(self, ceiling: int, floor: int):
+        self.ceiling, self.floor = max(1, ceiling), max(1, min(floor, ceiling))
+        self.limit = float(self.ceiling)
+        self.inflight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+            self.inflight += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.limit = min(self.ceiling, self.limit + 1.0 / self.limit)
+            self._cond.notify()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self.limit = max(self.floor, self.limit / 2)
+
+class CircuitBreaker:
+    """closed → open after BREAKER_FAILURES consecutive failures → half-open probe after the cooldown."""
+    def __init__(self, failures: int, cooldown: float):
+        self.threshold, self.cooldown = failures, cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.probing:
+                self.probing = True   # exactly one call tests the upstream
+                return True
+            return False
+
+    def abandon_probe(self) -> None:
+        with self._lock:
+            self.probing = False
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                if self.opened_at is None or self.probing:
+                    print(f"[LLM GATEWAY] upstream unhealthy; circuit open for {self.cooldown:.0f}s")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+# ---------------------------------------------------------------------
+# Gateway
+# ---------------------------------------------------------------------
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+def _classify(exc: Exception) -> str:
+    """'throttled' (429), 'upstream' (5xx / network; counts against the breaker) or 'fatal' (don't retry)."""
+    import httpx, openai   # already loaded by whoever made the call
+    if isinstance(exc, openai.RateLimitError):
+        return "throttled"
+    if isinstance(exc, (openai.APIConnectionError, openai.InternalServerError)):
+        return "upstream"
+    if isinstance(exc, openai.APIStatusError):
+        return "upstream" if getattr(exc, "status_code", 0) >= 500 else "fatal"
+    if isinstance(exc, openai.APIResponseValidationError):
+        return "fatal"
+    # raised while a stream is read: an error event from the server, or the connection dropping
+    if isinstance(exc, (openai.APIError, httpx.TransportError)):
+        return "upstream"
+    return "fatal"
+
+class LLMGateway:
+    def __init__(self):
+        self.rpm = TokenBucket(LLM_RPM) if LLM_RPM > 0 else None
+        self.tpm = TokenBucket(LLM_TPM) if LLM_TPM > 0 else None
+        self.concurrency = AdaptiveLimiter(LLM_MAX_INFLIGHT, LLM_MIN_INFLIGHT)
+        self.breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_COOLDOWN)
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "upstream_errors": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _backoff(self, attempt: int, hint: Optional[float]) -> float:
+        if hint is not None:
+            return min(LLM_BACKOFF_MAX, hint) + random.uniform(0, 0.25)
+        # full jitter
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+    def call(self, fn: Callable[[], Any], tokens: int = 0) -> Any:
+        """
+        Run one upstream call with rate limiting, retries and the breaker.
+        `fn` does the whole exchange, including reading a streamed reply to the end, so
+        the concurrency slot covers it and mid-stream failures are retried too.
+        `tokens` is the estimated prompt + max completion size (for the TPM bucket).
+        Raises LLMUnavailable when the call should fall back to the local path.
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailable("LLM circuit open")
+        last: Optional[Exception] = None
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if (self.rpm and not self.rpm.acquire(1, LLM_MAX_WAIT)) or \
+               (self.tpm and tokens and not self.tpm.acquire(tokens, LLM_MAX_WAIT)) or \
+               not self.concurrency.acquire(LLM_MAX_WAIT):
+                self._count("rejected")
+                self.breaker.abandon_probe()
+                raise LLMUnavailable("LLM rate limit: no slot within LLM_MAX_WAIT")
+            self._count("calls")
+            try:
+                result = fn()
+            except Exception as e:
+                kind = _classify(e)
+                if kind == "fatal":
+                    self.breaker.success()   # the upstream answered; the request itself was bad
+                    raise
+                last = e
+                if kind == "throttled":
+                    # busy, not broken: the breaker only counts 5xx / network failures
+                    self._count("throttled")
+                    self.breaker.success()
+                    self.concurrency.on_throttle()
+                else:
+                    self._count("upstream_errors")
+                    self.breaker.failure()
+                    if not self.breaker.allow():
+                        raise LLMUnavailable("LLM circuit open") from e
+                if attempt == LLM_MAX_RETRIES:
+                    break
+                self._count("retries")
+                time.sleep(self._backoff(attempt, _retry_after(e)))
+                continue
+            finally:
+                self.concurrency.release()
+            self.breaker.success()
+            self.concurrency.on_success()
+            return result
+        raise last
+
+    def settle_tokens(self, estimated: int, used: int) -> None:
+        if self.tpm is not None:
+            self.tpm.give_back(estimated - used)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.stats)
+        out["breaker"] = self.breaker.state
+        out["concurrency_limit"] = round(self.concurrency.limit, 2)
+        out["inflight"] = self.concurrency.inflight
+        return out
+
+gateway = LLMGateway()
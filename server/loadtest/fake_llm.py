@@ -0,0 +1,213 @@
+"""
+Local stand-in for the OpenAI chat-completions API (stdlib only, fully offline).
+
+    python loadtest/fake_llm.py --port 9100 --latency lognormal:0.8,0.5 --error-rate 0.02
+    LLM_BASE_URL=http://127.0.0.1:9100/v1 uvicorn main:app
+
+Replies follow the prompts tailoring.py sends: bullet rewrites echo the original
+bullets with a few JD keywords woven in, coverage repairs append the requested
+keywords, summaries are two sentences, JSON-mode batch prompts get
+{"entries": ..., "summary": ...}. Streaming (stream=true) is
+served as SSE chunks, ending with a usage chunk when stream_options.include_usage
+is set.
+"""
+import re, sys, json, math, time, uuid, random, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Latency distributions: "fixed:S", "uniform:A,B", "normal:MU,SIGMA",
+# "lognormal:MEDIAN,SIGMA", "exp:MEAN" (seconds)
+# ---------------------------------------------------------------------
+def parse_latency(spec: str) -> Callable[[], float]:
+    name, _, raw = spec.partition(":")
+    args = [float(a) for a in raw.split(",") if a]
+    if name == "fixed":
+        return lambda: args[0]
+    if name == "uniform":
+        return lambda: random.uniform(args[0], args[1])
+    if name == "normal":
+        return lambda: max(0.0, random.gauss(args[0], args[1]))
+    if name == "lognormal":
+        return lambda: random.lognormvariate(math.log(args[0]), args[1])
+    if name == "exp":
+        return lambda: random.expovariate(1.0 / args[0])
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+def parse_weights(spec: str) -> List[Tuple[str, float]]:
+    """"normal=0.9,malformed=0.1" → [(shape, weight)]; a bare name means weight 1."""
+    out = []
+    for part in spec.split(","):
+        name, _, w = part.partition("=")
+        out.append((name.strip(), float(w) if w else 1.0))
+    return out
+
+SHAPES = ("normal", "short", "empty", "malformed")
+
+# ---------------------------------------------------------------------
+# Reply generation
+# ---------------------------------------------------------------------
+def _keywords(prompt: str) -> List[str]:
+    m = re.search(r"^Critical keywords to include when relevant: (.*)$", prompt, re.M)
+    return [k.strip() for k in m.group(1).split(",") if k.strip()] if m else []
+
+def _rewrite(bullet: str, kw: List[str], i: int) -> str:
+    extra = ", ".join(kw[i * 2:i * 2 + 2])
+    return f"{bullet.rstrip('.')} applying {extra}" if extra else bullet
+
+def reply_text(prompt: str, json_mode: bool, shape: str) -> str:
+    if shape == "empty":
+        return ""
+    if shape == "malformed":
+        return '{"entries": {"exp-0": ["trunc' if json_mode else "Sure! Here are your bullets:"
+    kw = _keywords(prompt)
+    summary = "Software engineer with hands-on experience in " + ", ".join(kw[:4] or ["backend systems"]) + \
+              ". Ships reliable, well-tested services and collaborates across teams."
+    if json_mode:
+        entries: Dict[str, List[str]] = {}
+        key = None
+        for ln in prompt.split("Entries:", 1)[-1].splitlines():
+            m = re.match(r"^\[([a-z]+-\d+)\]", ln)
+            if m:
+                key = m.group(1)
+                entries[key] = []
+            elif key and ln.startswith("- "):
+                entries[key].append(_rewrite(ln[2:], kw, len(entries[key])))
+        if shape == "short":
+            entries = dict(list(entries.items())[: max(1, len(entries) // 2)])
+        return json.dumps({"entries": entries, "summary": summary})
+    repairs = re.findall(r"^\[(\d+)\] (.*)\n\s+keywords: (.*)$", prompt, re.M)
+    if repairs:
+        if shape == "short":
+            repairs = repairs[:1]
+        return "\n".join(f"[{n}] {b.rstrip('.')}, using {kws.replace(', ', ' and ')}" for n, b, kws in repairs)
+    if "Original bullets:" in prompt:
+        bullets = re.findall(r"^- (.*)$", prompt.split("Original bullets:", 1)[1], re.M)
+        if shape == "short":
+            bullets = bullets[:1]
+        return "\n".join(f"- {_rewrite(b, kw, i)}" for i, b in enumerate(bullets))
+    return summary
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+# ---------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def add(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+def make_handler(args: argparse.Namespace, stats: Stats):
+    latency = parse_latency(args.latency)
+    shapes = parse_weights(args.shape)
+    statuses = [int(s) for s in args.error_status.split(",")]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a: Any) -> None:
+            if args.verbose:
+                super().log_message(*a)
+
+        def _json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/stats"):
+                with stats.lock:
+                    return self._json(200, dict(stats.counts))
+            self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._json(404, {"error": {"message": "not found"}})
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            prompt = (req.get("messages") or [{}])[-1].get("content", "")
+            json_mode = (req.get("response_format") or {}).get("type") == "json_object"
+
+            time.sleep(latency())
+            if random.random() < args.error_rate:
+                status = random.choice(statuses)
+                stats.add(f"error_{status}")
+                headers = {"Retry-After": str(args.retry_after)} if status == 429 else {}
+                return self._json(status, {"error": {"message": "injected failure", "type": "fake_llm"}}, headers)
+
+            shape = random.choices([s for s, _ in shapes], [w for _, w in shapes])[0]
+            stats.add(shape)
+            text = reply_text(prompt, json_mode, shape)
+            usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(text),
+                     "total_tokens": _tokens(prompt) + _tokens(text)}
+            # output is "generated" at --tokens-per-sec
+            gen = usage["completion_tokens"] / args.tokens_per_sec if args.tokens_per_sec > 0 else 0.0
+            base = {"id": "chatcmpl-" + uuid.uuid4().hex[:12], "created": int(time.time()), "model": req.get("model", "fake")}
+
+            if not req.get("stream"):
+                time.sleep(gen)
+                return self._json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                    {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}]})
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            # stream_options.include_usage: every chunk carries "usage": null, then one
+            # last chunk with no choices carries the totals (as OpenAI sends it)
+            include_usage = bool((req.get("stream_options") or {}).get("include_usage"))
+            extra = {"usage": None} if include_usage else {}
+            pieces = re.findall(r"\S+\s*", text) or [""]
+            for i, piece in enumerate(pieces):
+                time.sleep(gen / len(pieces))
+                chunk = {**base, "object": "chat.completion.chunk", **extra, "choices": [
+                    {"index": 0, "delta": {"content": piece}, "finish_reason": "stop" if i == len(pieces) - 1 else None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            if include_usage:
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+def main(argv: List[str] = None) -> None:
+    p = argparse.ArgumentParser(description="Fake OpenAI chat-completions server for load tests")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=9100)
+    p.add_argument("--latency", default="lognormal:0.8,0.5", help="time to first token, e.g. fixed:0.5, uniform:0.2,2")
+    p.add_argument("--tokens-per-sec", type=float, default=80, help="output generation speed (0 = instant)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls that fail")
+    p.add_argument("--error-status", default="500,429", help="statuses used for injected failures")
+    p.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    p.add_argument("--shape", default="normal", help=f"reply shapes with weights, from {', '.join(SHAPES)}; e.g. normal=0.9,malformed=0.1")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--verbose", action="store_true")
+    args = p.parse_args(argv)
+    for name, _ in parse_weights(args.shape):
+        if name not in SHAPES:
+            p.error(f"unknown shape: {name}")
+    parse_latency(args.latency)
+    random.seed(args.seed)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args, Stats()))
+    server.daemon_threads = True
+    print(f"fake LLM on http://{args.host}:{args.port}/v1  (latency={args.latency}, errors={args.error_rate}, shape={args.shape})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,77 +1,535 @@
-import os
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+import os, time, json, asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, UploadFile, File, Body, HTTPException
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from tempfile import NamedTemporaryFile
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 load_dotenv()
-import os
-print("🔍 OPENAI_API_KEY loaded:", bool(os.getenv("OPENAI_API_KEY")))
 
-
-from parsers import read_text
+from documents import aload_text, aload_resume, document_cache, upload_digest
 from extractor import extract_keywords   # keep this for jd_skills/keywords seed
-from tailoring import build_tailored_model
-from pdf_builder import build_pdf
+from tailoring import build_tailored_model, EventFn
+from cache import rewrite_cache
+import workers
+from workers import run_io, run_cpu, gate, Overloaded
+from jobs import job_store, job_queue, JOB_MAX_QUEUED
+from llm_gateway import gateway
+from singleflight import flights, request_key
+from warmup import warmup, WARMUP
+from model_store import model_store, apply_edits
+from uploads import BodyLimit, read_upload, read_uploads, check_upload, REQUEST_MAX_BYTES
+import telemetry
+from telemetry import span
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # accept connections (and health checks) at once; heavy modules load in the background
+    warm = asyncio.create_task(warmup.run()) if WARMUP else warmup.skip()
+    await job_queue.start(_run_job)
+    # expired rewrites left by earlier runs; later ones are swept every cache.PURGE_EVERY writes
+    sweep = asyncio.create_task(run_io(rewrite_cache.purge_expired))
+    yield
+    sweep.cancel()
+    if warm is not None:
+        warm.cancel()
+    await job_queue.stop()
+    workers.shutdown()
 
-app = FastAPI(title="ATS Resume Tailor API")
+app = FastAPI(title="ATS Resume Tailor API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Model-Id"],
 )
+# oversized bodies are cut off while they arrive, chunked or not. Added before the
+# @app.middleware functions so it runs inside them: its 413 is raised straight into
+# the body read instead of through BaseHTTPMiddleware's receive task group
+app.add_middleware(BodyLimit, max_bytes=REQUEST_MAX_BYTES)
 
-def _read_seed(path: str) -> List[str]:
-    if not os.path.exists(path):
-        return []
-    with open(path, "r", encoding="utf-8") as f:
-        return [ln.strip() for ln in f if ln.strip()]
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # streamed responses are timed up to their headers; the body is not included
+    trace = telemetry.start_trace()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        telemetry.REQUESTS.inc(route=path, method=request.method, status=status)
+        telemetry.REQUEST_SECONDS.observe(time.perf_counter() - trace.started, route=path)
+    if telemetry.TIMING_HEADER or request.headers.get("x-timing") == "1":
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
 
-@app.post("/api/tailor")
-async def tailor_resume(jd: UploadFile = File(...), resume: UploadFile = File(...)):
-    jd_bytes = await jd.read()
-    res_bytes = await resume.read()
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    # fail fast instead of queueing unbounded latency
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": str(exc.retry_after)})
 
-    _, jd_text = read_text(jd.filename, jd_bytes)
-    _, res_text = read_text(resume.filename, res_bytes)
+# how many JDs of one /api/tailor/batch request are tailored at the same time
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_JDS = int(os.getenv("BATCH_MAX_JDS", "50"))
 
-    if not jd_text.strip():
-        raise HTTPException(400, "Could not parse JD text")
-    if not res_text.strip():
-        raise HTTPException(400, "Could not parse resume text")
+def _tailor_text(res_text: str, parsed: Dict[str, Any], jd_text: str, use_cache: bool = True,
+                 on_event: Optional[EventFn] = None, stream_tokens: bool = False,
+                 base_model_id: Optional[str] = None) -> Dict[str, Any]:
+    """Tailor and store the model; base_model_id (an earlier model_id) reuses its unchanged entries."""
+    # blocking throughout: callers run it with run_io, so the model_store reads and writes
+    # (SQLite + zlib) below happen in that worker thread, not on the event loop
+    with span("extract_keywords"):
+        info = extract_keywords(jd_text, k=25)   # seed boost comes from the skill taxonomy
+    reuse = model_store.reuse(base_model_id) if base_model_id else None
+    model = build_tailored_model(res_text, info["skills"], info["keywords"], jd_text,
+                                 use_cache=use_cache, parsed=parsed,
+                                 on_event=on_event, stream_tokens=stream_tokens, reuse=reuse)
+    if base_model_id and reuse is None:
+        # unknown or expired: everything was tailored from scratch
+        model["meta"]["incremental"] = {"base_model_id": base_model_id, "base_found": False}
+    model["model_id"] = model_store.save(model, parsed, jd_text)
+    return model
 
-    # keep extractor for a good seed set into LLM + verification
-    skills_seed = _read_seed(os.path.join(os.path.dirname(__file__), "skills_seed.txt"))
-    info = extract_keywords(jd_text, skills_seed, k=25)   # {'skills': [...], 'keywords': [...]}
+async def _render(model: Dict[str, Any]) -> bytes:
+    # timed here: rendering runs in the CPU process pool
+    from pdf_builder import render_pdf   # ReportLab is slow to import; loaded by the warm-up or here
+    with span("build_pdf"):
+        return await run_cpu(render_pdf, model)
 
-    model = build_tailored_model(res_text, info["skills"], info["keywords"], jd_text)
+PDF_CHUNK = 64 * 1024
 
-    tmp = NamedTemporaryFile(delete=False, suffix=".pdf")
-    tmp.close()
-    build_pdf(model, tmp.name)
-    f = open(tmp.name, "rb")
+def _pdf_response(pdf: bytes, filename: str = "tailored_resume.pdf", model_id: Optional[str] = None) -> StreamingResponse:
+    # rendered in memory: stream it out in chunks, nothing to clean up on disk
+    view = memoryview(pdf)
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Content-Length": str(len(pdf)),
+    }
+    if model_id:
+        headers["X-Model-Id"] = model_id   # pass back as base_model_id to re-tailor incrementally
     return StreamingResponse(
-        f,
+        (bytes(view[i:i + PDF_CHUNK]) for i in range(0, len(view), PDF_CHUNK)),
         media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=tailored_resume.pdf"}
+        headers=headers,
     )
+
+@app.post("/api/tailor")
+async def tailor_resume(jd: UploadFile = File(...), resume: UploadFile = File(...), nocache: bool = False,
+                        base_model_id: Optional[str] = None):
+    jd_bytes, res_bytes = await read_uploads(jd, resume)
+
+    async def compute() -> Tuple[bytes, str]:
+        # only the leader of a flight takes an admission slot; followers just wait on its result
+        async with gate:
+            jd_text = await aload_text(jd.filename, jd_bytes)
+            res_text, parsed = await aload_resume(resume.filename, res_bytes)
+
+            if not jd_text.strip():
+                raise HTTPException(400, "Could not parse JD text")
+            if not res_text.strip():
+                raise HTTPException(400, "Could not parse resume text")
+
+            # extractor seeds jd_skills/keywords for the LLM + verification
+            model = await run_io(_tailor_text, res_text, parsed, jd_text, use_cache=not nocache,
+                                 base_model_id=base_model_id)
+
+            return await _render(model), model["model_id"]
+
+    key = request_key("tailor", {"jd": (jd.filename, jd_bytes), "resume": (resume.filename, res_bytes)},
+                      nocache=nocache, base_model_id=base_model_id)
+    pdf, model_id = await flights.do(key, compute)
+    return _pdf_response(pdf, model_id=model_id)
+
 @app.post("/api/preview")
-async def preview_resume(jd: UploadFile = File(...), resume: UploadFile = File(...)):
-    jd_bytes = await jd.read()
-    res_bytes = await resume.read()
+async def preview_resume(jd: UploadFile = File(...), resume: UploadFile = File(...), nocache: bool = False,
+                         base_model_id: Optional[str] = None):
+    jd_bytes, res_bytes = await read_uploads(jd, resume)
 
-    _, jd_text = read_text(jd.filename, jd_bytes)
-    _, res_text = read_text(resume.filename, res_bytes)
+    async def compute() -> Dict[str, Any]:
+        async with gate:
+            jd_text = await aload_text(jd.filename, jd_bytes)
+            res_text, parsed = await aload_resume(resume.filename, res_bytes)
 
-    if not jd_text.strip() or not res_text.strip():
-        raise HTTPException(400, "Invalid or empty file content")
+            if not jd_text.strip() or not res_text.strip():
+                raise HTTPException(400, "Invalid or empty file content")
+
+            return await run_io(_tailor_text, res_text, parsed, jd_text, use_cache=not nocache,
+                                base_model_id=base_model_id)
 
-    skills_seed = _read_seed(os.path.join(os.path.dirname(__file__), "skills_seed.txt"))
-    info = extract_keywords(jd_text, skills_seed, k=25)
-    model = build_tailored_model(res_text, info["skills"], info["keywords"], jd_text)
+    key = request_key("preview", {"jd": (jd.filename, jd_bytes), "resume": (resume.filename, res_bytes)},
+                      nocache=nocache, base_model_id=base_model_id)
+    model = await flights.do(key, compute)
 
     # Return JSON model for preview
     return model
 
+class GatedStreamingResponse(StreamingResponse):
+    """
+    A streamed response that owns an admission slot: it is released when the
+    response finishes sending, fails, or is cancelled (client gone), even if the
+    body generator never started and so never reaches its own `finally`.
+    """
+    def __init__(self, content: Any, release: Callable[[], None], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/preview/stream")
+async def preview_stream(jd: UploadFile = File(...), resume: UploadFile = File(...),
+                         nocache: bool = False, tokens: bool = False, base_model_id: Optional[str] = None):
+    """
+    Server-Sent Events version of /api/preview: `skeleton` (parsed resume, empty
+    bullets) comes first, then one `entry` per rewritten section entry and a
+    `summary` as each is ready, and finally `done` with the full model (or `error`).
+    tokens=true also streams `token` deltas while each rewrite is being generated.
+    """
+    await gate.acquire()
+    try:
+        jd_bytes, res_bytes = await read_uploads(jd, resume)
+        jd_text = await aload_text(jd.filename, jd_bytes)
+        res_text, parsed = await aload_resume(resume.filename, res_bytes)
+        if not jd_text.strip() or not res_text.strip():
+            raise HTTPException(400, "Invalid or empty file content")
+    except BaseException:
+        gate.release()
+        raise
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_event(kind: str, payload: Dict[str, Any]) -> None:
+        # called from worker threads
+        loop.call_soon_threadsafe(queue.put_nowait, (kind, payload))
+
+    async def tailor() -> None:
+        try:
+            model = await run_io(_tailor_text, res_text, parsed, jd_text, not nocache, on_event, tokens,
+                                 base_model_id)
+            queue.put_nowait(("done", model))
+        except Exception as e:
+            print(f"[STREAM ERROR] {e}")
+            queue.put_nowait(("error", {"detail": str(e) or type(e).__name__}))
+
+    async def events():
+        task = asyncio.create_task(tailor())
+        try:
+            while True:
+                kind, payload = await queue.get()
+                yield _sse(kind, payload)
+                if kind in ("done", "error"):
+                    break
+        finally:
+            task.cancel()
+
+    return GatedStreamingResponse(events(), gate.release, media_type="text/event-stream",
+                                  headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/api/tailor/batch")
+async def tailor_batch(resume: UploadFile = File(...), jds: List[UploadFile] = File(...), nocache: bool = False):
+    """
+    One resume against many JDs. The resume is parsed once; JDs are tailored
+    concurrently (BATCH_CONCURRENCY) and each result is streamed as one NDJSON
+    line as soon as it is ready. A failing JD yields an error line, not a 500.
+    The whole batch holds one admission slot until the stream ends.
+    """
+    if len(jds) > BATCH_MAX_JDS:
+        raise HTTPException(400, f"Too many job descriptions (max {BATCH_MAX_JDS})")
+    await gate.acquire()
+    try:
+        (res_bytes,) = await read_uploads(resume)
+        res_text, parsed = await aload_resume(resume.filename, res_bytes)
+        if not res_text.strip():
+            raise HTTPException(400, "Could not parse resume text")
+        # JDs are checked one by one: a bad JD gets its own error line, the rest still run
+        jd_files: List[Tuple[str, Any]] = []
+        for jd in jds:
+            try:
+                data = await read_upload(jd)
+                check_upload(jd.filename or "upload", data)
+                jd_files.append((jd.filename, data))
+            except HTTPException as e:
+                jd_files.append((jd.filename, e))
+    except BaseException:
+        gate.release()
+        raise
+
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_one(index: int, filename: str, data: Any) -> Dict[str, Any]:
+        if isinstance(data, HTTPException):
+            print(f"[BATCH ERROR] {data.detail}")
+            return {"index": index, "jd": filename, "ok": False, "error": data.detail, "status": data.status_code}
+        async with sem:
+            try:
+                jd_text = await aload_text(filename, data)
+                if not jd_text.strip():
+                    raise ValueError("Could not parse JD text")
+                model = await run_io(_tailor_text, res_text, parsed, jd_text, not nocache)
+                return {"index": index, "jd": filename, "ok": True, "model": model}
+            except Exception as e:
+                print(f"[BATCH ERROR] {filename}: {e}")
+                return {"index": index, "jd": filename, "ok": False, "error": str(e) or type(e).__name__}
+
+    async def lines():
+        tasks = [asyncio.create_task(run_one(i, fn, data)) for i, (fn, data) in enumerate(jd_files)]
+        failed = 0
+        try:
+            for fut in asyncio.as_completed(tasks):
+                item = await fut
+                failed += 0 if item["ok"] else 1
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True, "total": len(tasks), "failed": failed}) + "\n"
+        finally:
+            # client went away: stop tailoring the JDs that have not started yet
+            for t in tasks:
+                t.cancel()
+
+    return GatedStreamingResponse(lines(), gate.release, media_type="application/x-ndjson")
+
+# ---------------------------------------------------------------------
+# Stored models: fetch one, or re-render it as a PDF without the LLM
+# ---------------------------------------------------------------------
+async def _stored_model(model_id: str) -> Dict[str, Any]:
+    model = await run_io(model_store.get, model_id)
+    if model is None:
+        raise HTTPException(404, "Unknown or expired model")
+    return model
+
+@app.get("/api/models/{model_id}")
+async def get_model(model_id: str):
+    return await _stored_model(model_id)
+
+@app.get("/api/models/{model_id}/pdf")
+@app.post("/api/models/{model_id}/pdf")
+async def render_model(model_id: str, edits: Optional[Dict[str, Any]] = Body(None)):
+    """
+    PDF of a model from /api/preview (or any model_id) with no LLM calls. A JSON
+    body replaces top-level fields first, e.g. bullets the user edited in the preview.
+    """
+    model = await _stored_model(model_id)
+    if edits:
+        try:
+            model = apply_edits(model, edits)
+        except ValueError as e:
+            raise HTTPException(422, str(e))
+    async with gate:
+        try:
+            pdf = await _render(model)
+        except Exception as e:
+            if not edits:
+                raise
+            print(f"[RENDER ERROR] {model_id}: {e}")
+            raise HTTPException(422, f"Could not render the edited model: {e}")
+    return _pdf_response(pdf, model_id=model_id)
+
+# ---------------------------------------------------------------------
+# Ranking: a persistent resume corpus scored against one JD (no LLM)
+# ---------------------------------------------------------------------
+RANK_MAX_FILES = int(os.getenv("RANK_MAX_FILES", "500"))   # resumes per /api/rank/index request
+
+def _corpus():
+    # numpy/scipy load on first use (or during warm-up), not at import
+    from ranking import corpus
+    return corpus()
+
+@app.post("/api/rank/index")
+async def rank_index(resumes: List[UploadFile] = File(...)):
+    """
+    Add resumes to the ranking corpus, keyed by the SHA-256 of their content (the
+    doc_id), so two files with the same name are two documents. A file already
+    indexed is skipped; a repeat of another file in the same upload is reported
+    under `duplicates`.
+    """
+    if len(resumes) > RANK_MAX_FILES:
+        raise HTTPException(400, f"Too many resumes (max {RANK_MAX_FILES})")
+    async with gate:
+        blobs = await read_uploads(*resumes)
+        names = [f.filename or f"resume-{i}" for i, f in enumerate(resumes)]
+        shas = [upload_digest(b) for b in blobs]
+        first: Dict[str, str] = {}
+        unique, duplicates = [], []
+        for i, (name, sha) in enumerate(zip(names, shas)):
+            if sha in first:
+                duplicates.append({"name": name, "doc_id": sha, "same_as": first[sha]})
+                continue
+            first[sha] = name
+            unique.append(i)
+        known = await run_io(_corpus().known, [shas[i] for i in unique])
+        todo = [i for i in unique if shas[i] not in known]
+        texts = await asyncio.gather(*(aload_text(names[i], blobs[i]) for i in todo))
+        docs, empty = [], set()
+        for i, text in zip(todo, texts):
+            if text.strip():
+                docs.append((shas[i], names[i], shas[i], text))
+            else:
+                print(f"[RANK ERROR] {names[i]}: no text extracted")
+                empty.add(i)
+        with span("rank_index", files=len(docs)):
+            result = await run_io(_corpus().add, docs)
+    return {"indexed": result["indexed"], "unchanged": len(unique) - len(todo) + result["unchanged"],
+            "duplicates": duplicates, "empty": [names[i] for i in sorted(empty)],
+            "resumes": [{"doc_id": shas[i], "name": names[i]} for i in unique if i not in empty],
+            **await run_io(_corpus().stats)}
+
+@app.get("/api/rank/index")
+async def rank_index_stats():
+    return await run_io(_corpus().stats)
+
+@app.delete("/api/rank/index/{doc_id}")
+async def rank_index_remove(doc_id: str):
+    if not await run_io(_corpus().remove, doc_id):
+        raise HTTPException(404, "Unknown resume")
+    return {"removed": doc_id}
+
+@app.post("/api/rank")
+async def rank(jd: UploadFile = File(...), top_k: Optional[int] = None):
+    """Top-K resumes of the corpus for one JD, each with its matched and missing JD terms."""
+    from ranking import RANK_TOP_K
+    k = top_k if top_k is not None else RANK_TOP_K
+    if k < 1:
+        raise HTTPException(400, "top_k must be at least 1")
+    async with gate:
+        (jd_bytes,) = await read_uploads(jd)
+        jd_text = await aload_text(jd.filename, jd_bytes)
+        if not jd_text.strip():
+            raise HTTPException(400, "Could not parse JD text")
+        t0 = time.perf_counter()
+        with span("rank"):
+            results, info = await run_io(_corpus().rank, jd_text, k)
+    return {**info, "ms": round((time.perf_counter() - t0) * 1000, 1),
+            "results": [r._asdict() for r in results]}
+
+# ---------------------------------------------------------------------
+# Job API: submit → poll → fetch; nothing waits on the HTTP connection
+# ---------------------------------------------------------------------
+JOB_KINDS = ("tailor", "preview")   # tailor → PDF (+ model), preview → model only
+
+async def _run_job(job: Dict[str, Any], progress) -> Any:
+    # progress() writes to the job store: threads call it directly, the loop through run_io
+    await run_io(progress, stage="parsing")
+    jd_text = await aload_text(job["jd_name"], job["jd_data"])
+    res_text, parsed = await aload_resume(job["resume_name"], job["resume_data"])
+    if not jd_text.strip() or not res_text.strip():
+        raise ValueError("Invalid or empty file content")
+
+    done = 0
+    def on_event(kind: str, payload: Dict[str, Any]) -> None:
+        nonlocal done
+        if kind == "skeleton":
+            progress(stage="tailoring", done=0, total=payload["total"])
+        elif kind == "entry":
+            done += 1
+            progress(done=done)
+
+    model = await run_io(_tailor_text, res_text, parsed, jd_text, not job["options"].get("nocache"), on_event,
+                         False, job["options"].get("base_model_id"))
+    pdf = None
+    if job["kind"] == "tailor":
+        await run_io(progress, stage="rendering")
+        pdf = await _render(model)
+    return model, pdf
+
+def _job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    view = {k: job[k] for k in ("id", "kind", "status", "stage", "error", "created", "updated", "expires")}
+    view["progress"] = {"done": job["done"], "total": job["total"]}
+    if job["status"] == "done":
+        view["result_url"] = f"/api/jobs/{job['id']}/result"
+    return view
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(jd: UploadFile = File(...), resume: UploadFile = File(...),
+                     kind: str = "tailor", nocache: bool = False, base_model_id: Optional[str] = None):
+    if kind not in JOB_KINDS:
+        raise HTTPException(400, f"kind must be one of {', '.join(JOB_KINDS)}")
+    if await run_io(job_store.count_queued) >= JOB_MAX_QUEUED:
+        raise Overloaded()
+    jd_bytes, res_bytes = await read_uploads(jd, resume)
+    job = await run_io(job_store.create, kind, jd.filename, jd_bytes, resume.filename, res_bytes,
+                       {"nocache": nocache, "base_model_id": base_model_id})
+    job_queue.notify()
+    return _job_view(job)
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await run_io(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown or expired job")
+    return _job_view(job)
+
+@app.get("/api/jobs/{job_id}/result")
+async def job_result(job_id: str, format: str = "auto"):
+    """PDF for tailor jobs, the JSON model for preview jobs (or ?format=model / ?format=pdf)."""
+    job = await run_io(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown or expired job")
+    if job["status"] != "done":
+        raise HTTPException(409, f"Job is {job['status']}")
+    result = await run_io(job_store.result, job_id)
+    if format == "pdf" or (format == "auto" and result["pdf"] is not None):
+        if result["pdf"] is None:
+            raise HTTPException(404, "This job has no PDF (submit it with kind=tailor)")
+        return _pdf_response(result["pdf"], model_id=(result["model"] or {}).get("model_id"))
+    return result["model"]
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = await run_io(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown or expired job")
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(409, f"Job is already {job['status']}")
+    return _job_view(await run_io(job_store.get, job_id))
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return {
+        "rewrites": rewrite_cache.snapshot(),
+        "documents": {"entries": len(document_cache), "bytes": document_cache.nbytes},
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text format: request/stage latency histograms, LLM call and token counters."""
+    # gauges read the job store (SQLite): rendered off the loop
+    return PlainTextResponse(await run_io(telemetry.render_metrics), media_type="text/plain; version=0.0.4")
+
+telemetry.register_gauge("resume_admission", "Requests holding / waiting for an admission slot",
+                         lambda: {"active": gate.active, "waiting": gate.waiting}, label="state")
+telemetry.register_gauge("resume_rewrite_cache", "Rewrite cache lookups since start",
+                         lambda: {k: rewrite_cache.stats[k] for k in ("memory_hits", "disk_hits", "misses")}, label="result")
+telemetry.register_gauge("resume_document_cache_bytes", "Bytes held by the parsed-document cache",
+                         lambda: {"": document_cache.nbytes})
+telemetry.register_gauge("resume_llm_gateway", "LLM gateway: adaptive concurrency limit, in-flight calls, breaker open (1/0)",
+                         lambda: {"concurrency_limit": gateway.concurrency.limit, "inflight": gateway.concurrency.inflight,
+                                  "breaker_open": float(gateway.breaker.state != "closed")}, label="value")
+telemetry.register_gauge("resume_jobs", "Background jobs in the store by status", job_store.counts, label="status")
+telemetry.register_gauge("resume_singleflight_inflight", "Distinct tailoring computations currently shared by duplicate requests",
+                         lambda: {"": len(flights)})
+
+@app.get("/api/load")
+async def load_stats():
+    return {**gate.snapshot(), "jobs": await run_io(job_store.counts), "llm": gateway.snapshot(), "inflight_flights": len(flights)}
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving (true as soon as the socket is open)."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once the startup warm-up has loaded the slow modules, 503 (with progress) until then."""
+    snap = warmup.snapshot()
+    return JSONResponse(snap, status_code=200 if warmup.ready else 503)
@@ -0,0 +1,122 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Sequence, Tuple
+
+# ---------------------------------------------------------------------
+# Aho-Corasick multi-pattern matcher (case-insensitive)
+# ---------------------------------------------------------------------
+# word mode runs the automaton over tokens, so boundaries come for free and the
+# Python loop is per word instead of per character
+TOKEN_RX = re.compile(r"[a-z0-9_+#]+(?:[./\-'][a-z0-9_+#]+)*")
+
+def _norm(tok: str) -> str:
+    # fold plurals on both sides: "apis" ~ "api", "systems" ~ "system"
+    return tok[:-1] if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss") else tok
+
+def _words(text: str) -> Tuple[List[str], List[int]]:
+    toks, starts = [], []
+    for m in TOKEN_RX.finditer(text):
+        toks.append(_norm(m.group(0)))
+        starts.append(m.start())
+    return toks, starts
+
+class TermMatcher:
+    """
+    Compiled once per term set; one pass over the text reports every term and
+    its start offsets, overlapping matches included ("design" + "design patterns").
+
+    word_boundary=True matches whole words only ("api" does not hit "rapid",
+    but does hit "APIs"); word_boundary=False is plain substring matching.
+    """
+    def __init__(self, terms: Iterable[str], word_boundary: bool = True):
+        self.terms: List[str] = list(dict.fromkeys(t.strip().lower() for t in terms if t and t.strip()))
+        self.word_boundary = word_boundary
+        goto: List[Dict[Hashable, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        self._lens: List[int] = []
+        self.matchable: List[str] = []   # terms with at least one symbol; "—" or "&" can never be found
+        for idx, term in enumerate(self.terms):
+            symbols = _words(term)[0] if word_boundary else term
+            self._lens.append(len(symbols))
+            if symbols:
+                self.matchable.append(term)
+            if not symbols:
+                continue
+            node = 0
+            for sym in symbols:
+                nxt = goto[node].get(sym)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][sym] = nxt
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            out[node] += (idx,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for sym, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and sym not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(sym, 0)
+                out[child] += out[fail[child]]
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """{term: [start offsets in text]} for every term found."""
+        low = (text or "").lower()
+        if self.word_boundary:
+            symbols, starts = _words(low)
+        else:
+            symbols, starts = low, None
+        goto, fail, out, terms, lens = self._goto, self._fail, self._out, self.terms, self._lens
+        hits: Dict[str, List[int]] = {}
+        node = 0
+        for i, sym in enumerate(symbols):
+            while node and sym not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(sym, 0)
+            if out[node]:
+                for idx in out[node]:
+                    first = i - lens[idx] + 1
+                    hits.setdefault(terms[idx], []).append(starts[first] if starts is not None else first)
+        return hits
+
+    def matched(self, text: str) -> List[str]:
+        """Found terms, in term-list order."""
+        hits = self.find_all(text)
+        return [t for t in self.terms if t in hits]
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self.find_all(text))
+
+@lru_cache(maxsize=256)
+def _cached_matcher(terms: Tuple[str, ...], word_boundary: bool) -> TermMatcher:
+    return TermMatcher(terms, word_boundary)
+
+def matcher_for(terms: Sequence[str], word_boundary: bool = True) -> TermMatcher:
+    """Shared compiled matcher for a term list (built once per distinct list)."""
+    return _cached_matcher(tuple(terms), word_boundary)
+
+# ---------------------------------------------------------------------
+# Keyword coverage
+# ---------------------------------------------------------------------
+class Coverage(NamedTuple):
+    ratio: float
+    matched: List[str]
+    missing: List[str]
+
+def coverage(text: str, terms: Sequence[str]) -> Coverage:
+    m = matcher_for(terms)
+    if not m.matchable:
+        return Coverage(1.0, [], [])
+    hits = m.find_all(text)
+    # terms that tokenize to nothing are left out: they would count as missing forever
+    matched = [t for t in m.matchable if t in hits]
+    missing = [t for t in m.matchable if t not in hits]
+    return Coverage(len(matched) / len(m.matchable), matched, missing)
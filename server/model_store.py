@@ -0,0 +1,157 @@
+import os, json, time, uuid, zlib, sqlite3
+from typing import Any, Callable, Dict, Optional
+
+from cache import DATA_DIR
+from tailoring import Reuse, entry_hash, jd_hash
+
+# ---------------------------------------------------------------------
+# Tailored models by id: re-rendered as PDFs without the LLM, and reused
+# when a re-run after a small resume edit only rewrites what changed
+# (see tailoring.Reuse)
+# ---------------------------------------------------------------------
+MODELS_DB = os.getenv("MODELS_DB", os.path.join(DATA_DIR, "models.sqlite3"))
+MODEL_TTL = float(os.getenv("MODEL_TTL", str(7 * 24 * 3600)))   # seconds since a model was last used
+PURGE_EVERY = 100                                               # saves between expiry sweeps
+
+# ---------------------------------------------------------------------
+# Serialization: b"RTM" + schema version byte + zlib(compact JSON)
+# ---------------------------------------------------------------------
+MAGIC = b"RTM"
+SCHEMA_VERSION = 1
+
+def pack_model(model: Dict[str, Any]) -> bytes:
+    body = json.dumps(model, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return MAGIC + bytes([SCHEMA_VERSION]) + zlib.compress(body, 6)
+
+def _decode_v1(body: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(body))
+
+# one decoder per schema version; a new version adds an entry (and a migration if the shape changed)
+_DECODERS: Dict[int, Callable[[bytes], Dict[str, Any]]] = {1: _decode_v1}
+
+def unpack_model(blob: Any) -> Optional[Dict[str, Any]]:
+    """The stored model, or None when it was written in a format this build cannot read."""
+    if isinstance(blob, str):
+        return json.loads(blob)   # rows written as plain JSON text before the binary format
+    if blob[:len(MAGIC)] != MAGIC or len(blob) <= len(MAGIC):
+        return None
+    decode = _DECODERS.get(blob[len(MAGIC)])
+    return decode(blob[len(MAGIC) + 1:]) if decode else None
+
+SECTIONS = (("Work Experience", "experience_entries"), ("Projects", "project_entries"))
+
+class ModelStore:
+    """
+    One row per tailored model: the packed model, the JD hash it was made for,
+    {entry_hash of the parsed entry: rewritten bullets} and the summary.
+    Expiry slides: reading a model keeps it for another MODEL_TTL.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._saves = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS models (
+                id TEXT PRIMARY KEY, jd_hash TEXT NOT NULL, entries TEXT NOT NULL, summary TEXT, model BLOB NOT NULL,
+                created REAL NOT NULL, expires REAL NOT NULL)""")
+
+    def _conn(self) -> sqlite3.Connection:
+        # short-lived connections: safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5)
+
+    def save(self, model: Dict[str, Any], parsed: Dict[str, Any], jd_text: str) -> str:
+        """Store a finished model; `parsed` is the parse_resume() result it was built from."""
+        entries: Dict[str, Any] = {}
+        for section, field in SECTIONS:
+            # entries are never dropped or reordered by tailoring, so positions line up
+            for src, out in zip(parsed.get(field) or [], model.get(field) or []):
+                bullets = out.get("bullets") or []
+                if bullets != (src.get("bullets") or [])[:len(bullets)]:   # kept originals = the rewrite failed
+                    entries[entry_hash(section, src)] = bullets
+        model_id = uuid.uuid4().hex
+        now = time.time()
+        with self._conn() as db:
+            db.execute("""INSERT INTO models (id, jd_hash, entries, summary, model, created, expires)
+                          VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                       (model_id, jd_hash(jd_text), json.dumps(entries, ensure_ascii=False),
+                        (model.get("summary") or [None])[0], pack_model(model), now, now + MODEL_TTL))
+        self._saves += 1
+        if self._saves % PURGE_EVERY == 0:
+            self.purge_expired()
+        return model_id
+
+    def reuse(self, model_id: str) -> Optional[Reuse]:
+        with self._conn() as db:
+            row = db.execute("SELECT jd_hash, entries, summary FROM models WHERE id = ? AND expires >= ?",
+                             (model_id, time.time())).fetchone()
+            if row:
+                db.execute("UPDATE models SET expires = ? WHERE id = ?", (time.time() + MODEL_TTL, model_id))
+        if not row:
+            return None
+        return Reuse(model_id, row[0], json.loads(row[1]), row[2])
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._conn() as db:
+            row = db.execute("SELECT model FROM models WHERE id = ? AND expires >= ?", (model_id, now)).fetchone()
+            if not row:
+                return None
+            db.execute("UPDATE models SET expires = ? WHERE id = ?", (now + MODEL_TTL, model_id))
+        model = unpack_model(row[0])
+        if model is not None:
+            model["model_id"] = model_id
+        return model
+
+    def purge_expired(self) -> int:
+        with self._conn() as db:
+            cur = db.execute("DELETE FROM models WHERE expires < ?", (time.time(),))
+            return cur.rowcount
+
+# ---------------------------------------------------------------------
+# User edits to a stored model (before re-rendering it)
+# ---------------------------------------------------------------------
+def _strings(value: Any, field: str) -> list:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{field} must be a list of strings")
+    return value
+
+def _text(value: Any, field: str) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+def _entries(value: Any, field: str) -> list:
+    if not isinstance(value, list):
+        raise ValueError(f"{field} must be a list of entries")
+    out = []
+    for i, e in enumerate(value):
+        if not isinstance(e, dict):
+            raise ValueError(f"{field}[{i}] must be an object")
+        out.append({"header": _text(e.get("header", ""), f"{field}[{i}].header"),
+                    "dates": _text(e.get("dates", ""), f"{field}[{i}].dates"),
+                    "bullets": _strings(e.get("bullets", []), f"{field}[{i}].bullets")})
+    return out
+
+def _grouped(value: Any, field: str) -> Dict[str, list]:
+    if not isinstance(value, dict):
+        raise ValueError(f"{field} must be an object of lists")
+    return {_text(k, field): _strings(v, f"{field}.{k}") for k, v in value.items()}
+
+EDITABLE: Dict[str, Callable[[Any, str], Any]] = {
+    "name": _text, "contact": _text, "summary": _strings, "skills": _strings, "skills_grouped": _grouped,
+    "experience_entries": _entries, "project_entries": _entries, "education": _strings,
+}
+
+def apply_edits(model: Dict[str, Any], edits: Dict[str, Any]) -> Dict[str, Any]:
+    """The model with edited top-level fields replaced; ValueError on unknown fields or wrong shapes."""
+    unknown = set(edits) - set(EDITABLE) - {"model_id", "meta"}
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    out = dict(model)
+    for field, check in EDITABLE.items():
+        if field in edits:
+            out[field] = check(edits[field], field)
+    return out
+
+model_store = ModelStore(MODELS_DB)
@@ -1,26 +1,102 @@
-from io import BytesIO
-from typing import Tuple
-from pdfminer.high_level import extract_text as pdf_extract_text
-from docx import Document
+import os, time, zipfile
+from io import BytesIO, StringIO
+from typing import Any, List, Optional, Tuple
 
-import tempfile
-from pdfminer.high_level import extract_text as pdf_extract_text
+# ─────────────────────────────────────────────────────────────────────────────
+# PDF extraction: in-memory, page-capped, time-budgeted
+# ─────────────────────────────────────────────────────────────────────────────
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))              # pages beyond this are ignored
+PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", "20"))        # seconds per document (0 = unlimited)
+PDF_CHUNK_PAGES = int(os.getenv("PDF_CHUNK_PAGES", "2"))           # pages per parallel work item
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")                     # auto | pymupdf | pdfminer
 
-def _from_pdf(data: bytes) -> str:
+_fitz: Any = None   # PyMuPDF module, imported on first use; False when not installed
+
+def _pymupdf() -> Any:
+    global _fitz
+    if _fitz is None:
+        try:
+            import fitz  # PyMuPDF: optional, much faster than pdfminer
+            _fitz = fitz
+        except ImportError:
+            _fitz = False
+    return _fitz or None
+
+def use_pymupdf() -> bool:
+    return PDF_BACKEND in ("auto", "pymupdf") and _pymupdf() is not None
+
+def pdf_deadline() -> Optional[float]:
+    return time.time() + PDF_TIME_BUDGET if PDF_TIME_BUDGET > 0 else None
+
+def _over(deadline: Optional[float]) -> bool:
+    if deadline is not None and time.time() > deadline:
+        print("[PDF] time budget exhausted; returning the pages extracted so far")
+        return True
+    return False
+
+def pdf_page_count(data: bytes) -> int:
+    """Number of pages that will be extracted (already capped at PDF_MAX_PAGES)."""
+    try:
+        if use_pymupdf():
+            with _pymupdf().open(stream=data, filetype="pdf") as doc:
+                return min(doc.page_count, PDF_MAX_PAGES)
+        from pdfminer.pdfpage import PDFPage
+        return sum(1 for _ in PDFPage.get_pages(BytesIO(data), maxpages=PDF_MAX_PAGES))
+    except Exception as e:
+        print(f"[PDF ERROR] {e}")
+        return 0
+
+def pdf_page_chunks(n_pages: int) -> List[List[int]]:
+    """Split pages 0..n-1 into work items; short documents stay a single item."""
+    if n_pages < PDF_PARALLEL_MIN_PAGES:
+        return [list(range(n_pages))] if n_pages else []
+    step = max(1, PDF_CHUNK_PAGES)
+    return [list(range(i, min(i + step, n_pages))) for i in range(0, n_pages, step)]
+
+def extract_pdf_pages(data: bytes, pages: Optional[List[int]] = None, deadline: Optional[float] = None) -> str:
+    """
+    Text of the given 0-based pages (all pages up to the cap if None), parsed from memory.
+    Stops early once `deadline` passes. Top-level so it can run in a process pool.
+    """
+    wanted = set(pages) if pages is not None else None
     try:
-        # Write PDF bytes to a temporary file because pdfminer expects a file path
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(data)
-            tmp.flush()
-            text = pdf_extract_text(tmp.name) or ""
-        return text
+        if use_pymupdf():
+            parts = []
+            with _pymupdf().open(stream=data, filetype="pdf") as doc:
+                for i in range(min(doc.page_count, PDF_MAX_PAGES)):
+                    if wanted is not None and i not in wanted:
+                        continue
+                    if _over(deadline):
+                        break
+                    parts.append(doc.load_page(i).get_text("text"))
+            return "".join(parts)
+
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+        from pdfminer.pdfpage import PDFPage
+        out = StringIO()
+        rsrc = PDFResourceManager(caching=True)
+        # same pipeline as pdfminer.high_level.extract_text, one page at a time
+        with TextConverter(rsrc, out, codec="utf-8", laparams=LAParams()) as device:
+            interpreter = PDFPageInterpreter(rsrc, device)
+            for page in PDFPage.get_pages(BytesIO(data), pagenos=wanted, maxpages=PDF_MAX_PAGES):
+                if _over(deadline):
+                    break
+                interpreter.process_page(page)
+        return out.getvalue()
     except Exception as e:
         print(f"[PDF ERROR] {e}")
         return ""
 
+def _from_pdf(data: bytes) -> str:
+    return extract_pdf_pages(data, None, pdf_deadline())
+
 
 def _from_docx(data: bytes) -> str:
     try:
+        from docx import Document   # deferred: python-docx is only needed for .docx uploads
         bio = BytesIO(data)
         doc = Document(bio)
         return "\n".join(p.text for p in doc.paragraphs)
@@ -34,16 +110,54 @@ def _from_txt(data: bytes) -> str:
     except UnicodeDecodeError:
         return data.decode("latin-1", errors="ignore")
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Type detection: magic bytes decide the parser, not the file name
+# ─────────────────────────────────────────────────────────────────────────────
+TEXT_SAMPLE = 8192
+
+def _looks_like_text(sample: bytes) -> bool:
+    if b"\x00" in sample:
+        return False
+    control = sum(1 for b in sample if b < 9 or 13 < b < 32)
+    return control <= len(sample) * 0.02
+
+PDF_HEADER_SLACK = 8   # leading bytes tolerated before %PDF- (a text file may just mention it)
+
+def sniff_kind(data: bytes) -> str:
+    """'pdf', 'docx', 'txt' or 'unknown', from the content alone."""
+    head = data[:1024]
+    if b"%PDF-" in head[:PDF_HEADER_SLACK + 5]:   # at the start, or after a BOM / a few junk bytes
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(BytesIO(data)) as z:
+                return "docx" if "word/document.xml" in z.namelist() else "unknown"
+        except zipfile.BadZipFile:
+            return "unknown"
+    return "txt" if _looks_like_text(data[:TEXT_SAMPLE]) else "unknown"
+
+def file_kind(filename: str) -> str:
+    lower = (filename or "").lower()
+    if lower.endswith(".pdf"):
+        return "pdf"
+    if lower.endswith(".docx"):
+        return "docx"
+    if lower.endswith(".txt") or lower.endswith(".md"):
+        return "txt"
+    return "unknown"
+
 def read_text(filename: str, data: bytes) -> Tuple[str, str]:
     """
     Read text directly from PDF, DOCX, or TXT without temp files.
-    Works cross-platform.
+    Works cross-platform. The parser follows the content (sniff_kind), so a
+    mislabeled upload is still read correctly and binary junk yields ("unknown", "").
     """
-    lower = filename.lower()
-    if lower.endswith(".pdf"):
+    kind = sniff_kind(data)
+    if kind == "pdf":
         return ("pdf", _from_pdf(data))
-    if lower.endswith(".docx"):
+    if kind == "docx":
         return ("docx", _from_docx(data))
-    if lower.endswith(".txt") or lower.endswith(".md"):
+    if kind == "txt":
         return ("txt", _from_txt(data))
-    return ("unknown", _from_txt(data))
+    print(f"[PARSE ERROR] {filename}: unrecognised file content")
+    return (kind, "")
@@ -1,3 +1,5 @@
+from io import BytesIO
+from typing import Dict, Optional
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import (
@@ -6,6 +8,7 @@ from reportlab.platypus import (
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+from skills import CATEGORY_ORDER
 
 def _style(name, parent, size, bold=False, align=TA_LEFT, before=2, after=2, leading=None, keep=False):
     s = ParagraphStyle(
@@ -23,21 +26,47 @@ def _style(name, parent, size, bold=False, align=TA_LEFT, before=2, after=2, lea
     s.keepWithNext = keep
     return s
 
+# Styles are immutable once built, so they are compiled once per process and shared
+_STYLES: Optional[Dict[str, ParagraphStyle]] = None
+
+def _styles() -> Dict[str, ParagraphStyle]:
+    global _STYLES
+    if _STYLES is None:
+        S = getSampleStyleSheet()
+        _STYLES = {
+            "H1":      _style("H1",   S["Normal"], 16.5, bold=True, align=TA_CENTER, before=0, after=2),
+            "H2":      _style("H2",   S["Normal"], 11.7, bold=True, keep=True, before=10, after=4),
+            "H3":      _style("H3",   S["Normal"], 10.7, bold=True, before=2, after=1),
+            "DATE":    _style("DATE", S["Normal"], 10,   bold=False, align=TA_RIGHT, before=0, after=2),
+            "BODY":    _style("BODY", S["Normal"], 10.1, bold=False, before=0, after=0, leading=12),
+            "Contact": _style("Contact", S["Normal"], 9.8, align=TA_CENTER, before=0, after=6),
+        }
+    return _STYLES
+
+HEADER_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('ALIGN',  (0,0), (0,0), 'LEFT'),
+    ('ALIGN',  (1,0), (1,0), 'RIGHT'),
+    ('LEFTPADDING', (0,0), (-1,-1), 0),
+    ('RIGHTPADDING',(0,0), (-1,-1), 0),
+    ('TOPPADDING',  (0,0), (-1,-1), 0),
+    ('BOTTOMPADDING',(0,0), (-1,-1), 0),
+])
+
 def _two_col_header(header_left: str, header_right: str, H3, DATE):
     data = [[Paragraph(header_left or "", H3), Paragraph(header_right or "", DATE)]]
     t = Table(data, colWidths=["* ", 1.9*inch])
-    t.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN',  (0,0), (0,0), 'LEFT'),
-        ('ALIGN',  (1,0), (1,0), 'RIGHT'),
-        ('LEFTPADDING', (0,0), (-1,-1), 0),
-        ('RIGHTPADDING',(0,0), (-1,-1), 0),
-        ('TOPPADDING',  (0,0), (-1,-1), 0),
-        ('BOTTOMPADDING',(0,0), (-1,-1), 0),
-    ]))
+    t.setStyle(HEADER_TABLE_STYLE)
     return t
 
-def build_pdf(model: dict, out_path: str):
+def render_pdf(model: dict) -> bytes:
+    """Render the resume into memory and return the PDF bytes (no temp files)."""
+    buf = BytesIO()
+    build_pdf(model, buf)
+    return buf.getvalue()
+
+def build_pdf(model: dict, out_path):
+    """`out_path` may be a filesystem path or a writable binary file-like object."""
     doc = SimpleDocTemplate(
         out_path,
         pagesize=LETTER,
@@ -47,16 +76,12 @@ def build_pdf(model: dict, out_path: str):
         rightMargin=0.65 * inch,
     )
 
-    S = getSampleStyleSheet()
-    H1   = _style("H1",   S["Normal"], 16.5, bold=True, align=TA_CENTER, before=0, after=2)
-    H2   = _style("H2",   S["Normal"], 11.7, bold=True, keep=True, before=10, after=4)
-    H3   = _style("H3",   S["Normal"], 10.7, bold=True, before=2, after=1)
-    DATE = _style("DATE", S["Normal"], 10,   bold=False, align=TA_RIGHT, before=0, after=2)
-    BODY = _style("BODY", S["Normal"], 10.1, bold=False, before=0, after=0, leading=12)
+    st = _styles()
+    H1, H2, H3, DATE, BODY = st["H1"], st["H2"], st["H3"], st["DATE"], st["BODY"]
 
     flow = []
     flow.append(Paragraph(f"<b>{model.get('name','Your Name')}</b>", H1))
-    flow.append(Paragraph(model.get("contact",""), _style("Contact", S["Normal"], 9.8, align=TA_CENTER, before=0, after=6)))
+    flow.append(Paragraph(model.get("contact",""), st["Contact"]))
     flow.append(HRFlowable(width="100%", thickness=1, color="#444", spaceBefore=2, spaceAfter=8))
 
     def bullets(items):
@@ -77,8 +102,7 @@ def build_pdf(model: dict, out_path: str):
     if grouped or flat:
         flow.append(Paragraph("SKILLS", H2))
         if grouped:
-            order = ["Languages","Frameworks & Libraries","Data & Cloud","DevOps","Design & Tools","Soft Skills","Other"]
-            for k in order:
+            for k in CATEGORY_ORDER:
                 if k in grouped and grouped[k]:
                     line = f"<b>{k}:</b> " + ", ".join(grouped[k])
                     flow.append(Paragraph(line, BODY))
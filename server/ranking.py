@@ -0,0 +1,239 @@
+import os, time, sqlite3, threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from budget import content_sentences
+from cache import DATA_DIR
+from terms import SKILL_RX, count_clause_terms, count_terms, most_frequent, tokenize
+from skills import get_index
+from matcher import matcher_for
+from tailoring import CRITICAL_CANDIDATES, extract_critical_terms
+
+# ---------------------------------------------------------------------
+# Resume ranking: a persistent corpus index (resume × term presence,
+# unigrams + bigrams + canonical skills) scored against a JD in one
+# sparse matrix-vector product
+# ---------------------------------------------------------------------
+RANK_DB = os.getenv("RANK_DB", os.path.join(DATA_DIR, "rank.sqlite3"))
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "20"))
+CRITICAL_WEIGHT = 2.0     # JD terms from CRITICAL_CANDIDATES
+SKILL_WEIGHT = 1.5        # JD terms that are taxonomy skills
+JD_TERMS = 100            # top JD terms in the query
+
+def _phrases() -> Tuple[str, ...]:
+    # every skill spelling + the critical terms: one matcher pass finds both
+    return tuple(sorted(set(get_index().canonical) | set(CRITICAL_CANDIDATES)))
+
+def resume_terms(text: str) -> Set[str]:
+    """Every term a JD query could ask for: unigrams, bigrams and canonical skill names."""
+    found = set(count_terms(text))
+    index = get_index()
+    # SKILL_RX keeps c++ / node.js / ci/cd intact
+    for tok in tokenize(text, SKILL_RX, min_len=1):
+        canon = index.canonical.get(tok)
+        if canon:
+            found.add(canon)
+    # multi-word aliases ("amazon web services") and "code-review" style spellings of critical terms
+    found.update(index.canon(t) for t in matcher_for(_phrases()).matched(text))
+    return found
+
+def jd_query(jd_text: str) -> Dict[str, float]:
+    """{term: weight} for a JD: its top terms, the critical terms and the taxonomy skills it names."""
+    index = get_index()
+    # boilerplate out (as for the prompts) and no bigrams across punctuation: "equal opportunity"
+    # or "aws apply" would only ever be missing terms that dilute every score
+    text = "\n".join(content_sentences(jd_text))
+    query: Dict[str, float] = {t: 1.0 for t in most_frequent(count_clause_terms(text), JD_TERMS)}
+    for t in resume_terms(text) & set(index.canonical.values()):
+        query[t] = max(query.get(t, 0.0), SKILL_WEIGHT)
+    for t in extract_critical_terms(text):
+        query[t] = CRITICAL_WEIGHT
+    return query
+
+class Ranked(NamedTuple):
+    doc_id: str
+    name: str
+    score: float
+    matched: List[str]
+    missing: List[str]
+
+# ---------------------------------------------------------------------
+# Corpus index: SQLite on disk, CSR matrix in memory, kept in sync by seq
+# ---------------------------------------------------------------------
+class CorpusIndex:
+    """
+    Documents are stored once as sorted int32 column ids (term presence). Each
+    insert/replace/delete gets a new `seq`; a process only applies rows with a seq
+    it has not seen, so adding resumes never re-reads or re-tokenizes the rest,
+    and several server processes can share one file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS vocab (id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL)")
+            db.execute("""CREATE TABLE IF NOT EXISTS docs (
+                doc_id TEXT PRIMARY KEY, name TEXT NOT NULL, sha256 TEXT NOT NULL, terms BLOB,
+                seq INTEGER NOT NULL, added REAL NOT NULL)""")
+            db.execute("CREATE INDEX IF NOT EXISTS docs_seq ON docs (seq)")
+        self._lock = threading.Lock()
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = [""]          # column id → term (ids start at 1)
+        self._rows: Dict[str, Tuple[str, np.ndarray]] = {}   # doc_id → (name, column ids)
+        self._seq = 0
+        self._matrix: Optional[sp.csr_matrix] = None
+        self._order: List[Tuple[str, str]] = []   # matrix row → (doc_id, name)
+
+    def _conn(self) -> sqlite3.Connection:
+        # short-lived connections: safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5)
+
+    # -- writes -------------------------------------------------------
+    def _register(self, db: sqlite3.Connection, terms: Iterable[str]) -> None:
+        missing = [t for t in set(terms) if t not in self._vocab]
+        if missing:
+            db.executemany("INSERT OR IGNORE INTO vocab (term) VALUES (?)", [(t,) for t in missing])
+            self._load_vocab(db)
+
+    def _next_seq(self, db: sqlite3.Connection) -> int:
+        return (db.execute("SELECT COALESCE(MAX(seq), 0) FROM docs").fetchone()[0] or 0) + 1
+
+    def known(self, doc_ids: Sequence[str]) -> Dict[str, str]:
+        """{doc_id: sha256} of the indexed documents among doc_ids."""
+        if not doc_ids:
+            return {}
+        with self._conn() as db:
+            return dict(db.execute(f"SELECT doc_id, sha256 FROM docs WHERE terms IS NOT NULL AND doc_id IN "
+                                   f"({','.join('?' * len(doc_ids))})", list(doc_ids)).fetchall())
+
+    def add(self, docs: Sequence[Tuple[str, str, str, str]]) -> Dict[str, Any]:
+        """
+        docs = [(doc_id, name, sha256, text)]; unchanged documents (same id + hash) are
+        skipped, and a doc_id repeated within the batch is reported, not written twice.
+        """
+        seen: Set[str] = set()
+        unique, duplicates = [], []
+        for d in docs:
+            (duplicates if d[0] in seen else unique).append(d)
+            seen.add(d[0])
+        known = self.known([d[0] for d in unique])
+        fresh = [d for d in unique if known.get(d[0]) != d[2]]
+        terms = [resume_terms(text) for _, _, _, text in fresh]   # tokenized before taking the lock
+        with self._lock, self._conn() as db:
+            db.execute("BEGIN IMMEDIATE")   # writers in other processes wait here: seq stays unique and ordered
+            self._register(db, (t for found in terms for t in found))   # one insert for the batch's new terms
+            seq = self._next_seq(db)
+            for (doc_id, name, sha, _), found in zip(fresh, terms):
+                cols = np.unique(np.fromiter((self._vocab[t] for t in found), dtype=np.int32, count=len(found)))
+                db.execute("""INSERT INTO docs (doc_id, name, sha256, terms, seq, added) VALUES (?, ?, ?, ?, ?, ?)
+                              ON CONFLICT(doc_id) DO UPDATE SET name = excluded.name, sha256 = excluded.sha256,
+                              terms = excluded.terms, seq = excluded.seq, added = excluded.added""",
+                           (doc_id, name, sha, cols.tobytes(), seq, time.time()))
+                seq += 1
+        self.refresh()
+        return {"indexed": len(fresh), "unchanged": len(unique) - len(fresh),
+                "duplicates": [d[0] for d in duplicates]}
+
+    def remove(self, doc_id: str) -> bool:
+        # tombstone (terms NULL) so other processes see the delete through seq
+        with self._lock, self._conn() as db:
+            db.execute("BEGIN IMMEDIATE")
+            cur = db.execute("UPDATE docs SET terms = NULL, sha256 = '', seq = ? WHERE doc_id = ? AND terms IS NOT NULL",
+                             (self._next_seq(db), doc_id))
+            removed = cur.rowcount > 0
+        self.refresh()
+        return removed
+
+    # -- sync ---------------------------------------------------------
+    def _load_vocab(self, db: sqlite3.Connection) -> None:
+        for vid, term in db.execute("SELECT id, term FROM vocab WHERE id >= ? ORDER BY id", (len(self._terms),)):
+            self._vocab[term] = vid
+            self._terms.extend([""] * (vid + 1 - len(self._terms)))
+            self._terms[vid] = term
+
+    def refresh(self) -> None:
+        """Apply documents changed since the last refresh (by this or any other process)."""
+        with self._lock:
+            with self._conn() as db:
+                rows = db.execute("SELECT doc_id, name, terms, seq FROM docs WHERE seq > ? ORDER BY seq",
+                                  (self._seq,)).fetchall()
+                if not rows:
+                    return
+                self._load_vocab(db)
+            appended: Dict[str, None] = {}
+            rebuild = self._matrix is None
+            for doc_id, name, terms, seq in rows:
+                self._seq = max(self._seq, seq)
+                rebuild |= doc_id in self._rows   # replaced or deleted: its matrix row is stale
+                if terms is None:
+                    self._rows.pop(doc_id, None)
+                    continue
+                self._rows[doc_id] = (name, np.frombuffer(terms, dtype=np.int32))
+                appended[doc_id] = None
+            # readers hold on to the previous matrix, so it is replaced, never modified in place
+            if rebuild:
+                self._order = [(d, name) for d, (name, _) in self._rows.items()]
+                self._matrix = self._build(list(self._rows))
+            elif appended:
+                # new documents only: stack their rows under the existing matrix
+                block = self._build(list(appended))
+                old = self._matrix
+                widened = sp.csr_matrix((old.data, old.indices, old.indptr), shape=(old.shape[0], block.shape[1]))
+                self._matrix = sp.vstack([widened, block], format="csr")
+                self._order = self._order + [(d, self._rows[d][0]) for d in appended]
+
+    def _build(self, doc_ids: List[str]) -> sp.csr_matrix:
+        cols = [self._rows[d][1] for d in doc_ids]
+        indptr = np.zeros(len(cols) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in cols], out=indptr[1:])
+        indices = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float64)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(cols), len(self._terms)))
+
+    # -- queries ------------------------------------------------------
+    def rank(self, jd_text: str, top_k: int = RANK_TOP_K) -> Tuple[List[Ranked], Dict[str, Any]]:
+        self.refresh()
+        query = jd_query(jd_text)
+        with self._lock:
+            X, order, vocab = self._matrix, self._order, self._vocab   # vocab only ever grows
+        info = {"documents": len(order), "jd_terms": len(query)}
+        if X is None or not order or not query:
+            return [], info
+        terms = list(query)
+        total = float(sum(query.values()))
+        known = [(i, vocab[t]) for i, t in enumerate(terms) if vocab.get(t, X.shape[1]) < X.shape[1]]
+        q_idx = [i for i, _ in known]
+        cols = np.array([c for _, c in known], dtype=np.int64)
+        weights = np.array([query[terms[i]] for i in q_idx], dtype=np.float64)
+        sub = X[:, cols]   # documents × JD terms present in the corpus
+        scores = (sub @ weights) / total if len(cols) else np.zeros(len(order))
+        k = min(top_k, len(order))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]   # best first; ties keep indexing order
+        results = []
+        for r in top:
+            row = sub.getrow(r)
+            hit = {terms[q_idx[j]] for j in row.indices}
+            results.append(Ranked(order[r][0], order[r][1], round(float(scores[r]), 4),
+                                  [t for t in terms if t in hit], [t for t in terms if t not in hit]))
+        return results, info
+
+    def stats(self) -> Dict[str, Any]:
+        self.refresh()
+        with self._lock:
+            X = self._matrix
+            return {"documents": len(self._order), "vocabulary": len(self._vocab),
+                    "nonzeros": int(X.nnz) if X is not None else 0}
+
+_corpus: Optional[CorpusIndex] = None
+_corpus_lock = threading.Lock()
+
+def corpus() -> CorpusIndex:
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = CorpusIndex(RANK_DB)
+        return _corpus
@@ -0,0 +1,117 @@
+import os, re, math, threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from matcher import TOKEN_RX, coverage, matcher_for
+from skills import get_index
+from terms import WORD_RX, STOP_WORDS, tokenize
+from telemetry import COVERAGE_REPAIRS
+
+# ---------------------------------------------------------------------
+# Coverage repair: fix only what is missing instead of regenerating
+# ---------------------------------------------------------------------
+COVERAGE_TARGET = 0.85            # share of all JD terms a rewritten entry should mention
+CRITICAL_TARGET = 0.7             # share of critical terms
+REPAIR_TERMS_PER_BULLET = int(os.getenv("REPAIR_TERMS_PER_BULLET", "2"))
+REPAIR_MAX_TERMS = int(os.getenv("REPAIR_MAX_TERMS", "8"))   # per entry, critical terms first
+CONTEXT_CHARS = 120               # JD text around a term used to judge which bullet it fits
+
+@lru_cache(maxsize=64)
+def _repairable(terms: Tuple[str, ...]) -> Tuple[str, ...]:
+    # a term with no words ("—", "&") or only stop words can never be credited to a rewrite,
+    # so it would be "missing" on every run and trigger a repair call each time
+    return tuple(t for t in terms if any(w not in STOP_WORDS for w in TOKEN_RX.findall((t or "").lower())))
+
+def low_coverage(text: str, all_terms: Sequence[str], critical_terms: Sequence[str]) -> bool:
+    return (coverage(text, _repairable(tuple(all_terms))).ratio < COVERAGE_TARGET
+            or coverage(text, _repairable(tuple(critical_terms))).ratio < CRITICAL_TARGET)
+
+def _shortfall(n_terms: int, n_matched: int, target: float) -> int:
+    return max(0, math.ceil(target * n_terms - 1e-9) - n_matched)
+
+def alias_credit(text: str, missing: Sequence[str]) -> Set[str]:
+    """Missing terms the text already mentions under another spelling ("k8s" for "kubernetes")."""
+    index = get_index()
+    seen = {index.canon(t) for t in tokenize(text, WORD_RX, min_len=1)}
+    seen |= {index.canon(t) for t in re.findall(r"[a-z0-9+#./-]+", (text or "").lower())}
+    return {t for t in missing if index.canon(t) in seen}
+
+def terms_to_add(text: str, all_terms: Sequence[str], critical_terms: Sequence[str]) -> List[str]:
+    """
+    Smallest list of missing terms (critical first, then in JD-relevance order) that
+    brings both ratios up to target, after crediting aliases; capped at REPAIR_MAX_TERMS.
+    """
+    cov_all = coverage(text, _repairable(tuple(all_terms)))
+    cov_crit = coverage(text, _repairable(tuple(critical_terms)))
+    credited = alias_credit(text, set(cov_all.missing) | set(cov_crit.missing))
+    miss_crit = [t for t in cov_crit.missing if t not in credited]
+    miss_all = [t for t in cov_all.missing if t not in credited]
+    need_crit = _shortfall(len(cov_crit.matched) + len(cov_crit.missing),
+                           len(cov_crit.matched) + len(set(cov_crit.missing) & credited), CRITICAL_TARGET)
+    need_all = _shortfall(len(cov_all.matched) + len(cov_all.missing),
+                          len(cov_all.matched) + len(set(cov_all.missing) & credited), COVERAGE_TARGET)
+
+    picked = miss_crit[:need_crit]
+    need_all -= len(set(picked) & set(miss_all))
+    for t in miss_all:
+        if need_all <= 0:
+            break
+        if t not in picked:
+            picked.append(t)
+            need_all -= 1
+    return picked[:REPAIR_MAX_TERMS]
+
+def _context(jd_text: str, term: str) -> Set[str]:
+    hits = matcher_for([term]).find_all(jd_text).get(term, [])
+    words: Set[str] = set()
+    for pos in hits[:3]:
+        window = jd_text[max(0, pos - CONTEXT_CHARS):pos + len(term) + CONTEXT_CHARS]
+        words.update(w for w in tokenize(window, WORD_RX, min_len=3) if w not in STOP_WORDS)
+    return words
+
+def assign_terms(bullets: Sequence[str], terms: Sequence[str], jd_text: str) -> Dict[int, List[str]]:
+    """
+    {bullet index: [terms]} — each term goes to the bullet whose words overlap most
+    with the JD text around that term, at most REPAIR_TERMS_PER_BULLET per bullet.
+    Terms no bullet has room for are dropped.
+    """
+    if not bullets:
+        return {}
+    bullet_words = [{w for w in tokenize(b, WORD_RX, min_len=3) if w not in STOP_WORDS} for b in bullets]
+    plan: Dict[int, List[str]] = {}
+    for term in _repairable(tuple(terms)):
+        ctx = _context(jd_text, term) | set(tokenize(term, WORD_RX, min_len=3))
+        open_slots = [i for i in range(len(bullets)) if len(plan.get(i, [])) < REPAIR_TERMS_PER_BULLET]
+        if not open_slots:
+            break
+        # most shared context first; ties go to the bullet with fewer additions, then the earlier one
+        best = max(open_slots, key=lambda i: (len(bullet_words[i] & ctx), -len(plan.get(i, [])), -i))
+        plan.setdefault(best, []).append(term)
+    return plan
+
+def apply_edits(bullets: Sequence[str], edits: Dict[int, str]) -> List[str]:
+    return [edits.get(i, b) for i, b in enumerate(bullets)]
+
+# ---------------------------------------------------------------------
+# Per-request tally (entries are rewritten on several threads)
+# ---------------------------------------------------------------------
+class RepairStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"low_coverage": 0, "repaired_locally": 0, "repaired_by_llm": 0,
+                       "repair_failed": 0, "full_retries": 0}
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.counts)
+        out["full_retries_avoided"] = out["low_coverage"] - out["full_retries"]
+        return out
+
+def record(stats: Optional[RepairStats], name: str) -> None:
+    COVERAGE_REPAIRS.inc(result=name)
+    if stats is not None:
+        stats.add(name)
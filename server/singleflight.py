@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from cache import content_key
+from documents import upload_digest
+from telemetry import COALESCED
+
+# ---------------------------------------------------------------------
+# Single-flight: identical concurrent requests share one computation
+# (double-clicks, client retries while the first attempt is still running)
+# ---------------------------------------------------------------------
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    do(key, fn) runs fn() once per key at a time; callers arriving while it is in
+    flight await the same task and get the same result or exception. Callers wait
+    through asyncio.shield, so a cancelled caller (client went away) leaves the work
+    running for the others; only when the last caller is gone is it cancelled too.
+    Event-loop only: no locking needed.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda t, key=key: self._forget(key, t))
+            COALESCED.inc(flight=self.name, role="leader")
+        else:
+            COALESCED.inc(flight=self.name, role="follower")
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()   # nobody is left to use the result
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        call = self._calls.get(key)
+        if call is not None and call.task is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()   # retrieved here; every waiter re-raises it itself
+
+def request_key(kind: str, files: Dict[str, Any], **options: Any) -> str:
+    """
+    Identity of one tailoring request: endpoint kind, SHA-256 of each upload (the
+    parser is picked from the content) and the options that change the result.
+    files = {field: (filename, bytes)}.
+    """
+    uploads = {name: upload_digest(data) for name, (_, data) in files.items()}
+    return content_key("flight", kind, uploads, options)
+
+flights = SingleFlight("tailor")
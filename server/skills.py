@@ -0,0 +1,117 @@
+import os, time, threading
+from typing import Dict, Iterable, List, Optional, Set
+
+# ---------------------------------------------------------------------
+# Skill taxonomy: canonical name → category, alias → canonical
+# ---------------------------------------------------------------------
+CATEGORY_ORDER = ["Languages", "Frameworks & Libraries", "Data & Cloud", "DevOps",
+                  "Design & Tools", "Soft Skills", "Other"]
+
+BUILTIN_CATEGORIES: Dict[str, Set[str]] = {
+    "Languages": {"python","java","c","c++","c#","go","typescript","javascript","sql","r","matlab","swift","kotlin","scala","rust"},
+    "Frameworks & Libraries": {"react","node","flask","django","fastapi","spring","express","streamlit","pytorch","tensorflow","keras","scikit-learn","pandas","numpy","matplotlib","seaborn"},
+    "Data & Cloud": {"aws","gcp","azure","firebase","mongodb","postgresql","mysql","snowflake","bigquery","spark","hadoop","airflow","kafka","docker","kubernetes","redis"},
+    "DevOps": {"git","github","gitlab","ci","cd","ci/cd","terraform","ansible","jenkins","sentry","datadog","grafana","prometheus"},
+    "Design & Tools": {"figma","jira","confluence","notion","excel","tableau","powerbi","photoshop","illustrator"},
+    "Soft Skills": {"leadership","collaboration","communication","problem-solving","teamwork","adaptability","time management","stakeholder management","customer focus"},
+}
+
+BUILTIN_ALIASES: Dict[str, str] = {
+    "golang": "go", "js": "javascript", "ts": "typescript", "k8s": "kubernetes", "kube": "kubernetes",
+    "sklearn": "scikit-learn", "postgres": "postgresql", "node.js": "node", "nodejs": "node",
+    "react.js": "react", "reactjs": "react", "amazon web services": "aws", "google cloud": "gcp",
+    "power bi": "powerbi", "mongo": "mongodb",
+}
+
+SEED_PATH = os.getenv("SKILLS_SEED", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_seed.txt"))
+RELOAD_INTERVAL = float(os.getenv("SKILLS_RELOAD_INTERVAL", "5"))   # seconds between seed-file mtime checks
+
+class SkillIndex:
+    """
+    Compiled lookup tables; every query is a dict/set hit on the lowercased name.
+    Seed file lines are either a bare name or `name | Category | alias, alias`;
+    blank lines and lines starting with `#` are ignored.
+    """
+    def __init__(self, seed_lines: Iterable[str] = ()):
+        self.canonical: Dict[str, str] = {}   # any spelling (lowercase) → canonical
+        self.category: Dict[str, str] = {}    # canonical → category
+        self.seeds: Set[str] = set()          # canonical names from the seed file (boosted in JD keywords)
+        for cat, names in BUILTIN_CATEGORIES.items():
+            for n in names:
+                self._add(n, cat)
+        for alias, canon in BUILTIN_ALIASES.items():
+            self.canonical[alias] = canon
+        for ln in seed_lines:
+            self._add_seed_line(ln)
+
+    def _add(self, name: str, category: Optional[str] = None, aliases: Iterable[str] = ()) -> str:
+        canon = self.canonical.get(name, name)
+        self.canonical[canon] = canon
+        if category:
+            self.category[canon] = category
+        for a in aliases:
+            self.canonical[a] = canon
+        return canon
+
+    def _add_seed_line(self, line: str) -> None:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return
+        parts = [p.strip() for p in line.split("|")]
+        name = parts[0].lower()
+        category = parts[1] if len(parts) > 1 and parts[1] in CATEGORY_ORDER else None
+        aliases = [a.strip().lower() for a in parts[2].split(",") if a.strip()] if len(parts) > 2 else []
+        self.seeds.add(self._add(name, category, aliases))
+
+    def lookup(self, name: str) -> Optional[str]:
+        return self.canonical.get((name or "").strip().lower())
+
+    def canon(self, name: str) -> str:
+        """Canonical spelling if known, else the lowercased name (dedupe key)."""
+        n = (name or "").strip().lower()
+        return self.canonical.get(n, n)
+
+    def category_of(self, name: str) -> str:
+        c = self.lookup(name)
+        return self.category.get(c, "Other") if c else "Other"
+
+    def is_seed(self, token: str) -> bool:
+        """True for a seed skill under any known spelling (token must be lowercase)."""
+        return self.canonical.get(token, token) in self.seeds
+
+# ---------------------------------------------------------------------
+# Process-wide index, rebuilt when the seed file changes
+# ---------------------------------------------------------------------
+_lock = threading.Lock()
+_index: Optional[SkillIndex] = None
+_mtime: Optional[float] = None
+_checked = 0.0
+
+def _seed_mtime() -> Optional[float]:
+    try:
+        return os.path.getmtime(SEED_PATH)
+    except OSError:
+        return None
+
+def load_index() -> SkillIndex:
+    global _index, _mtime, _checked
+    with _lock:
+        mtime = _seed_mtime()
+        lines: List[str] = []
+        if mtime is not None:
+            with open(SEED_PATH, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        _index, _mtime, _checked = SkillIndex(lines), mtime, time.monotonic()
+        return _index
+
+def get_index() -> SkillIndex:
+    """Current index; stats the seed file at most every RELOAD_INTERVAL seconds."""
+    global _checked
+    if _index is None:
+        return load_index()
+    if time.monotonic() - _checked >= RELOAD_INTERVAL:
+        if _seed_mtime() != _mtime:
+            print("[SKILLS] seed file changed; reloading taxonomy")
+            return load_index()
+        _checked = time.monotonic()
+    return _index
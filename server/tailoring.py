@@ -1,52 +1,177 @@
-import re, os
-from typing import Dict, List, Any, Tuple
-from openai import OpenAI
-from collections import Counter
-from sklearn.feature_extraction.text import CountVectorizer
+import re, os, json, threading
+from typing import Dict, List, Any, NamedTuple, Tuple, Optional, Callable
+from cache import rewrite_cache, content_key
+from terms import top_terms
+from workers import run_bounded
+from skills import get_index, CATEGORY_ORDER
+from matcher import matcher_for
+from telemetry import span, record_llm_call
+from llm_gateway import LLMUnavailable, LLM_TIMEOUT, gateway, make_http_client
+from budget import (BudgetExceeded, TokenBudget, activate, compress_jd, current_budget, estimate_tokens,
+                    prompt_terms, REWRITE_MAX_TOKENS, rewrite_max_tokens)
+from repair import RepairStats, low_coverage, terms_to_add, assign_terms, apply_edits, record
 
 # ─────────────────────────────────────────────────────────────────────────────
-# OpenAI client
+# LLM client (any OpenAI-compatible chat-completions backend)
 # ─────────────────────────────────────────────────────────────────────────────
-client = None
-if os.getenv("OPENAI_API_KEY"):
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# LLM_BASE_URL points the client at another server, e.g. loadtest/fake_llm.py
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+
+def make_llm_client(base_url: Optional[str] = LLM_BASE_URL, api_key: Optional[str] = None) -> Optional[Any]:
+    """
+    OpenAI client for the configured backend; None when there is nothing to talk to.
+    Retries are left to the gateway (max_retries=0), which also owns the connection pool.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not (base_url or api_key):
+        return None
+    from openai import OpenAI   # the SDK takes ~0.2 s to import; keep it off the startup path
+    return OpenAI(base_url=base_url or None, api_key=api_key or "local", http_client=make_http_client(),
+                  max_retries=0, timeout=LLM_TIMEOUT)
+
+_UNSET = object()
+client: Any = _UNSET   # built on first use (or by the startup warm-up)
+_client_lock = threading.Lock()
+
+def llm_client() -> Optional[Any]:
+    global client
+    if client is _UNSET:
+        with _client_lock:
+            if client is _UNSET:
+                client = make_llm_client()
+    return client
+
+def set_llm_client(new_client: Optional[Any]) -> Optional[Any]:
+    """
+    Swap the backend used by every LLM call (anything exposing
+    chat.completions.create); None disables rewriting. Returns the previous client.
+    """
+    global client
+    old = llm_client()
+    client = new_client
+    return old
+
+# max in-flight LLM calls per tailoring request (1 = old sequential behaviour)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "6"))
+# "concurrent" = one prompt per entry; "batch" = one structured call for all sections
+TAILOR_MODE = os.getenv("TAILOR_MODE", "concurrent")
+# low keyword coverage: 1 = patch the missing terms into the affected bullets, 0 = regenerate the entry
+COVERAGE_REPAIR = os.getenv("COVERAGE_REPAIR", "1") != "0"
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+REWRITE_TEMPERATURE = 0.25
+SUMMARY_TEMPERATURE = 0.3
+
+# (event, payload) callback used to stream progress; called from worker threads
+EventFn = Callable[[str, Dict[str, Any]], None]
+# on_token(piece) per streamed delta; on_token("", restart=True) when a retried call starts over
+TokenFn = Callable[..., None]
+
+def _chat(prompt: str, temperature: float, max_tokens: int, json_mode: bool = False,
+          on_token: Optional[TokenFn] = None, kind: str = "rewrite") -> str:
+    """
+    One chat completion; timed as an `llm.<kind>` span with its token usage recorded,
+    and charged to the request's token budget (BudgetExceeded once it is spent).
+    """
+    kwargs: Dict[str, Any] = {}
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    if on_token is not None:
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+    budget = current_budget()
+    try:
+        reserved = budget.reserve(kind, prompt, max_tokens) if budget is not None else 0
+    except BudgetExceeded:
+        record_llm_call(kind, "refused")
+        raise
+    estimate = estimate_tokens(prompt) + max_tokens
+    streamed = False
+
+    def attempt() -> Tuple[str, Any]:
+        nonlocal streamed
+        if streamed:
+            on_token("", restart=True)   # a retry after a broken stream: the draft starts over
+            streamed = False
+        res = llm_client().chat.completions.create(
+            model=LLM_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+        if on_token is None:
+            return (res.choices[0].message.content or "").strip(), getattr(res, "usage", None)
+        # read inside the gateway call: the stream keeps its concurrency slot until the last
+        # chunk, and a failure mid-stream (5xx event, dropped connection) is retried like any other
+        parts, usage = [], None
+        try:
+            for chunk in res:
+                piece = chunk.choices[0].delta.content if chunk.choices else None
+                if piece:
+                    parts.append(piece)
+                    on_token(piece)
+                    streamed = True
+                usage = getattr(chunk, "usage", None) or usage   # sent on the last chunk
+        finally:
+            close = getattr(res, "close", None)
+            if close is not None:
+                close()
+        return "".join(parts).strip(), usage
+
+    with span(f"llm.{kind}") as attrs:
+        try:
+            text, usage = gateway.call(attempt, tokens=estimate)
+        except Exception as e:
+            record_llm_call(kind, "fallback" if isinstance(e, LLMUnavailable) else "error")
+            attrs["error"] = True
+            if budget is not None:
+                budget.release(reserved)
+            raise
+        record_llm_call(kind, "ok", usage)
+        if usage is not None:
+            gateway.settle_tokens(estimate, usage.prompt_tokens + usage.completion_tokens)
+        if budget is not None:
+            budget.settle(reserved, prompt, usage, text)
+        if usage is not None:
+            attrs["prompt_tokens"] = usage.prompt_tokens
+            attrs["completion_tokens"] = usage.completion_tokens
+        return text
 
 # ─────────────────────────────────────────────────────────────────────────────
 # JD term extraction + domain detection
 # ─────────────────────────────────────────────────────────────────────────────
 def extract_jd_terms(jd_text: str, top_n: int = 100) -> List[str]:
-    jd = (jd_text or "").lower()
-    if not jd.strip():
+    if not (jd_text or "").strip():
         return []
-    vect = CountVectorizer(stop_words="english", ngram_range=(1, 2))
-    X = vect.fit_transform([jd])
-    terms = vect.get_feature_names_out()
-    freq = Counter(dict(zip(terms, X.toarray()[0])))
-    return [t for t, _ in freq.most_common(top_n)]
+    with span("extract_jd_terms"):
+        return top_terms(jd_text, top_n)
+
+DOMAIN_WORDS = {
+    "tech": ["api", "software", "backend", "frontend", "react", "node", "database",
+             "devops", "distributed systems", "design patterns", "cloud"],
+    "healthcare": ["patient", "clinical", "healthcare", "hipaa", "medical", "device"],
+    "business": ["stakeholder", "marketing", "campaign", "sales", "kpi", "roi", "product manager"],
+    "research": ["research", "experiment", "publication", "analysis", "hypothesis"],
+}
+_DOMAIN_OF = {w: d for d, words in DOMAIN_WORDS.items() for w in words}
 
 def detect_domain(jd_text: str) -> str:
-    t = (jd_text or "").lower()
-    tech = any(w in t for w in ["api", "software", "backend", "frontend", "react", "node", "database",
-                                "devops", "distributed systems", "design patterns", "cloud"])
-    healthcare = any(w in t for w in ["patient", "clinical", "healthcare", "hipaa", "medical", "device"])
-    business = any(w in t for w in ["stakeholder", "marketing", "campaign", "sales", "kpi", "roi", "product manager"])
-    research = any(w in t for w in ["research", "experiment", "publication", "analysis", "hypothesis"])
-    if tech: return "tech"
-    if healthcare: return "healthcare"
-    if business: return "business"
-    if research: return "research"
+    # one pass over the JD for every domain's markers; first domain (in priority order) wins
+    found = {_DOMAIN_OF[w] for w in matcher_for(list(_DOMAIN_OF)).find_all(jd_text or "")}
+    for domain in DOMAIN_WORDS:
+        if domain in found:
+            return domain
     return "general"
 
+CRITICAL_CANDIDATES = [
+    "software engineering", "design patterns", "distributed systems", "qa",
+    "automation", "secure", "security", "enterprise systems", "user flows",
+    "programming languages", "code review", "branch management", "knowledge base",
+    "cloud", "infrastructure", "compliance", "scalable", "reliable", "documentation"
+]
+
 def extract_critical_terms(jd_text: str) -> List[str]:
-    text = (jd_text or "").lower()
-    candidates = [
-        "software engineering", "design patterns", "distributed systems", "qa",
-        "automation", "secure", "security", "enterprise systems", "user flows",
-        "programming languages", "code review", "branch management", "knowledge base",
-        "cloud", "infrastructure", "compliance", "scalable", "reliable", "documentation"
-    ]
-    out = [c for c in candidates if c in text]
-    return list(dict.fromkeys(out))
+    return matcher_for(CRITICAL_CANDIDATES).matched(jd_text or "")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Regex + helpers
@@ -162,16 +287,6 @@ def parse_entries(section_lines: List[str]) -> List[Dict[str, Any]]:
     push()
     return entries
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Keyword coverage utilities
-# ─────────────────────────────────────────────────────────────────────────────
-def _coverage(text: str, terms: List[str]) -> float:
-    if not terms: return 1.0
-    low = text.lower()
-    uniq = [t.lower() for t in dict.fromkeys(terms)]
-    found = sum(1 for t in uniq if t in low)
-    return found / max(1, len(uniq))
-
 # ─────────────────────────────────────────────────────────────────────────────
 # LLM rewriting (Experience & Projects)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -184,11 +299,24 @@ def domain_prompt_hint(domain: str) -> str:
         "general": "Emphasize reliability, teamwork, initiative, and measurable impact.",
     }.get(domain, "Emphasize reliability, teamwork, initiative, and measurable impact.")
 
+def _rewrite_key(section: str, bullets: List[str], jd_text: str,
+                 all_terms: List[str], critical_terms: List[str], domain: str) -> str:
+    return content_key("rewrite", section, bullets, jd_text, critical_terms, all_terms,
+                       domain, LLM_MODEL, REWRITE_TEMPERATURE)
+
 def llm_rewrite_bullets(section: str, bullets: List[str], jd_text: str,
-                        all_terms: List[str], critical_terms: List[str], domain: str) -> List[str]:
-    if not client or not bullets:
+                        all_terms: List[str], critical_terms: List[str], domain: str,
+                        use_cache: bool = True, on_token: Optional[TokenFn] = None,
+                        repair_stats: Optional[RepairStats] = None) -> List[str]:
+    if not llm_client() or not bullets:
         return bullets
 
+    key = _rewrite_key(section, bullets, jd_text, all_terms, critical_terms, domain)
+    if use_cache:
+        hit = rewrite_cache.get(key)
+        if hit:
+            return hit
+
     hint = domain_prompt_hint(domain)
     base = f"""
 Rewrite the following {section} bullet points for an ATS-optimized, HUMAN-readable resume.
@@ -204,36 +332,115 @@ Job Description:
 {jd_text}
 
 Critical keywords to include when relevant: {", ".join(critical_terms[:14])}
-Additional keywords to consider: {", ".join(all_terms[:40])}
+Additional keywords to consider: {", ".join(prompt_terms(all_terms, critical_terms))}
 
 Original bullets:
 {chr(10).join(f"- {b}" for b in bullets)}
 """
-    def _rewrite(prompt: str) -> List[str]:
-        res = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.25,
-            max_tokens=900,
-        )
-        text = res.choices[0].message.content.strip()
+    max_tokens = rewrite_max_tokens(bullets)
+    budget = current_budget()
+    if budget is not None:
+        budget.note_max_tokens(REWRITE_MAX_TOKENS, max_tokens)
+
+    def _rewrite(prompt: str, on_token: Optional[TokenFn] = None, kind: str = "rewrite") -> List[str]:
+        text = _chat(prompt, temperature=REWRITE_TEMPERATURE, max_tokens=max_tokens, on_token=on_token, kind=kind)
         return [re.sub(r"^[\-•]\s*", "", ln).strip() for ln in text.splitlines() if len(ln.strip()) > 4]
 
-    out = _rewrite(base)
+    # only the first draft is streamed; a retry shows up as the final entry event
+    out = _rewrite(base, on_token)
     joined = " ".join(out)
-    if _coverage(joined, all_terms) < 0.85 or _coverage(joined, critical_terms) < 0.7:
-        retry = base + "\n\nCoverage was low. Re-inject missing relevant terms organically while keeping clarity and truth. Avoid repetitive phrasing."
-        out = _rewrite(retry)
+    if low_coverage(joined, all_terms, critical_terms):
+        record(repair_stats, "low_coverage")
+        if COVERAGE_REPAIR and out:
+            out = _repair_coverage(out, jd_text, all_terms, critical_terms, repair_stats)
+        else:
+            record(repair_stats, "full_retries")
+            retry = base + "\n\nCoverage was low. Re-inject missing relevant terms organically while keeping clarity and truth. Avoid repetitive phrasing."
+            out = _rewrite(retry, kind="rewrite_retry")
 
+    if out:
+        rewrite_cache.set(key, out)
     return out or bullets
 
+def llm_repair_bullets(bullets: List[str], plan: Dict[int, List[str]]) -> Dict[int, str]:
+    """Edit only the planned bullets, each with only its assigned terms. Returns {index: new bullet}."""
+    order = sorted(plan)
+    blocks = "\n".join(f"[{n}] {bullets[i]}\n    keywords: {', '.join(plan[i])}" for n, i in enumerate(order, 1))
+    prompt = f"""
+Edit each resume bullet below so it naturally includes its listed keywords.
+Change as little as possible; keep every fact true and each bullet ≤ 28 words.
+If a keyword cannot fit a bullet truthfully, leave that keyword out.
+Return each bullet on its own line as "[n] bullet".
+
+{blocks}
+"""
+    text = _chat(prompt, temperature=REWRITE_TEMPERATURE, max_tokens=40 + 70 * len(order), kind="repair")
+    edits: Dict[int, str] = {}
+    for m in re.finditer(r"^\s*\[(\d+)\]\s*(.+?)\s*$", text, re.M):
+        n = int(m.group(1))
+        if 1 <= n <= len(order) and len(m.group(2)) > 4:
+            edits[order[n - 1]] = re.sub(r"^[\-•]\s*", "", m.group(2))
+    return edits
+
+def _repair_coverage(bullets: List[str], jd_text: str, all_terms: List[str], critical_terms: List[str],
+                     stats: Optional[RepairStats] = None) -> List[str]:
+    """
+    Close a coverage gap without regenerating the entry: work out which terms are
+    missing (aliases already present count), pick the bullet each one fits best,
+    and only then ask the LLM to edit those bullets.
+    """
+    with span("coverage_repair") as attrs:
+        add = terms_to_add(" ".join(bullets), all_terms, critical_terms)
+        plan = assign_terms(bullets, add, jd_text)
+        attrs["terms"] = sum(len(v) for v in plan.values())
+        if not plan:
+            record(stats, "repaired_locally")
+            return bullets
+        try:
+            edits = llm_repair_bullets(bullets, plan)
+        except Exception as e:
+            print(f"[LLM REPAIR ERROR] {e}")
+            record(stats, "repair_failed")
+            return bullets
+        record(stats, "repaired_by_llm")
+        return apply_edits(bullets, edits)
+
+def _safe_rewrite(section: str, bullets: List[str], jd_text: str,
+                  all_terms: List[str], critical_terms: List[str], domain: str,
+                  use_cache: bool = True, on_token: Optional[TokenFn] = None,
+                  repair_stats: Optional[RepairStats] = None) -> List[str]:
+    """Per-entry guard: an LLM failure keeps the original bullets instead of failing the request."""
+    try:
+        return llm_rewrite_bullets(section, bullets, jd_text, all_terms, critical_terms, domain, use_cache, on_token,
+                                   repair_stats)
+    except Exception as e:
+        print(f"[LLM ERROR] {section}: {e}")
+        return bullets
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Summary (third-person; forced opener)
 # ─────────────────────────────────────────────────────────────────────────────
-def llm_summary(jd_text: str, terms: List[str], domain: str) -> str:
-    opener = "Highly motivated CS candidate"
-    if not client:
+SUMMARY_OPENER = "Highly motivated CS candidate"
+
+def _finish_summary(txt: str) -> str:
+    opener = SUMMARY_OPENER
+    if not txt.lower().startswith(opener.lower()):
+        txt = f"{opener} with " + txt[0].lower() + txt[1:]
+    return txt
+
+def _summary_key(jd_text: str, terms: List[str], domain: str) -> str:
+    return content_key("summary", jd_text, terms, domain, LLM_MODEL, SUMMARY_TEMPERATURE)
+
+def llm_summary(jd_text: str, terms: List[str], domain: str, use_cache: bool = True,
+                on_token: Optional[TokenFn] = None) -> str:
+    opener = SUMMARY_OPENER
+    if not llm_client():
         return f"{opener} with hands-on experience and interest in {domain} problems; collaborates well across teams and focuses on scalable, reliable results."
+    key = _summary_key(jd_text, terms, domain)
+    if use_cache:
+        hit = rewrite_cache.get(key)
+        if hit:
+            return hit
     prompt = f"""
 Write a concise, 2-sentence, third-person summary that STARTS with "{opener} with".
 Make it natural and recruiter-friendly (not keyword-stuffed). Blend several relevant JD terms.
@@ -246,32 +453,97 @@ Job Description:
 {jd_text}
 """
     try:
-        r = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=120,
-        )
-        txt = r.choices[0].message.content.strip()
-        if not txt.lower().startswith(opener.lower()):
-            txt = f"{opener} with " + txt[0].lower() + txt[1:]
+        txt = _finish_summary(_chat(prompt, temperature=SUMMARY_TEMPERATURE, max_tokens=120, on_token=on_token, kind="summary"))
+        rewrite_cache.set(key, txt)
         return txt
     except Exception:
         return f"{opener} with hands-on experience and interest in {domain} problems; collaborates well across teams and focuses on scalable, reliable results."
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Batched rewrite (all entries + summary in one structured call)
+# ─────────────────────────────────────────────────────────────────────────────
+def _batch_key(section: str, idx: int) -> str:
+    return f"{'exp' if section == 'Work Experience' else 'proj'}-{idx}"
+
+def _valid_bullets(v: Any) -> Optional[List[str]]:
+    if not isinstance(v, list):
+        return None
+    out = [re.sub(r"^[\-•]\s*", "", str(b)).strip() for b in v if isinstance(b, str)]
+    out = [b for b in out if len(b) > 4]
+    return out or None
+
+def llm_rewrite_batch(jobs: List[Tuple[str, List[str]]], jd_text: str, all_terms: List[str],
+                      critical_terms: List[str], domain: str) -> Tuple[Dict[int, List[str]], Optional[str]]:
+    """
+    Rewrite every (section, bullets) job plus the summary in ONE request, so the JD,
+    keyword lists and domain hint are sent once instead of once per entry.
+    Returns ({job_index: bullets}, summary); anything missing/invalid is simply absent
+    so the caller can retry just those pieces individually.
+    """
+    if not llm_client() or not jobs:
+        return {}, None
+
+    keyed: Dict[str, int] = {}
+    blocks = []
+    exp_i = proj_i = 0
+    for i, (section, bullets) in enumerate(jobs):
+        if section == "Work Experience":
+            key = _batch_key(section, exp_i); exp_i += 1
+        else:
+            key = _batch_key(section, proj_i); proj_i += 1
+        keyed[key] = i
+        blocks.append(f'[{key}] ({section})\n' + "\n".join(f"- {b}" for b in bullets))
+
+    prompt = f"""
+Rewrite the resume entries below for an ATS-optimized, HUMAN-readable resume, and write a summary.
+
+Rules:
+- Keep every fact true; do NOT invent roles or numbers.
+- Start with strong action verbs; keep each bullet ≤ 26–28 words.
+- Weave job-description keywords NATURALLY (no parentheses or keyword dumps).
+- {domain_prompt_hint(domain)}
+- Summary: concise, 2 sentences, third person, STARTS with "{SUMMARY_OPENER} with".
+
+Respond with a JSON object only, shaped like:
+{{"entries": {{"exp-0": ["bullet", ...], "proj-0": ["bullet", ...]}}, "summary": "..."}}
+Include every entry key exactly once and keep the same number of bullets per entry.
+
+Job Description:
+{jd_text}
+
+Critical keywords to include when relevant: {", ".join(critical_terms[:14])}
+Additional keywords to consider: {", ".join(prompt_terms(all_terms, critical_terms))}
+
+Entries:
+{chr(10).join(blocks)}
+"""
+    n_bullets = sum(len(b) for _, b in jobs)
+    raw = _chat(prompt, temperature=REWRITE_TEMPERATURE, max_tokens=min(4096, 200 + 80 * n_bullets), json_mode=True, kind="batch")
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        print("[LLM BATCH] malformed JSON; falling back to per-entry rewrites")
+        return {}, None
+    if not isinstance(data, dict):
+        return {}, None
+
+    entries = data.get("entries") if isinstance(data.get("entries"), dict) else {}
+    out: Dict[int, List[str]] = {}
+    for key, i in keyed.items():
+        bullets = _valid_bullets(entries.get(key))
+        if bullets:
+            out[i] = bullets
+
+    summary = data.get("summary")
+    summary = _finish_summary(summary.strip()) if isinstance(summary, str) and summary.strip() else None
+    return out, summary
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Skills cleanup + grouping
 # ─────────────────────────────────────────────────────────────────────────────
 LABEL_RX = re.compile(r"(?i)\b(programming|languages?|frameworks?|libraries?|tooling|tools|ai|ml|data|devops)\s*:\s*")
 BAD = {"labeling","logging","experience","engineering","systems","pipelines","ability","applied","application"}
 
-LANGS = {"python","java","c","c++","c#","go","golang","typescript","javascript","js","sql","r","matlab","swift","kotlin","scala","rust"}
-FRAME_LIB = {"react","node","flask","django","fastapi","spring","express","streamlit","pytorch","tensorflow","keras","sklearn","pandas","numpy","matplotlib","seaborn"}
-DATA_CLOUD = {"aws","gcp","azure","firebase","mongodb","postgres","mysql","snowflake","bigquery","spark","hadoop","airflow","kafka","docker","kubernetes","redis"}
-DEVOPS = {"git","github","gitlab","ci","cd","ci/cd","terraform","ansible","jenkins","sentry","datadog","grafana","prometheus"}
-DESIGN_TOOLS = {"figma","jira","confluence","notion","excel","tableau","powerbi","photoshop","illustrator"}
-SOFT = {"leadership","collaboration","communication","problem-solving","teamwork","adaptability","time management","stakeholder management","customer focus"}
-
 def tokenize_skills(sk_lines: List[str]) -> List[str]:
     text = " | ".join(sk_lines)
     text = LABEL_RX.sub("", text)
@@ -296,37 +568,29 @@ def tokenize_skills(sk_lines: List[str]) -> List[str]:
     return list(dict.fromkeys(out))
 
 def categorize_skills(raw: List[str], jd_terms: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    index = get_index()
     # booster: add clean JD tokens if they look like skills/phrases
     for k in jd_terms:
         k = k.strip()
         if 2 <= len(k) <= 24 and re.match(r"^[A-Za-z0-9#.+\- ]+$", k):
-            if k.lower() not in [s.lower() for s in raw]:
-                raw.append(k)
-
-    cats = {
-        "Languages": [],
-        "Frameworks & Libraries": [],
-        "Data & Cloud": [],
-        "DevOps": [],
-        "Design & Tools": [],
-        "Soft Skills": [],
-        "Other": [],
-    }
+            raw.append(k)
+
+    # one spelling per canonical skill ("k8s" and "Kubernetes" collapse to the first seen)
+    seen = set()
+    cats: Dict[str, List[str]] = {k: [] for k in CATEGORY_ORDER}
     for s in raw:
-        sl = s.lower()
-        if sl in LANGS: cats["Languages"].append(s)
-        elif sl in FRAME_LIB: cats["Frameworks & Libraries"].append(s)
-        elif sl in DATA_CLOUD: cats["Data & Cloud"].append(s)
-        elif sl in DEVOPS: cats["DevOps"].append(s)
-        elif sl in DESIGN_TOOLS: cats["Design & Tools"].append(s)
-        elif sl in SOFT: cats["Soft Skills"].append(s.title())
-        else: cats["Other"].append(s)
+        c = index.canon(s)
+        if c in seen:
+            continue
+        seen.add(c)
+        cat = index.category_of(s)
+        cats[cat].append(s.title() if cat == "Soft Skills" else s)
 
     # tidy: dedupe + cap each bucket
     grouped = {k: list(dict.fromkeys(v))[:10] for k, v in cats.items() if v}
     # flat list for preview
     flat = []
-    for k in ["Languages","Frameworks & Libraries","Data & Cloud","DevOps","Design & Tools","Soft Skills","Other"]:
+    for k in CATEGORY_ORDER:
         if k in grouped:
             flat.extend(grouped[k])
     flat = list(dict.fromkeys(flat))[:30]
@@ -346,45 +610,217 @@ def trim_bullets_only(entries: List[Dict[str, Any]], max_bullets: int) -> List[D
     return out
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Public: build final resume model
+# Public: JD-independent resume structure (cacheable per upload)
 # ─────────────────────────────────────────────────────────────────────────────
-def build_tailored_model(resume_text: str, jd_skills: List[str], jd_keywords: List[str], jd_text: str = "") -> Dict[str, Any]:
-    print("\n🧠 Starting build_tailored_model — invoking LLM tailoring...")
+def parse_resume(resume_text: str) -> Dict[str, Any]:
+    with span("parse_resume"):
+        return _parse_resume(resume_text)
 
+def _parse_resume(resume_text: str) -> Dict[str, Any]:
     secs = normalize_sections(resume_text)
     lines = [ln.strip() for ln in _lines(resume_text) if ln.strip()]
+    return {
+        "name": lines[0] if lines else "Your Name",
+        "contact": lines[1] if len(lines) > 1 else "email@example.com | (000) 000-0000 | City, ST",
+        "skill_tokens": tokenize_skills(secs.get("skills", [])),
+        "experience_entries": parse_entries(secs.get("experience", [])),
+        "project_entries": parse_entries(secs.get("projects", [])),
+        "education": secs.get("education", ["University, Degree — YYYY"]),
+    }
 
-    name = lines[0] if lines else "Your Name"
-    contact = lines[1] if len(lines) > 1 else "email@example.com | (000) 000-0000 | City, ST"
+def _copy_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [dict(e, bullets=list(e.get("bullets") or [])) for e in entries]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental re-tailoring: reuse rewrites of entries that did not change
+# ─────────────────────────────────────────────────────────────────────────────
+def entry_hash(section: str, entry: Dict[str, Any]) -> str:
+    """Identity of a parsed (not yet rewritten) entry; position-independent."""
+    return content_key("entry", section, entry.get("header", ""), entry.get("dates", ""), entry.get("bullets") or [])
+
+def jd_hash(jd_text: str) -> str:
+    # whitespace-only edits keep the rewrites; anything else (or another model) redoes them
+    return content_key("jd", " ".join((jd_text or "").split()), LLM_MODEL, REWRITE_TEMPERATURE)
+
+class Reuse(NamedTuple):
+    """Rewrites of a previously tailored model: {entry_hash: bullets} + summary, valid for one JD."""
+    model_id: str
+    jd_hash: str
+    entries: Dict[str, List[str]]
+    summary: Optional[str]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public: build final resume model
+# ─────────────────────────────────────────────────────────────────────────────
+def build_tailored_model(resume_text: str, jd_skills: List[str], jd_keywords: List[str], jd_text: str = "",
+                         concurrency: Optional[int] = None, mode: Optional[str] = None,
+                         use_cache: bool = True, parsed: Optional[Dict[str, Any]] = None,
+                         on_event: Optional[EventFn] = None, stream_tokens: bool = False,
+                         reuse: Optional[Reuse] = None) -> Dict[str, Any]:
+    """
+    `parsed` is an optional precomputed parse_resume() result; it is never mutated.
+    `on_event(kind, payload)` receives "skeleton" first, then one "entry" per rewritten
+    entry and a "summary" as each finishes (plus "token" deltas if stream_tokens).
+    `reuse` (from an earlier model for the same JD) skips the LLM for entries whose
+    content hash it already has; meta.incremental lists what was recomputed.
+    """
+    emit = on_event or (lambda kind, payload: None)
+
+    if parsed is None:
+        parsed = parse_resume(resume_text)
+    name, contact = parsed["name"], parsed["contact"]
 
     domain = detect_domain(jd_text)
     auto_terms = extract_jd_terms(jd_text, top_n=100)
     critical = extract_critical_terms(jd_text)
     all_terms = list(dict.fromkeys((jd_skills or []) + (jd_keywords or []) + auto_terms + critical))[:120]
+    # prompts get the JD once compressed (boilerplate out, term-dense sentences in)
+    with span("compress_jd"):
+        prompt_jd = compress_jd(jd_text, all_terms, critical)
+    llm_jd = prompt_jd.text
+    budget = TokenBudget(jd=prompt_jd)
 
     # Skills → tokens → grouped
-    raw_skill_tokens = tokenize_skills(secs.get("skills", []))
-    flat_skills, grouped_skills = categorize_skills(raw_skill_tokens, all_terms)
+    flat_skills, grouped_skills = categorize_skills(list(parsed["skill_tokens"]), all_terms)
+
+    # Experience / Projects (copied: the rewrite below replaces bullets in place)
+    exp_entries = _copy_entries(parsed["experience_entries"])
+    proj_entries = _copy_entries(parsed["project_entries"])
+    education = list(parsed["education"])
 
-    # Experience / Projects parse
-    exp_entries = parse_entries(secs.get("experience", []))
-    proj_entries = parse_entries(secs.get("projects", []))
+    # LLM rewrite with JD coverage + summary
+    jobs = [("Work Experience", e) for e in exp_entries] + [("Projects", p) for p in proj_entries]
+    workers = LLM_CONCURRENCY if concurrency is None else concurrency
+    repairs = RepairStats()
+    hashes = [entry_hash(section, e) for section, e in jobs]
+    reusable = reuse is not None and reuse.jd_hash == jd_hash(jd_text)
 
-    # LLM rewrite with JD coverage
-    for e in exp_entries:
-        e["bullets"] = llm_rewrite_bullets("Work Experience", e.get("bullets", []), jd_text, all_terms, critical, domain)
-    for p in proj_entries:
-        p["bullets"] = llm_rewrite_bullets("Projects", p.get("bullets", []), jd_text, all_terms, critical, domain)
+    emit("skeleton", {
+        "name": name,
+        "contact": contact,
+        "skills": flat_skills,
+        "skills_grouped": grouped_skills,
+        "experience_entries": [{"header": e["header"], "dates": e["dates"], "bullets": []} for e in exp_entries],
+        "project_entries": [{"header": p["header"], "dates": p["dates"], "bullets": []} for p in proj_entries],
+        "education": education,
+        "total": len(jobs),
+    })
+
+    def target(i: int) -> Tuple[str, int]:
+        return ("experience", i) if i < len(exp_entries) else ("projects", i - len(exp_entries))
+
+    def finished(i: int) -> None:
+        section, idx = target(i)
+        entry = trim_bullets_only([jobs[i][1]], max_bullets=5 if section == "experience" else 3)[0]
+        emit("entry", {"section": section, "index": idx, "entry": entry})
+
+    def tokens(key: str) -> Optional[TokenFn]:
+        if not (stream_tokens and on_event):
+            return None
+        def on_token(piece: str, restart: bool = False) -> None:
+            emit("token", {"target": key, "text": piece, "restart": True} if restart else {"target": key, "text": piece})
+        return on_token
+
+    with activate(budget):
+        pending = list(range(len(jobs)))
+        summary = None
+        if reusable:
+            for i in pending:
+                if hashes[i] in reuse.entries:
+                    jobs[i][1]["bullets"] = list(reuse.entries[hashes[i]])
+                    finished(i)
+            pending = [i for i in pending if hashes[i] not in reuse.entries]
+            summary = reuse.summary
+            if summary is not None:
+                emit("summary", {"summary": [summary]})
+        recomputed = list(pending)
+
+        # batch mode: one structured call; only entries it dropped/garbled are redone below
+        if (mode or TAILOR_MODE) == "batch" and llm_client() and (pending or summary is None):
+            reused_summary = summary is not None
+            # serve what we can from the rewrite cache, batch only the rest
+            if use_cache:
+                misses = []
+                for i in pending:
+                    sec, e = jobs[i]
+                    hit = rewrite_cache.get(_rewrite_key(sec, e.get("bullets", []), llm_jd, all_terms, critical, domain))
+                    if hit:
+                        e["bullets"] = hit
+                        finished(i)
+                    else:
+                        misses.append(i)
+                pending = misses
+                if summary is None:
+                    summary = rewrite_cache.get(_summary_key(llm_jd, all_terms, domain))
+            try:
+                done, batch_summary = llm_rewrite_batch([(jobs[i][0], jobs[i][1].get("bullets", [])) for i in pending],
+                                                        llm_jd, all_terms, critical, domain)
+            except Exception as e:
+                print(f"[LLM BATCH ERROR] {e}")
+                done, batch_summary = {}, None
+            # the same coverage check as per-entry mode, so TAILOR_MODE does not change the result
+            low = [j for j, bullets in done.items() if low_coverage(" ".join(bullets), all_terms, critical)]
+            if COVERAGE_REPAIR:
+                for j in low:
+                    record(repairs, "low_coverage")
+                calls = [(_repair_coverage, (done[j], llm_jd, all_terms, critical, repairs)) for j in low]
+                for k, fixed in run_bounded(calls, max(1, workers)):
+                    done[low[k]] = fixed
+            else:
+                for j in low:
+                    del done[j]   # rewritten again below, one prompt per entry, with its full retry
+            for j, bullets in done.items():
+                sec, e = jobs[pending[j]]
+                rewrite_cache.set(_rewrite_key(sec, e.get("bullets", []), llm_jd, all_terms, critical, domain), bullets)
+                e["bullets"] = bullets
+                finished(pending[j])
+            if summary is None and batch_summary:
+                summary = batch_summary
+                rewrite_cache.set(_summary_key(llm_jd, all_terms, domain), summary)
+            if summary is not None and not reused_summary:
+                emit("summary", {"summary": [summary]})
+            pending = [i for j, i in enumerate(pending) if j not in done]
+
+        need_summary = summary is None
+        if workers <= 1:
+            for i in pending:
+                section, e = jobs[i]
+                e["bullets"] = _safe_rewrite(section, e.get("bullets", []), llm_jd, all_terms, critical, domain,
+                                             use_cache, tokens("%s:%d" % target(i)), repairs)
+                finished(i)
+            if need_summary:
+                summary = llm_summary(llm_jd, all_terms, domain, use_cache, tokens("summary"))
+                emit("summary", {"summary": [summary]})
+        elif pending or need_summary:
+            # shared LLM pool, at most `workers` calls in flight for this request
+            calls = [(_safe_rewrite, (jobs[i][0], jobs[i][1].get("bullets", []), llm_jd, all_terms, critical, domain,
+                                      use_cache, tokens("%s:%d" % target(i)), repairs))
+                     for i in pending]
+            if need_summary:
+                calls.append((llm_summary, (llm_jd, all_terms, domain, use_cache, tokens("summary"))))
+            for k, result in run_bounded(calls, workers):
+                if k < len(pending):
+                    # results are written back by position, so entry order is preserved
+                    jobs[pending[k]][1]["bullets"] = result
+                    finished(pending[k])
+                else:
+                    summary = result
+                    emit("summary", {"summary": [summary]})
 
     # Trim bullets only (keep ALL entries/projects)
     exp_entries = trim_bullets_only(exp_entries, max_bullets=5)
     proj_entries = trim_bullets_only(proj_entries, max_bullets=3)
 
-    # Summary (third-person opener)
-    summary = llm_summary(jd_text, all_terms, domain)
-
-    education = secs.get("education", ["University, Degree — YYYY"])
-
+    meta: Dict[str, Any] = {"coverage_repair": repairs.snapshot(), "tokens": budget.snapshot()}
+    if reuse is not None:
+        meta["incremental"] = {
+            "base_model_id": reuse.model_id,
+            "base_found": True,
+            "jd_changed": not reusable,
+            "recomputed": [{"section": target(i)[0], "index": target(i)[1], "header": jobs[i][1].get("header", "")}
+                           for i in recomputed],
+            "reused": len(jobs) - len(recomputed),
+        }
     return {
         "name": name,
         "contact": contact,
@@ -394,4 +830,5 @@ def build_tailored_model(resume_text: str, jd_skills: List[str], jd_keywords: Li
         "experience_entries": exp_entries,
         "project_entries": proj_entries,
         "education": education,
+        "meta": meta,
     }
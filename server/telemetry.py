@@ -0,0 +1,167 @@
+import os, time, threading, contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ---------------------------------------------------------------------
+# Metrics registry (Prometheus text exposition, no extra dependency)
+# ---------------------------------------------------------------------
+TIMING_HEADER = os.getenv("TIMING_HEADER", "0") == "1"   # add Server-Timing to every response
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _fmt(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+class Counter:
+    def __init__(self, name: str, doc: str):
+        self.name, self.doc = name, doc
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_fmt(k)} {v:g}" for k, v in sorted(self._values.items())]
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, doc: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.doc, self.buckets = name, doc, tuple(buckets)
+        self._values: Dict[Labels, List[float]] = {}   # per-bucket counts..., +Inf count, sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += value
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                for b, n in zip(self.buckets, row):
+                    lines.append(f"{self.name}_bucket{_fmt(key, [('le', f'{b:g}')])} {n:g}")
+                lines.append(f"{self.name}_bucket{_fmt(key, [('le', '+Inf')])} {row[-2]:g}")
+                lines.append(f"{self.name}_count{_fmt(key)} {row[-2]:g}")
+                lines.append(f"{self.name}_sum{_fmt(key)} {row[-1]:.6f}")
+        return lines
+
+REQUEST_SECONDS = Histogram("resume_request_seconds", "HTTP request latency by route")
+REQUESTS = Counter("resume_requests_total", "HTTP requests by route and status code")
+STAGE_SECONDS = Histogram("resume_stage_seconds", "Time spent per pipeline stage")
+LLM_CALLS = Counter("resume_llm_calls_total", "LLM calls by kind and outcome")
+LLM_TOKENS = Counter("resume_llm_tokens_total", "LLM tokens by kind and type (prompt/completion)")
+COVERAGE_REPAIRS = Counter("resume_coverage_repairs_total", "Low-coverage rewrites by how they were handled")
+COALESCED = Counter("resume_singleflight_total", "Tailoring computations by flight and role (leader ran it, follower shared it)")
+
+_METRICS = [REQUEST_SECONDS, REQUESTS, STAGE_SECONDS, LLM_CALLS, LLM_TOKENS, COVERAGE_REPAIRS, COALESCED]
+_GAUGES: List[Tuple[str, str, Callable[[], Dict[Labels, float]]]] = []
+
+def register_gauge(name: str, doc: str, read: Callable[[], Dict[str, float]], label: str = "") -> None:
+    """Sampled at scrape time; `read` returns {label value: number} ("" when unlabelled)."""
+    def sample() -> Dict[Labels, float]:
+        return {((label, k),) if label else (): v for k, v in read().items()}
+    _GAUGES.append((name, doc, sample))
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for m in _METRICS:
+        lines += m.expose()
+    for name, doc, sample in _GAUGES:
+        lines += [f"# HELP {name} {doc}", f"# TYPE {name} gauge"]
+        try:
+            lines += [f"{name}{_fmt(k)} {v:g}" for k, v in sorted(sample().items())]
+        except Exception as e:
+            print(f"[METRICS ERROR] {name}: {e}")
+    return "\n".join(lines) + "\n"
+
+# ---------------------------------------------------------------------
+# Per-request trace: spans + token totals, carried in a contextvar
+# (workers.run_io / run_bounded copy the context into pool threads)
+# ---------------------------------------------------------------------
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.tokens = {"prompt": 0, "completion": 0}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, seconds: float, attrs: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append({"name": name, "ms": round(seconds * 1000, 2), **attrs})
+
+    def add_tokens(self, prompt: int, completion: int) -> None:
+        with self._lock:
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+
+    def totals(self) -> Dict[str, float]:
+        """Summed milliseconds per span name (LLM calls run concurrently, so these can exceed wall time)."""
+        out: Dict[str, float] = {}
+        with self._lock:
+            for s in self.spans:
+                out[s["name"]] = out.get(s["name"], 0.0) + s["ms"]
+        return out
+
+    def server_timing(self) -> str:
+        parts = [f"{name.replace('.', '-')};dur={ms:.1f}" for name, ms in self.totals().items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        parts.append(f'llm-tokens;desc="prompt={self.tokens["prompt"]} completion={self.tokens["completion"]}"')
+        return ", ".join(parts)
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+
+def start_trace() -> Trace:
+    trace = Trace()
+    _trace.set(trace)
+    return trace
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time a stage; the yielded dict can take extra attributes while the span is open."""
+    t0 = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add_span(name, dt, attrs)
+
+def record_llm_call(kind: str, outcome: str, usage: Any = None) -> None:
+    """Count one LLM call; `usage` is the response's usage object (prompt/completion tokens)."""
+    LLM_CALLS.inc(kind=kind, outcome=outcome)
+    if usage is None:
+        return
+    prompt = int(getattr(usage, "prompt_tokens", 0) or 0)
+    completion = int(getattr(usage, "completion_tokens", 0) or 0)
+    LLM_TOKENS.inc(prompt, kind=kind, type="prompt")
+    LLM_TOKENS.inc(completion, kind=kind, type="completion")
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_tokens(prompt, completion)
@@ -0,0 +1,75 @@
+import re
+import heapq
+from collections import Counter
+from typing import List, Pattern
+
+# ---------------------------------------------------------------------
+# Shared tokenization
+# ---------------------------------------------------------------------
+WORD_RX = re.compile(r"(?u)\b\w\w+\b")        # same token pattern CountVectorizer used
+SKILL_RX = re.compile(r"[a-z0-9\+\-/\.#]+")   # keeps c++, c#, ci/cd, node.js intact
+
+# sklearn's ENGLISH_STOP_WORDS, frozen here so term extraction does not need sklearn
+STOP_WORDS = frozenset("""
+a about above across after afterwards again against all almost alone along already also although
+always am among amongst amoungst amount an and another any anyhow anyone anything anyway
+anywhere are around as at back be became because become becomes becoming been before beforehand
+behind being below beside besides between beyond bill both bottom but by call can cannot cant co
+con could couldnt cry de describe detail do done down due during each eg eight either eleven
+else elsewhere empty enough etc even ever every everyone everything everywhere except few
+fifteen fifty fill find fire first five for former formerly forty found four from front full
+further get give go had has hasnt have he hence her here hereafter hereby herein hereupon hers
+herself him himself his how however hundred i ie if in inc indeed interest into is it its itself
+keep last latter latterly least less ltd made many may me meanwhile might mill mine more
+moreover most mostly move much must my myself name namely neither never nevertheless next nine
+no nobody none noone nor not nothing now nowhere of off often on once one only onto or other
+others otherwise our ours ourselves out over own part per perhaps please put rather re same see
+seem seemed seeming seems serious several she should show side since sincere six sixty so some
+somehow someone something sometime sometimes somewhere still such system take ten than that the
+their them themselves then thence there thereafter thereby therefore therein thereupon these
+they thick thin third this those though three through throughout thru thus to together too top
+toward towards twelve twenty two un under until up upon us very via was we well were what
+whatever when whence whenever where whereafter whereas whereby wherein whereupon wherever
+whether which while whither who whoever whole whom whose why will with within without would yet
+you your yours yourself yourselves
+""".split())
+
+def tokenize(text: str, pattern: Pattern = WORD_RX, min_len: int = 2) -> List[str]:
+    """Lowercase + regex tokenization used by both the extractor and tailoring."""
+    return [t for t in pattern.findall((text or "").lower()) if len(t) >= min_len]
+
+# ---------------------------------------------------------------------
+# JD term extraction (unigrams + bigrams, stopwords removed)
+# ---------------------------------------------------------------------
+def count_terms(text: str) -> Counter:
+    """
+    Single pass over the tokens: counts every non-stopword unigram and the bigram
+    it forms with the previous non-stopword (CountVectorizer ngram_range=(1, 2)).
+    """
+    freq: Counter = Counter()
+    prev = None
+    for tok in tokenize(text):
+        if tok in STOP_WORDS:
+            continue
+        freq[tok] += 1
+        if prev is not None:
+            freq[prev + " " + tok] += 1
+        prev = tok
+    return freq
+
+# punctuation between words ends a clause; the "." inside node.js or the "/" in ci/cd do not
+CLAUSE_RX = re.compile(r"[,;:!?()\[\]|•·–—]+|\.(?!\w)|\n")
+
+def count_clause_terms(text: str) -> Counter:
+    """count_terms per clause, so no bigram spans punctuation ("aws, apply" is not a term)."""
+    freq: Counter = Counter()
+    for clause in CLAUSE_RX.split(text or ""):
+        freq.update(count_terms(clause))
+    return freq
+
+def most_frequent(freq: Counter, top_n: int = 100) -> List[str]:
+    """Most frequent terms; ties break alphabetically (the old vectorizer's order)."""
+    return [t for t, _ in heapq.nsmallest(top_n, freq.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+def top_terms(text: str, top_n: int = 100) -> List[str]:
+    return most_frequent(count_terms(text), top_n)
@@ -0,0 +1,25 @@
+import os, sys, tempfile
+
+import pytest
+
+# modules read DATA_DIR (and build their stores) at import: point it at a scratch dir first
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="resume-tailor-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class Clock:
+    """Stands in for a module's `time`: the clock only moves when a test says so."""
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return Clock()
@@ -0,0 +1,74 @@
+import pytest
+
+import cache
+from cache import LRUCache, RewriteCache, SQLiteCache, content_key
+
+@pytest.fixture(autouse=True)
+def frozen(clock, monkeypatch):
+    monkeypatch.setattr(cache, "time", clock)
+
+def test_content_key_is_stable_and_order_sensitive():
+    assert content_key("a", {"x": 1, "y": 2}) == content_key("a", {"y": 2, "x": 1})
+    assert content_key("a", "b") != content_key("b", "a")
+
+def test_lru_evicts_by_bytes_oldest_first():
+    lru = LRUCache(max_bytes=10)
+    lru.set("a", 1, 4)
+    lru.set("b", 2, 4)
+    lru.get("a")               # a is now the most recent
+    lru.set("c", 3, 4)
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == (1, None, 3)
+    assert lru.nbytes == 8
+    lru.set("huge", 4, 11)     # larger than the whole cache: not stored
+    assert lru.get("huge") is None and len(lru) == 2
+
+def test_lru_ttl(clock):
+    lru = LRUCache(max_bytes=100, ttl=0.05)
+    lru.set("a", 1, 1)
+    lru.set("b", 2, 1, ttl=0)  # 0 = never expires
+    clock.sleep(0.06)
+    assert lru.get("a") is None and lru.get("b") == 2
+    assert lru.nbytes == 1
+
+def test_sqlite_tier_expiry_and_sweep(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(cache, "PURGE_EVERY", 3)
+    disk = SQLiteCache(str(tmp_path / "c.sqlite3"), ttl=0.05)
+    disk.set("old", "1")
+    disk.set("kept", "2", ttl=0)
+    assert disk.lookup("old")[0] == "1" and disk.lookup("kept") == ("2", 0)
+    clock.sleep(0.06)
+    assert disk.get("old") is None and disk.get("kept") == "2"
+    disk.set("new", "3")       # third write: expired rows are swept
+    with disk._conn() as db:
+        assert sorted(k for k, in db.execute("SELECT key FROM cache")) == ["kept", "new"]
+
+def test_rewrite_cache_tiers(tmp_path):
+    path = str(tmp_path / "r.sqlite3")
+    writer = RewriteCache(1 << 20, path, ttl=60)
+    writer.set("k", ["one", "two"])
+    reader = RewriteCache(1 << 20, path, ttl=60)   # another worker process
+    assert reader.get("k") == ["one", "two"]
+    assert reader.get("k") == ["one", "two"]
+    assert reader.get("missing") is None
+    snap = reader.snapshot()
+    assert (snap["disk_hits"], snap["memory_hits"], snap["misses"], snap["memory_entries"]) == (1, 1, 1, 1)
+    assert RewriteCache(1 << 20, path, ttl=60, enabled=False).get("k") is None
+
+def test_promoted_entries_keep_the_disk_expiry(tmp_path, clock):
+    path = str(tmp_path / "r.sqlite3")
+    RewriteCache(1 << 20, path, ttl=0.3).set("k", "summary")
+    clock.sleep(0.2)
+    reader = RewriteCache(1 << 20, path, ttl=0.3)
+    assert reader.get("k") == "summary"        # promoted to memory with ~0.1 s left
+    clock.sleep(0.15)
+    assert reader.get("k") is None
+    assert reader.purge_expired() == 1
+
+def test_callers_get_copies(tmp_path):
+    rc = RewriteCache(1 << 20, str(tmp_path / "r.sqlite3"), ttl=60)
+    bullets = ["a", "b"]
+    rc.set("k", bullets)
+    bullets.append("c")
+    hit = rc.get("k")
+    hit[0] = "edited"
+    assert rc.get("k") == ["a", "b"]
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+import jobs
+from jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue, JobStore
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+def submit(store, name="jd.txt", options=None):
+    return store.create("tailor", name, b"jd text", "resume.pdf", b"%PDF-1.4", options)
+
+def test_create_starts_queued(store):
+    job = submit(store)
+    assert job["status"] == QUEUED and job["kind"] == "tailor"
+    assert store.count_queued() == 1
+    assert store.get("no-such-job") is None
+
+def test_claim_takes_the_oldest_job_once(store):
+    first = submit(store, "a.txt", {"bullets": 3})
+    second = submit(store, "b.txt")
+    claimed = store.claim()
+    assert claimed["id"] == first["id"]
+    assert claimed["options"] == {"bullets": 3}
+    assert claimed["jd_data"] == b"jd text" and claimed["resume_name"] == "resume.pdf"
+    assert store.get(first["id"])["status"] == RUNNING
+    assert store.claim()["id"] == second["id"]
+    assert store.claim() is None
+
+def test_claim_is_atomic_across_stores(store):
+    other = JobStore(store.path)   # a second server process on the same file
+    ids = {submit(store)["id"] for _ in range(4)}
+    claimed = [store.claim(), other.claim(), other.claim(), store.claim(), other.claim()]
+    assert claimed[-1] is None
+    assert {c["id"] for c in claimed[:-1]} == ids
+
+def test_requeue_running_resets_interrupted_jobs(store):
+    job = submit(store)
+    submit(store)
+    store.claim()
+    assert store.progress(job["id"], stage="tailoring", done=2, total=5)
+    assert store.requeue_running() == 1
+    again = store.get(job["id"])
+    assert (again["status"], again["stage"], again["done"]) == (QUEUED, "", 0)
+    assert store.claim()["id"] == job["id"]   # keeps its place in line
+    assert store.requeue_running() == 1
+
+def test_finish_drops_inputs_and_keeps_the_result(store):
+    job = submit(store)
+    store.claim()
+    store.finish(job["id"], DONE, model={"summary": ["ok"]}, pdf=b"%PDF-")
+    assert store.get(job["id"])["status"] == DONE
+    assert store.result(job["id"]) == {"model": {"summary": ["ok"]}, "pdf": b"%PDF-"}
+    with store._conn() as db:
+        assert db.execute("SELECT jd_data, resume_data FROM jobs").fetchone() == (None, None)
+    store.finish(job["id"], FAILED, error="late")   # finished jobs stay as they are
+    assert store.get(job["id"])["status"] == DONE
+    assert store.requeue_running() == 0
+
+def test_cancel_stops_progress(store):
+    job = submit(store)
+    store.claim()
+    assert store.cancel(job["id"])
+    assert not store.progress(job["id"], done=1)
+    assert store.get(job["id"])["status"] == CANCELLED
+    assert store.result(job["id"]) is None
+    assert not store.cancel(job["id"])
+
+def test_finished_jobs_expire(store, monkeypatch, clock):
+    monkeypatch.setattr(jobs, "time", clock)
+    monkeypatch.setattr(jobs, "JOB_TTL", 60)
+    job = submit(store)
+    store.claim()
+    store.finish(job["id"], FAILED, error="boom")
+    clock.sleep(59)
+    assert store.get(job["id"])["error"] == "boom"
+    assert store.purge_expired() == 0
+    clock.sleep(2)
+    assert store.get(job["id"]) is None
+    assert store.purge_expired() == 1
+    assert store.counts() == {}
+
+def test_cancel_loses_to_a_job_that_already_finished(store):
+    job = submit(store)
+    store.claim()
+    assert store.finish(job["id"], DONE, model={})
+    assert not store.finish(job["id"], CANCELLED)
+    assert store.get(job["id"])["status"] == DONE
+
+# ---------------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------------
+def test_queue_runs_jobs_and_requeues_interrupted_ones(store):
+    stale = submit(store, "stale.txt")
+    store.claim()                                   # "running" when the last process stopped
+    fresh = submit(store, "fresh.txt")
+    seen = []
+
+    async def runner(job, progress):
+        seen.append(job["jd_name"])
+        await asyncio.to_thread(progress, stage="tailoring", done=1, total=1)
+        return {"name": job["jd_name"]}, None
+
+    async def main():
+        queue = JobQueue(store, workers=1)
+        await queue.start(runner)
+        for _ in range(200):
+            if store.counts().get(DONE) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert sorted(seen) == ["fresh.txt", "stale.txt"]
+    assert store.result(stale["id"])["model"] == {"name": "stale.txt"}
+    assert store.get(fresh["id"])["done"] == 1
+
+def test_queue_cancel_stops_a_running_job(store):
+    job = submit(store)
+
+    async def runner(job, progress):
+        await asyncio.sleep(30)
+
+    async def main():
+        queue = JobQueue(store, workers=1)
+        await queue.start(runner)
+        for _ in range(200):
+            if job["id"] in queue._running:
+                break
+            await asyncio.sleep(0.01)
+        assert await queue.cancel(job["id"])
+        assert not await queue.cancel(job["id"])
+        await queue.stop()
+
+    asyncio.run(main())
+    assert store.get(job["id"])["status"] == CANCELLED
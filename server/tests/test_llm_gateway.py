@@ -0,0 +1,240 @@
+import httpx
+import openai
+import pytest
+
+import llm_gateway
+from llm_gateway import AdaptiveLimiter, CircuitBreaker, LLMGateway, LLMUnavailable, TokenBucket
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(llm_gateway, "time", clock)
+    return clock
+
+def api_error(cls, status: int, headers=None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "http://llm.test/v1/chat/completions"))
+    return cls("injected", response=response, body=None)
+
+# ---------------------------------------------------------------------
+# Token bucket
+# ---------------------------------------------------------------------
+def test_bucket_bursts_to_capacity_then_refills(clock):
+    bucket = TokenBucket(60, capacity=3)   # one unit per second
+    assert all(bucket.acquire(1, 0) for _ in range(3))
+    assert not bucket.acquire(1, 0)
+    clock.now += 2
+    assert bucket.acquire(2, 0)
+    assert not bucket.acquire(1, 0)
+
+def test_bucket_oversized_request_and_give_back(clock):
+    bucket = TokenBucket(600, capacity=100)
+    assert bucket.acquire(500, 0)          # capped at capacity: goes through alone
+    assert bucket.level == 0
+    bucket.give_back(40)
+    bucket.give_back(-5)
+    assert bucket.level == 40
+    bucket.give_back(1000)
+    assert bucket.level == 100
+
+# ---------------------------------------------------------------------
+# AIMD limiter
+# ---------------------------------------------------------------------
+def test_limiter_halves_on_throttle_down_to_floor():
+    lim = AdaptiveLimiter(ceiling=16, floor=3)
+    assert lim.limit == 16
+    lim.on_throttle()
+    assert lim.limit == 8
+    for _ in range(5):
+        lim.on_throttle()
+    assert lim.limit == 3
+
+def test_limiter_grows_additively_up_to_ceiling():
+    lim = AdaptiveLimiter(ceiling=4, floor=1)
+    lim.on_throttle()
+    lim.on_throttle()
+    assert lim.limit == 1
+    lim.on_success()
+    assert lim.limit == 2
+    lim.on_success()           # +1/limit per success: a window's worth of successes adds one
+    lim.on_success()
+    assert lim.limit == pytest.approx(2.5 + 1 / 2.5)
+    for _ in range(20):
+        lim.on_success()
+    assert lim.limit == 4
+
+def test_limiter_admits_up_to_the_current_limit():
+    lim = AdaptiveLimiter(ceiling=2, floor=1)
+    assert lim.acquire(0) and lim.acquire(0)
+    assert not lim.acquire(0)
+    lim.release()
+    assert lim.acquire(0)
+    lim.on_throttle()          # limit 1 with 2 in flight: nobody else gets in
+    lim.release()
+    assert not lim.acquire(0)
+    lim.release()
+    assert lim.acquire(0)
+
+# ---------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------
+def test_breaker_opens_after_consecutive_failures(clock):
+    br = CircuitBreaker(failures=3, cooldown=30)
+    br.failure()
+    br.failure()
+    br.success()               # a success resets the streak
+    br.failure()
+    br.failure()
+    assert br.state == "closed" and br.allow()
+    br.failure()
+    assert br.state == "open"
+    assert not br.allow()
+
+def test_breaker_half_open_lets_exactly_one_probe(clock):
+    br = CircuitBreaker(failures=1, cooldown=30)
+    br.failure()
+    clock.now += 29
+    assert not br.allow()
+    clock.now += 1
+    assert br.state == "half_open"
+    assert br.allow()
+    assert not br.allow()      # the probe is in flight
+    br.success()
+    assert br.state == "closed" and br.allow() and br.allow()
+
+def test_breaker_failed_probe_reopens_for_a_full_cooldown(clock):
+    br = CircuitBreaker(failures=5, cooldown=30)
+    for _ in range(5):
+        br.failure()
+    clock.now += 30
+    assert br.allow()
+    br.failure()
+    assert br.state == "open"
+    clock.now += 29
+    assert not br.allow()
+    clock.now += 1
+    assert br.allow()
+
+def test_breaker_abandoned_probe_can_be_retried(clock):
+    br = CircuitBreaker(failures=1, cooldown=10)
+    br.failure()
+    clock.now += 10
+    assert br.allow()
+    br.abandon_probe()
+    assert br.allow()
+
+# ---------------------------------------------------------------------
+# Gateway: classification, retries, breaker and limiter wiring
+# ---------------------------------------------------------------------
+@pytest.fixture
+def gateway(clock, monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(llm_gateway, "LLM_RPM", 0)
+    monkeypatch.setattr(llm_gateway, "LLM_TPM", 0)
+    monkeypatch.setattr(llm_gateway, "LLM_MAX_INFLIGHT", 8)
+    monkeypatch.setattr(llm_gateway, "BREAKER_FAILURES", 3)
+    return LLMGateway()
+
+def failing(*errors, result="ok"):
+    queue = list(errors)
+    def fn():
+        if queue:
+            raise queue.pop(0)
+        return result
+    return fn
+
+def test_gateway_retries_throttles_and_shrinks_the_limit(gateway):
+    fn = failing(api_error(openai.RateLimitError, 429, {"retry-after": "2"}))
+    assert gateway.call(fn) == "ok"
+    assert gateway.stats["throttled"] == 1 and gateway.stats["retries"] == 1
+    assert gateway.concurrency.limit == pytest.approx(4 + 1 / 4)
+    assert gateway.concurrency.inflight == 0
+    assert gateway.breaker.failures == 0
+
+def test_gateway_fatal_errors_are_not_retried(gateway):
+    with pytest.raises(openai.BadRequestError):
+        gateway.call(failing(api_error(openai.BadRequestError, 400)))
+    assert gateway.stats["calls"] == 1 and gateway.stats["retries"] == 0
+    assert gateway.breaker.state == "closed"
+
+def test_gateway_opens_the_breaker_on_upstream_errors(gateway):
+    errors = [api_error(openai.InternalServerError, 500) for _ in range(3)]
+    with pytest.raises(LLMUnavailable):
+        gateway.call(failing(*errors))
+    assert gateway.stats["upstream_errors"] == 3
+    assert gateway.snapshot()["breaker"] == "open"
+    with pytest.raises(LLMUnavailable):
+        gateway.call(failing())
+    assert gateway.stats["rejected"] == 1
+    assert gateway.concurrency.inflight == 0
+
+def test_gateway_raises_the_last_error_when_retries_run_out(gateway):
+    errors = [api_error(openai.RateLimitError, 429) for _ in range(3)]
+    with pytest.raises(openai.RateLimitError):
+        gateway.call(failing(*errors))
+    assert gateway.stats["calls"] == 3 and gateway.stats["retries"] == 2
+
+# ---------------------------------------------------------------------
+# Streamed completions: the stream is read inside the gateway call
+# ---------------------------------------------------------------------
+class Chunk:
+    def __init__(self, text=None, usage=None):
+        self.choices = [type("Choice", (), {"delta": type("Delta", (), {"content": text})()})()] if text else []
+        self.usage = usage
+
+class Stream:
+    def __init__(self, pieces, fail_after=None, on_chunk=None):
+        self.pieces, self.fail_after, self.on_chunk = pieces, fail_after, on_chunk
+        self.closed = False
+
+    def __iter__(self):
+        for i, piece in enumerate(self.pieces):
+            if i == self.fail_after:
+                raise httpx.RemoteProtocolError("peer closed connection without sending complete message body")
+            if self.on_chunk:
+                self.on_chunk()
+            yield Chunk(piece)
+
+    def close(self):
+        self.closed = True
+
+class FakeClient:
+    def __init__(self, *streams):
+        self.streams = list(streams)
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] and kwargs["stream_options"] == {"include_usage": True}
+        return self.streams.pop(0)
+
+@pytest.fixture
+def chat(gateway, monkeypatch):
+    import tailoring
+    monkeypatch.setattr(tailoring, "gateway", gateway)
+    def run(client, **kwargs):
+        monkeypatch.setattr(tailoring, "client", client)
+        return tailoring._chat("prompt", 0.2, 50, **kwargs)
+    return run
+
+def test_stream_holds_the_concurrency_slot_until_read(chat, gateway):
+    seen = []
+    stream = Stream(["Built ", "APIs"], on_chunk=lambda: seen.append(gateway.concurrency.inflight))
+    assert chat(FakeClient(stream), on_token=lambda *a, **k: None) == "Built APIs"
+    assert seen == [1, 1]
+    assert gateway.concurrency.inflight == 0 and stream.closed
+
+def test_broken_stream_is_retried_and_the_draft_restarts(chat, gateway):
+    events = []
+    broken = Stream(["Built ", "REST ", "APIs"], fail_after=2)
+    text = chat(FakeClient(broken, Stream(["Shipped ", "APIs"])),
+                on_token=lambda piece, restart=False: events.append((piece, restart)))
+    assert text == "Shipped APIs"
+    assert events == [("Built ", False), ("REST ", False), ("", True), ("Shipped ", False), ("APIs", False)]
+    assert broken.closed
+    assert gateway.stats["upstream_errors"] == 1 and gateway.stats["retries"] == 1
+    assert gateway.breaker.failures == 0 and gateway.concurrency.inflight == 0
+
+def test_streams_that_keep_failing_open_the_breaker(chat, gateway):
+    streams = [Stream(["x"], fail_after=0) for _ in range(3)]
+    with pytest.raises(LLMUnavailable):
+        chat(FakeClient(*streams), on_token=lambda *a, **k: None)
+    assert gateway.breaker.state == "open" and gateway.concurrency.inflight == 0
@@ -0,0 +1,36 @@
+from matcher import TermMatcher, coverage, matcher_for
+
+def test_whole_words_only_with_plurals_folded():
+    m = TermMatcher(["api", "system"])
+    assert m.find_all("Rapid APIs for the systems team") == {"api": [6], "system": [19]}
+    assert m.matched("rapid prototyping") == []
+
+def test_overlapping_terms_are_all_reported():
+    m = TermMatcher(["design", "design patterns", "patterns"])
+    assert m.find_all("Design patterns, design") == {"design": [0, 17], "design patterns": [0], "patterns": [7]}
+
+def test_symbols_and_dotted_names_stay_intact():
+    m = TermMatcher(["c++", "c#", "node.js", "ci/cd"])
+    assert m.matched("C++ and C# services, Node.js, CI/CD") == ["c++", "c#", "node.js", "ci/cd"]
+    assert m.matched("c and node") == []
+
+def test_substring_mode():
+    m = TermMatcher(["api"], word_boundary=False)
+    assert m.find_all("rapid API") == {"api": [1, 6]}
+
+def test_terms_are_normalized_and_unmatchable_ones_kept_apart():
+    m = TermMatcher([" Python ", "python", "", "—", "&", "go"])
+    assert m.terms == ["python", "—", "&", "go"]
+    assert m.matchable == ["python", "go"]
+    assert not m.contains_any("— & —")
+
+def test_matcher_for_is_shared_per_term_list():
+    assert matcher_for(["aws", "gcp"]) is matcher_for(("aws", "gcp"))
+    assert matcher_for(["aws", "gcp"]) is not matcher_for(["aws", "gcp"], word_boundary=False)
+
+def test_coverage_ignores_terms_that_can_never_match():
+    cov = coverage("Python services on AWS", ["python", "aws", "kafka", "—"])
+    assert cov.matched == ["python", "aws"]
+    assert cov.missing == ["kafka"]
+    assert cov.ratio == 2 / 3
+    assert coverage("anything", ["—", "&"]) == (1.0, [], [])
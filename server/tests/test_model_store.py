@@ -0,0 +1,98 @@
+import json, zlib
+
+import pytest
+
+import model_store
+from model_store import MAGIC, ModelStore, apply_edits, pack_model, unpack_model
+from tailoring import entry_hash, jd_hash
+
+PARSED = {
+    "experience_entries": [
+        {"header": "Acme — Engineer", "dates": "2020–2023", "bullets": ["Built APIs", "Ran on-call"]},
+        {"header": "Initech — Intern", "dates": "2019", "bullets": ["Wrote tests"]},
+    ],
+    "project_entries": [{"header": "Side project", "dates": "", "bullets": ["Made a CLI"]}],
+}
+MODEL = {
+    "name": "Ana Lima", "summary": ["Backend engineer — Python, AWS."], "skills": ["python", "aws"],
+    "experience_entries": [
+        {"header": "Acme — Engineer", "dates": "2020–2023", "bullets": ["Built REST APIs in Python", "Ran on-call on AWS"]},
+        {"header": "Initech — Intern", "dates": "2019", "bullets": ["Wrote tests"]},   # rewrite failed: kept as is
+    ],
+    "project_entries": [{"header": "Side project", "dates": "", "bullets": ["Made a Python CLI"]}],
+}
+
+@pytest.fixture
+def store(tmp_path):
+    return ModelStore(str(tmp_path / "models.sqlite3"))
+
+# ---------------------------------------------------------------------
+# Serialization
+# ---------------------------------------------------------------------
+def test_pack_round_trip():
+    blob = pack_model(MODEL)
+    assert blob[:len(MAGIC) + 1] == MAGIC + b"\x01"
+    assert unpack_model(blob) == MODEL
+    assert len(blob) < len(json.dumps(MODEL))
+
+def test_legacy_json_rows_still_load():
+    assert unpack_model(json.dumps(MODEL, ensure_ascii=False)) == MODEL
+
+def test_unknown_formats_read_as_missing():
+    body = zlib.compress(json.dumps(MODEL).encode())
+    assert unpack_model(MAGIC + b"\x09" + body) is None   # written by a newer build
+    assert unpack_model(b"XYZ\x01" + body) is None
+    assert unpack_model(MAGIC) is None
+    assert unpack_model(b"") is None
+
+# ---------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------
+def test_save_and_get(store):
+    model_id = store.save(MODEL, PARSED, "Senior Python engineer")
+    got = store.get(model_id)
+    assert got.pop("model_id") == model_id
+    assert got == MODEL
+    assert store.get("missing") is None
+
+def test_reuse_keeps_only_real_rewrites(store):
+    jd = "Senior Python engineer"
+    reuse = store.reuse(store.save(MODEL, PARSED, jd))
+    assert reuse.jd_hash == jd_hash("  Senior   Python engineer ")
+    assert reuse.summary == MODEL["summary"][0]
+    assert reuse.entries == {
+        entry_hash("Work Experience", PARSED["experience_entries"][0]): MODEL["experience_entries"][0]["bullets"],
+        entry_hash("Projects", PARSED["project_entries"][0]): MODEL["project_entries"][0]["bullets"],
+    }
+    assert store.reuse("missing") is None
+
+def test_rows_stored_as_json_text_are_served(store):
+    model_id = store.save(MODEL, PARSED, "jd")
+    with store._conn() as db:
+        db.execute("UPDATE models SET model = ? WHERE id = ?", (json.dumps(MODEL), model_id))
+    assert store.get(model_id)["skills"] == ["python", "aws"]
+
+def test_reads_slide_the_expiry(store, monkeypatch, clock):
+    monkeypatch.setattr(model_store, "time", clock)
+    monkeypatch.setattr(model_store, "MODEL_TTL", 100)
+    model_id = store.save(MODEL, PARSED, "jd")
+    clock.sleep(60)
+    assert store.get(model_id) is not None   # pushed out another MODEL_TTL
+    clock.sleep(60)
+    assert store.reuse(model_id) is not None
+    clock.sleep(101)
+    assert store.get(model_id) is None
+    assert store.purge_expired() == 1
+
+# ---------------------------------------------------------------------
+# Edits
+# ---------------------------------------------------------------------
+def test_apply_edits_validates_shapes():
+    edited = apply_edits(MODEL, {"skills": ["go"], "model_id": "x",
+                                 "experience_entries": [{"header": "H", "bullets": ["b"]}]})
+    assert edited["skills"] == ["go"] and MODEL["skills"] == ["python", "aws"]
+    assert edited["experience_entries"] == [{"header": "H", "dates": "", "bullets": ["b"]}]
+    with pytest.raises(ValueError, match="unknown fields: salary"):
+        apply_edits(MODEL, {"salary": 1})
+    with pytest.raises(ValueError, match=r"experience_entries\[0\]\.bullets"):
+        apply_edits(MODEL, {"experience_entries": [{"bullets": "one"}]})
@@ -0,0 +1,63 @@
+import pytest
+
+from ranking import CorpusIndex, jd_query, resume_terms
+
+ALICE = "Backend engineer: Python services on AWS with Kafka; k8s and Terraform. Code review lead."
+BOB = "Frontend developer building React and TypeScript apps with GraphQL."
+CAROL = "Data engineer with Python, Spark and SQL pipelines on GCP."
+JD = "Senior backend engineer. Python, Kafka and Kubernetes on AWS; code review experience."
+
+@pytest.fixture
+def index(tmp_path):
+    return CorpusIndex(str(tmp_path / "rank.sqlite3"))
+
+def test_resume_terms_include_canonical_skills():
+    terms = resume_terms(ALICE)
+    assert {"python", "aws", "kafka", "kubernetes", "code review", "backend engineer"} <= terms
+
+def test_add_skips_unchanged_and_reports_duplicates(index):
+    out = index.add([("a", "alice.pdf", "sha-a", ALICE), ("b", "bob.pdf", "sha-b", BOB), ("a", "alice.pdf", "sha-a", ALICE)])
+    assert out == {"indexed": 2, "unchanged": 0, "duplicates": ["a"]}
+    assert index.add([("a", "alice.pdf", "sha-a", ALICE)]) == {"indexed": 0, "unchanged": 1, "duplicates": []}
+    assert index.stats()["documents"] == 2
+
+def test_rank_orders_by_weighted_share(index):
+    index.add([("a", "alice", "1", ALICE), ("b", "bob", "2", BOB), ("c", "carol", "3", CAROL)])
+    results, info = index.rank(JD, top_k=2)
+    assert info["documents"] == 3
+    assert [r.doc_id for r in results] == ["a", "c"]
+    assert results[0].score > results[1].score > 0
+    assert {"python", "kafka", "kubernetes", "aws"} <= set(results[0].matched)
+    assert set(results[0].matched).isdisjoint(results[0].missing)
+    assert set(results[0].matched) | set(results[0].missing) == set(jd_query(JD))
+
+def test_replace_and_remove(index):
+    index.add([("a", "alice", "1", ALICE), ("b", "bob", "2", BOB)])
+    index.add([("b", "bob", "2b", ALICE)])     # new content under the same id replaces it
+    results, _ = index.rank(JD)
+    assert {r.doc_id for r in results} == {"a", "b"} and results[0].score == results[1].score
+    assert index.remove("a")
+    assert not index.remove("a")
+    results, info = index.rank(JD)
+    assert [r.doc_id for r in results] == ["b"] and info["documents"] == 1
+
+def test_other_processes_pick_up_changes(index):
+    other = CorpusIndex(index.path)
+    index.add([("a", "alice", "1", ALICE)])
+    assert other.stats()["documents"] == 1
+    other.add([("b", "bob", "2", BOB)])
+    other.remove("a")
+    results, _ = index.rank(JD)
+    assert [r.doc_id for r in results] == ["b"]
+
+def test_empty_corpus(index):
+    assert index.rank(JD) == ([], {"documents": 0, "jd_terms": len(jd_query(JD))})
+
+def test_jd_query_leaves_out_boilerplate_and_cross_punctuation_bigrams():
+    jd = ("Backend engineer: Python and Kafka on AWS. Design patterns, code review.\n"
+          "We offer 401k, health, dental and vision insurance. We are an equal opportunity employer.")
+    query = jd_query(jd)
+    assert {"python", "kafka", "aws", "design patterns", "code review"} <= set(query)
+    assert query["code review"] == 2.0 and query["python"] == 1.5
+    for term in ("401k", "dental", "equal opportunity", "opportunity employer", "aws design", "patterns code"):
+        assert term not in query
@@ -0,0 +1,31 @@
+import repair
+from repair import apply_edits, assign_terms, low_coverage, terms_to_add
+
+def test_low_coverage_thresholds():
+    terms = ["python", "aws", "docker", "kafka", "redis", "sql", "go"]
+    assert low_coverage("Python, AWS and Docker", terms, [])
+    assert not low_coverage("Python, AWS, Docker, Kafka, Redis, SQL and Go", terms, ["kafka"])
+    assert low_coverage("Python, AWS, Docker, Kafka, Redis, SQL and Go", terms, ["terraform"])
+
+def test_terms_that_can_never_match_do_not_trigger_repairs():
+    assert not low_coverage("Python on AWS", ["python", "aws", "—", "the and"], ["&"])
+    assert terms_to_add("Python on AWS", ["python", "aws", "—", "of the"], ["&"]) == []
+
+def test_terms_to_add_critical_first_then_just_enough():
+    picked = terms_to_add("Python on AWS", ["python", "aws", "redis", "kafka"], ["kafka"])
+    assert picked == ["kafka", "redis"]
+
+def test_aliases_are_credited():
+    assert terms_to_add("Ran k8s clusters", ["kubernetes"], ["kubernetes"]) == []
+
+def test_assign_terms_follows_jd_context_and_caps_per_bullet(monkeypatch):
+    monkeypatch.setattr(repair, "REPAIR_TERMS_PER_BULLET", 1)
+    # the terms sit further apart than CONTEXT_CHARS, so each brings its own context
+    jd = ("Stream processing with Kafka for event pipelines. " + "Benefits include dental. " * 10
+          + "Caching layers built on Redis for latency.")
+    bullets = ["Reduced API latency with caching layers", "Built event pipelines for billing"]
+    assert assign_terms(bullets, ["kafka", "redis", "terraform"], jd) == {1: ["kafka"], 0: ["redis"]}
+    assert assign_terms([], ["kafka"], jd) == {}
+
+def test_apply_edits_replaces_by_index():
+    assert apply_edits(["a", "b", "c"], {1: "B"}) == ["a", "B", "c"]
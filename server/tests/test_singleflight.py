@@ -0,0 +1,93 @@
+import asyncio
+
+from singleflight import SingleFlight, request_key
+
+class Work:
+    """fn for SingleFlight.do: counts runs and finishes when the test releases it."""
+    def __init__(self, result="model", error=None):
+        self.result, self.error = result, error
+        self.runs = 0
+        self.cancelled = False
+        self.release = None
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+def test_concurrent_calls_share_one_run():
+    async def main():
+        flight, work = SingleFlight("test"), Work()
+        work.release = asyncio.Event()
+        calls = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert len(flight) == 1
+        work.release.set()
+        assert await asyncio.gather(*calls) == ["model"] * 3
+        assert work.runs == 1 and len(flight) == 0
+    asyncio.run(main())
+
+def test_different_keys_and_later_calls_run_again():
+    async def main():
+        flight, work = SingleFlight("test"), Work()
+        work.release = asyncio.Event()
+        work.release.set()
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        await flight.do("a", work)   # the first one finished: not coalesced
+        assert work.runs == 3
+    asyncio.run(main())
+
+def test_every_caller_gets_the_exception():
+    async def main():
+        flight, work = SingleFlight("test"), Work(error=ValueError("bad jd"))
+        work.release = asyncio.Event()
+        calls = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        work.release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        assert [str(r) for r in results] == ["bad jd", "bad jd"]
+        assert work.runs == 1 and len(flight) == 0
+    asyncio.run(main())
+
+def test_a_cancelled_caller_leaves_the_work_to_the_others():
+    async def main():
+        flight, work = SingleFlight("test"), Work()
+        work.release = asyncio.Event()
+        leader = asyncio.create_task(flight.do("k", work))
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()   # the client that started it went away
+        await asyncio.sleep(0)
+        work.release.set()
+        assert await follower == "model"
+        assert leader.cancelled() and not work.cancelled
+    asyncio.run(main())
+
+def test_the_last_caller_leaving_cancels_the_work():
+    async def main():
+        flight, work = SingleFlight("test"), Work()
+        work.release = asyncio.Event()
+        calls = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for c in calls:
+            c.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert work.cancelled and len(flight) == 0
+    asyncio.run(main())
+
+def test_request_key_follows_content_and_options_not_filenames():
+    files = {"jd": ("jd.txt", b"Senior Python engineer"), "resume": ("cv.pdf", b"%PDF-1.4 ...")}
+    key = request_key("preview", files, nocache=False)
+    renamed = {"jd": ("posting.txt", b"Senior Python engineer"), "resume": ("resume.pdf", b"%PDF-1.4 ...")}
+    assert request_key("preview", renamed, nocache=False) == key
+    assert request_key("tailor", files, nocache=False) != key
+    assert request_key("preview", files, nocache=True) != key
+    edited = dict(files, jd=("jd.txt", b"Senior Go engineer"))
+    assert request_key("preview", edited, nocache=False) != key
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import tailoring
+import workers
+from test_tailoring import SAMPLE_JD, SAMPLE_RESUME, Backend
+
+def events(body: str):
+    out = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setattr(workers, "CPU_WORKERS", 0)   # parse in threads, no process pool in tests
+    monkeypatch.setattr(tailoring, "client", Backend(weave=True))
+    client = TestClient(main.app)   # no lifespan: no warm-up or job worker
+    def post(resume=SAMPLE_RESUME, jd=SAMPLE_JD):
+        files = {"jd": ("jd.txt", jd.encode(), "text/plain"), "resume": ("resume.txt", resume.encode(), "text/plain")}
+        r = client.post("/api/preview/stream", params={"nocache": "true"}, files=files)
+        assert r.status_code == 200 and r.headers["content-type"].startswith("text/event-stream")
+        return events(r.text)
+    return post
+
+def test_skeleton_first_then_sections_then_done(stream):
+    got = stream()
+    kinds = [k for k, _ in got]
+    assert kinds[0] == "skeleton" and kinds[-1] == "done"
+    assert set(kinds[1:-1]) == {"entry", "summary"}
+    skeleton, model = got[0][1], got[-1][1]
+    assert all(not e["bullets"] for e in skeleton["experience_entries"])
+    # every entry event matches what the final model holds at that position
+    entries = [p for k, p in got if k == "entry"]
+    sections = {"experience": "experience_entries", "projects": "project_entries"}
+    assert len(entries) == skeleton["total"] == len(model["experience_entries"]) + len(model["project_entries"])
+    for e in entries:
+        assert model[sections[e["section"]]][e["index"]] == e["entry"]
+    assert model["model_id"]
+
+def test_failure_ends_the_stream_with_an_error_event(stream, monkeypatch):
+    def boom(*args, **kwargs):
+        raise RuntimeError("tailoring failed")
+    monkeypatch.setattr(main, "build_tailored_model", boom)
+    assert stream() == [("error", {"detail": "tailoring failed"})]
+    assert workers.gate.snapshot()["active"] == 0   # the slot went back with the stream
+
+def test_empty_upload_is_refused_before_streaming(stream):
+    client = TestClient(main.app)
+    files = {"jd": ("jd.txt", b"", "text/plain"), "resume": ("resume.txt", SAMPLE_RESUME.encode(), "text/plain")}
+    assert client.post("/api/preview/stream", files=files).status_code == 400
+    assert workers.gate.snapshot()["active"] == 0
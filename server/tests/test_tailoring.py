@@ -0,0 +1,64 @@
+import os, re, sys
+
+import pytest
+
+import tailoring
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "loadtest"))
+from fake_llm import reply_text
+from loadgen import SAMPLE_JD, SAMPLE_RESUME
+
+class Reply:
+    def __init__(self, text):
+        self.choices = [type("Choice", (), {"message": type("Message", (), {"content": text})()})()]
+        self.usage = None
+
+class Backend:
+    """fake_llm's replies in-process; rewrites can be told to leave every bullet as it was."""
+    def __init__(self, weave: bool):
+        self.weave = weave
+        self.prompts = []
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, response_format=None, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        if not self.weave and "Edit each resume bullet" not in prompt:
+            prompt = re.sub(r"^Critical keywords to include when relevant: .*$", "", prompt, flags=re.M)
+        return Reply(reply_text(prompt, (response_format or {}).get("type") == "json_object", "normal"))
+
+@pytest.fixture
+def tailor(monkeypatch):
+    monkeypatch.setattr(tailoring, "COVERAGE_REPAIR", True)
+    def run(mode, weave=False):
+        backend = Backend(weave)
+        monkeypatch.setattr(tailoring, "client", backend)
+        model = tailoring.build_tailored_model(SAMPLE_RESUME, [], [], SAMPLE_JD, mode=mode, use_cache=False)
+        return model, backend
+    return run
+
+def _entries(model):
+    return [e["bullets"] for field in ("experience_entries", "project_entries") for e in model[field]]
+
+def test_batch_mode_repairs_low_coverage_like_per_entry_mode(tailor):
+    batch, backend = tailor("batch")
+    assert sum("Edit each resume bullet" in p for p in backend.prompts) == 3
+    assert batch["meta"]["coverage_repair"]["low_coverage"] == 3
+    assert batch["meta"]["coverage_repair"]["repaired_by_llm"] == 3
+    concurrent, _ = tailor("concurrent")
+    assert _entries(batch) == _entries(concurrent)
+    assert batch["meta"]["coverage_repair"] == concurrent["meta"]["coverage_repair"]
+
+def test_batch_results_with_enough_coverage_are_kept(tailor, monkeypatch):
+    monkeypatch.setattr(tailoring, "low_coverage", lambda *a: False)
+    model, backend = tailor("batch")
+    assert not any("Edit each resume bullet" in p for p in backend.prompts)
+    assert model["meta"]["coverage_repair"]["low_coverage"] == 0
+
+def test_batch_without_repair_falls_back_to_per_entry_rewrites(tailor, monkeypatch):
+    monkeypatch.setattr(tailoring, "COVERAGE_REPAIR", False)
+    model, backend = tailor("batch")
+    assert sum("Original bullets:" in p and "Coverage was low" not in p for p in backend.prompts) == 3
+    assert sum("Coverage was low" in p for p in backend.prompts) == 3
+    assert model["meta"]["coverage_repair"]["full_retries"] == 3
@@ -0,0 +1,48 @@
+from collections import Counter
+
+import pytest
+
+from terms import SKILL_RX, count_clause_terms, count_terms, most_frequent, tokenize, top_terms
+
+JD = """
+We're hiring a Senior Software Engineer to design, build and operate scalable backend services.
+You will own distributed systems in Python and Go, run them on AWS with Docker and Kubernetes.
+Requirements: 5+ years of software engineering, design patterns, REST API design, CI/CD pipelines,
+code review and documentation. Nice to have: Kafka, Redis, Terraform.
+"""
+
+def test_tokenize_lowercases_and_drops_short_tokens():
+    assert tokenize("Go to AWS, a C++ shop") == ["go", "to", "aws", "shop"]
+    assert tokenize(None) == []
+
+def test_tokenize_skill_pattern_keeps_symbols():
+    assert tokenize("C++, C#, CI/CD and Node.js", SKILL_RX, min_len=1) == ["c++", "c#", "ci/cd", "and", "node.js"]
+
+def test_count_terms_skips_stop_words_and_bridges_bigrams():
+    freq = count_terms("Design of the systems; design patterns")
+    assert freq == Counter({"design": 2, "systems": 1, "patterns": 1,
+                            "design systems": 1, "systems design": 1, "design patterns": 1})
+
+def test_top_terms_orders_by_count_then_alphabetically():
+    assert top_terms("zeta beta beta alpha", top_n=3) == ["beta", "alpha", "beta alpha"]
+    assert top_terms("") == []
+
+def test_top_terms_matches_count_vectorizer():
+    # term extraction used to be a per-request CountVectorizer; the output must not change
+    text = pytest.importorskip("sklearn.feature_extraction.text")
+    for doc in (JD, JD * 5, "The the THE and of"):
+        vect = text.CountVectorizer(stop_words="english", ngram_range=(1, 2))
+        try:
+            X = vect.fit_transform([doc.lower()])
+        except ValueError:   # only stop words: empty vocabulary
+            assert top_terms(doc) == []
+            continue
+        freq = Counter(dict(zip(vect.get_feature_names_out(), X.toarray()[0].tolist())))
+        assert count_terms(doc) == freq
+        assert top_terms(doc, 100) == [t for t, _ in sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))][:100]
+
+def test_clause_terms_do_not_bridge_punctuation():
+    assert count_clause_terms("AWS, apply today; node.js and ci/cd") == count_terms("AWS") + count_terms("apply today") \
+        + count_terms("node.js and ci/cd")
+    assert "aws apply" not in count_clause_terms("AWS. Apply")
+    assert most_frequent(count_clause_terms("java, java, rust"), 2) == ["java", "rust"]
@@ -0,0 +1,112 @@
+import asyncio, zipfile
+from io import BytesIO
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+
+import uploads
+from parsers import sniff_kind
+from uploads import BodyLimit, check_upload, read_upload, read_uploads
+
+def docx_bytes(body: bytes = b"<w:document/>") -> bytes:
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+        z.writestr("word/document.xml", body)
+    return buf.getvalue()
+
+def upload(data: bytes, name: str = "resume.txt", size="len") -> UploadFile:
+    return UploadFile(BytesIO(data), filename=name, size=len(data) if size == "len" else size)
+
+def status_of(call) -> int:
+    with pytest.raises(HTTPException) as exc:
+        call()
+    return exc.value.status_code
+
+# ---------------------------------------------------------------------
+# Type sniffing: the content decides, never the filename
+# ---------------------------------------------------------------------
+def test_sniff_kind_reads_magic_bytes():
+    assert sniff_kind(b"%PDF-1.7\n...") == "pdf"
+    assert sniff_kind(b"\xef\xbb\xbf%PDF-1.4") == "pdf"   # behind a BOM
+    assert sniff_kind(docx_bytes()) == "docx"
+    assert sniff_kind(b"Jane Doe\nPython, SQL\n") == "txt"
+
+def test_sniff_kind_only_tolerates_a_few_bytes_before_the_pdf_header():
+    # a text file that merely mentions %PDF- further in is still text
+    assert sniff_kind(b"Exported from %PDF-1.4 by a tool") == "txt"
+
+def test_sniff_kind_rejects_other_zips_and_binaries():
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("xl/workbook.xml", "<workbook/>")
+    assert sniff_kind(buf.getvalue()) == "unknown"
+    assert sniff_kind(b"PK\x03\x04 not really a zip") == "unknown"
+    assert sniff_kind(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR") == "unknown"
+
+def test_check_upload_statuses(monkeypatch):
+    assert check_upload("r.pdf", b"%PDF-1.4 ...") == "pdf"
+    assert status_of(lambda: check_upload("r.txt", b"")) == 400
+    assert status_of(lambda: check_upload("r.txt", b"  \n\t ")) == 400
+    assert status_of(lambda: check_upload("r.png", b"\x89PNG\r\n\x1a\n\x00\x00")) == 415
+    monkeypatch.setattr(uploads, "DOCX_MAX_UNZIPPED", 1024)
+    assert check_upload("r.docx", docx_bytes(b"x" * 512)) == "docx"
+    # compresses to a few bytes, expands past the cap
+    assert status_of(lambda: check_upload("r.docx", docx_bytes(b"\0" * 4096))) == 413
+
+# ---------------------------------------------------------------------
+# Bounded reads
+# ---------------------------------------------------------------------
+def test_read_upload_returns_the_bytes_under_the_cap():
+    data = b"a" * (uploads.UPLOAD_CHUNK * 2 + 10)
+    assert asyncio.run(read_upload(upload(data), max_bytes=len(data))) == data
+
+def test_read_upload_refuses_a_declared_size_without_reading():
+    f = upload(b"a" * 100, size=10_000)
+    assert status_of(lambda: asyncio.run(read_upload(f, max_bytes=1000))) == 413
+    assert f.file.tell() == 0
+
+def test_read_upload_stops_at_the_cap_without_a_declared_size():
+    f = upload(b"a" * (uploads.UPLOAD_CHUNK * 4), size=None)
+    assert status_of(lambda: asyncio.run(read_upload(f, max_bytes=uploads.UPLOAD_CHUNK + 1))) == 413
+    assert f.file.tell() == uploads.UPLOAD_CHUNK * 2   # cut off after the chunk that crossed it
+
+def test_read_uploads_checks_every_file_before_returning():
+    files = (upload(b"Jane Doe\nPython\n"), upload(b"\x89PNG\r\n\x1a\n\x00\x00", "photo.png"))
+    assert status_of(lambda: asyncio.run(read_uploads(*files))) == 415
+
+# ---------------------------------------------------------------------
+# Whole-request cap
+# ---------------------------------------------------------------------
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(BodyLimit, max_bytes=1000)
+
+    @app.post("/upload")
+    async def take(resume: UploadFile = File(...)):
+        (data,) = await read_uploads(resume)
+        return {"bytes": len(data)}
+
+    @app.post("/raw")
+    async def raw(request: Request):
+        return {"bytes": len(await request.body())}
+
+    return TestClient(app)
+
+def test_body_limit_passes_small_requests(client):
+    r = client.post("/upload", files={"resume": ("r.txt", b"Jane Doe\nPython\n", "text/plain")})
+    assert r.status_code == 200 and r.json() == {"bytes": 16}
+
+def test_body_limit_refuses_a_large_content_length(client):
+    r = client.post("/upload", files={"resume": ("r.txt", b"a" * 2000, "text/plain")})
+    assert r.status_code == 413 and "larger than" in r.json()["detail"]
+
+def test_body_limit_counts_chunked_bodies(client):
+    def chunks():
+        for _ in range(5):
+            yield b"a" * 400
+    r = client.post("/raw", content=chunks())   # no Content-Length: the stream is counted
+    assert r.status_code == 413
+    assert client.post("/raw", content=iter([b"a" * 400, b"a" * 400])).json() == {"bytes": 800}
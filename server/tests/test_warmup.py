@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+import warmup
+from warmup import Warmup
+
+def flaky(failures: int, calls: list, name: str):
+    async def step():
+        calls.append(name)
+        if calls.count(name) <= failures:
+            raise RuntimeError(f"{name} not available")
+    return step
+
+@pytest.fixture
+def steps(monkeypatch):
+    calls: list = []
+    monkeypatch.setattr(warmup, "WARMUP_RETRIES", 2)
+    async def no_wait(seconds):
+        pass
+    monkeypatch.setattr(warmup.asyncio, "sleep", no_wait)
+    def use(*spec):
+        monkeypatch.setattr(warmup, "STEPS", [(name, flaky(n, calls, name), required) for name, n, required in spec])
+        w = Warmup()
+        asyncio.run(w.run())
+        return w, calls
+    return use
+
+def test_optional_failures_do_not_hold_readiness(steps):
+    w, calls = steps(("skills", 0, True), ("llm_client", 99, False))
+    assert w.ready
+    assert w.steps["llm_client"]["error"] == "llm_client not available"
+    assert w.steps["llm_client"]["required"] is False
+    assert calls.count("llm_client") == 3 and calls.count("skills") == 1
+
+def test_failed_required_steps_are_retried(steps):
+    w, calls = steps(("skills", 0, True), ("parsers", 2, True))
+    assert w.ready
+    assert "error" not in w.steps["parsers"]
+    assert calls.count("parsers") == 3 and calls.count("skills") == 1
+
+def test_required_step_that_never_loads(steps):
+    w, _ = steps(("skills", 99, True), ("ranking", 0, False))
+    assert w.state == "failed" and not w.ready
+    assert w.steps["skills"]["attempts"] == 3
+    assert "error" not in w.steps["ranking"]
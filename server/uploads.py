@@ -0,0 +1,104 @@
+import os, zipfile
+from io import BytesIO
+from typing import Any, List
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from parsers import sniff_kind
+from telemetry import span
+
+# ---------------------------------------------------------------------
+# Upload intake: bounded reads and content checks before any parsing.
+# Starlette spools each multipart file (memory up to 1 MB, then a temp file)
+# while BodyLimit caps the request as it arrives; each file is then read
+# back in chunks and cut off at UPLOAD_MAX_MB.
+# ---------------------------------------------------------------------
+UPLOAD_MAX_MB = float(os.getenv("UPLOAD_MAX_MB", "10"))              # per file
+REQUEST_MAX_MB = float(os.getenv("REQUEST_MAX_MB", "64"))            # whole request body (Content-Length)
+DOCX_MAX_UNZIPPED_MB = float(os.getenv("DOCX_MAX_UNZIPPED_MB", "50"))  # zip-bomb guard for .docx
+UPLOAD_CHUNK = 64 * 1024
+
+UPLOAD_MAX_BYTES = int(UPLOAD_MAX_MB * 1024 * 1024)
+REQUEST_MAX_BYTES = int(REQUEST_MAX_MB * 1024 * 1024)
+DOCX_MAX_UNZIPPED = int(DOCX_MAX_UNZIPPED_MB * 1024 * 1024)
+
+ACCEPTED = ("pdf", "docx", "txt")
+
+# ---------------------------------------------------------------------
+# Whole-request cap on the raw receive stream: covers chunked bodies too,
+# which carry no Content-Length and would otherwise be spooled in full
+# ---------------------------------------------------------------------
+def _body_too_large() -> str:
+    return f"Request body is larger than {REQUEST_MAX_MB:g} MB"
+
+class BodyLimit:
+    """ASGI middleware: 413 once a request body passes max_bytes, declared or not."""
+    def __init__(self, app: Any, max_bytes: int = REQUEST_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            # refused from the header alone, before anything is read
+            return await JSONResponse({"detail": _body_too_large()}, status_code=413)(scope, receive, send)
+        received = 0
+
+        async def limited() -> Any:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # raised inside the form/body read; FastAPI passes HTTPException through as a 413
+                    raise HTTPException(413, _body_too_large())
+            return message
+
+        await self.app(scope, limited, send)
+
+def _too_large(name: str) -> HTTPException:
+    return HTTPException(413, f"{name} is larger than {UPLOAD_MAX_MB:g} MB")
+
+async def read_upload(f: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+    """The upload's bytes; 413 as soon as more than max_bytes have been read."""
+    name = f.filename or "upload"
+    if f.size is not None and f.size > max_bytes:
+        raise _too_large(name)   # known up front: nothing is read
+    chunks: List[bytes] = []
+    total = 0
+    while True:
+        chunk = await f.read(UPLOAD_CHUNK)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large(name)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def check_upload(name: str, data: bytes) -> str:
+    """Sniffed kind of an accepted upload; 400 (empty), 413 (docx expands too far) or 415 otherwise."""
+    if not data or (len(data) < UPLOAD_CHUNK and not data.strip()):
+        raise HTTPException(400, f"{name} is empty")
+    kind = sniff_kind(data)
+    if kind not in ACCEPTED:
+        raise HTTPException(415, f"{name}: unsupported file type (expected PDF, DOCX or plain text)")
+    if kind == "docx":
+        with zipfile.ZipFile(BytesIO(data)) as z:
+            if sum(i.file_size for i in z.infolist()) > DOCX_MAX_UNZIPPED:
+                raise HTTPException(413, f"{name} expands to more than {DOCX_MAX_UNZIPPED_MB:g} MB")
+    return kind
+
+async def read_uploads(*files: UploadFile) -> List[bytes]:
+    """Bounded read + type check of every file, all before the first one is parsed."""
+    with span("upload_read") as attrs:
+        out = []
+        for f in files:
+            data = await read_upload(f)
+            check_upload(f.filename or "upload", data)
+            out.append(data)
+        attrs["bytes"] = sum(len(b) for b in out)
+        return out
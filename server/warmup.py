@@ -0,0 +1,100 @@
+import os, time, asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import skills
+import workers
+from workers import run_io, run_cpu
+
+# ---------------------------------------------------------------------
+# Startup warm-up: the server answers health checks right away and loads
+# the slow modules (OpenAI SDK, ReportLab, python-docx, pdfminer/PyMuPDF,
+# numpy/scipy) in the background; /readyz reports when it is done.
+# ---------------------------------------------------------------------
+WARMUP = os.getenv("WARMUP", "1") == "1"   # 0 = skip; everything then loads on first use
+WARMUP_RETRIES = int(os.getenv("WARMUP_RETRIES", "4"))   # extra attempts for a failed step, backoff 1, 2, 4… s
+
+def _load_llm_client() -> None:
+    from tailoring import llm_client
+    llm_client()
+
+def _load_parsers() -> None:
+    import docx  # noqa: F401
+    from parsers import use_pymupdf
+    if not use_pymupdf():
+        from pdfminer.pdfpage import PDFPage  # noqa: F401
+        from pdfminer.pdfinterp import PDFPageInterpreter  # noqa: F401
+
+def _load_renderer() -> None:
+    from pdf_builder import _styles
+    _styles()
+
+def _load_ranking() -> None:
+    # numpy/scipy, plus the corpus index read into memory
+    from ranking import corpus
+    corpus().refresh()
+
+async def _start_cpu_pool() -> None:
+    # spawn workers import pdf_builder on their first task; do that now, once per worker
+    from pdf_builder import render_pdf
+    await asyncio.gather(*(run_cpu(render_pdf, {"name": "warm-up"}) for _ in range(max(1, workers.CPU_WORKERS))))
+
+def _io(fn: Callable[[], None]) -> Callable[[], Awaitable[Any]]:
+    return lambda: run_io(fn)
+
+# (name, step, required): readiness waits for the required steps only. Without an LLM
+# client tailoring falls back to the local rewrite, and ranking loads on its first query.
+STEPS: List[Tuple[str, Callable[[], Awaitable[Any]], bool]] = [
+    ("skills", _io(skills.load_index), True),
+    ("llm_client", _io(_load_llm_client), False),
+    ("parsers", _io(_load_parsers), True),
+    ("renderer", _io(_load_renderer), True),
+    ("ranking", _io(_load_ranking), False),
+    ("cpu_pool", _start_cpu_pool, True),
+]
+
+class Warmup:
+    def __init__(self):
+        self.state = "pending"   # pending → running → ready | failed (a required step never loaded)
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started = time.monotonic()
+        self.seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def _attempt(self, name: str, step: Callable[[], Awaitable[Any]], required: bool, attempt: int) -> bool:
+        t0 = time.perf_counter()
+        try:
+            await step()
+            self.steps[name] = {"ms": round((time.perf_counter() - t0) * 1000, 1)}
+            return True
+        except Exception as e:
+            print(f"[WARMUP ERROR] {name} (attempt {attempt + 1}): {e}")
+            self.steps[name] = {"ms": round((time.perf_counter() - t0) * 1000, 1), "error": str(e),
+                                "attempts": attempt + 1, "required": required}
+            return False
+
+    async def run(self) -> None:
+        self.state = "running"
+        pending = STEPS
+        for attempt in range(WARMUP_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(min(30.0, 2.0 ** (attempt - 1)))
+            pending = [s for s in pending if not await self._attempt(*s, attempt)]
+            if self.state != "ready" and not any(required for _, _, required in pending):
+                # optional steps still failing keep being retried, but do not hold readiness
+                self.state, self.seconds = "ready", round(time.monotonic() - self.started, 3)
+            if not pending:
+                return
+        if self.state != "ready":
+            self.state, self.seconds = "failed", round(time.monotonic() - self.started, 3)
+
+    def skip(self) -> None:
+        self.state, self.seconds = "ready", 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "seconds": self.seconds, "steps": dict(self.steps),
+                "uptime": round(time.monotonic() - self.started, 3)}
+
+warmup = Warmup()
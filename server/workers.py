@@ -0,0 +1,133 @@
+import os, asyncio, threading, contextvars
+import multiprocessing as mp
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Pool sizes + admission limits (env-configurable)
+# ---------------------------------------------------------------------
+IO_THREADS = int(os.getenv("IO_THREADS", "32"))          # blocking request work (LLM orchestration)
+LLM_THREADS = int(os.getenv("LLM_THREADS", "32"))        # individual LLM calls, shared by all requests
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 = run CPU work in threads
+MAX_ACTIVE = int(os.getenv("MAX_ACTIVE", "16"))          # requests processed at once
+MAX_QUEUE = int(os.getenv("MAX_QUEUE", "32"))            # requests allowed to wait for a slot
+RETRY_AFTER = int(os.getenv("RETRY_AFTER", "5"))         # seconds, sent with 503s
+
+_lock = threading.Lock()
+_io_pool: Optional[ThreadPoolExecutor] = None
+_llm_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[Executor] = None
+
+def io_executor() -> ThreadPoolExecutor:
+    global _io_pool
+    with _lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="io")
+        return _io_pool
+
+def llm_executor() -> ThreadPoolExecutor:
+    global _llm_pool
+    with _lock:
+        if _llm_pool is None:
+            _llm_pool = ThreadPoolExecutor(max_workers=LLM_THREADS, thread_name_prefix="llm")
+        return _llm_pool
+
+def cpu_executor() -> Executor:
+    global _cpu_pool
+    if CPU_WORKERS <= 0:
+        return io_executor()
+    with _lock:
+        if _cpu_pool is None:
+            # spawn: the parent already runs threads, so fork is not safe
+            _cpu_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS, mp_context=mp.get_context("spawn"))
+        return _cpu_pool
+
+async def run_io(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run blocking, mostly-waiting work (LLM round trips) off the event loop."""
+    # carry contextvars (the request trace) into the pool thread
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(io_executor(), partial(ctx.run, fn, *args, **kwargs))
+
+async def run_cpu(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run CPU-bound work (PDF parsing / rendering) in the process pool. fn + args must pickle."""
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor(), partial(fn, *args, **kwargs))
+
+def run_bounded(calls: List[Tuple[Callable, tuple]], limit: int,
+                executor: Optional[Executor] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Submit (fn, args) calls to a shared pool with at most `limit` in flight for this
+    caller, yielding (index, result) in completion order. Exceptions propagate.
+    """
+    executor = executor or llm_executor()
+    pending = iter(enumerate(calls))
+    running = {}
+
+    def submit_next() -> None:
+        nxt = next(pending, None)
+        if nxt is not None:
+            i, (fn, args) = nxt
+            running[executor.submit(contextvars.copy_context().run, fn, *args)] = i
+
+    for _ in range(max(1, limit)):
+        submit_next()
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for fut in done:
+            i = running.pop(fut)
+            submit_next()
+            yield i, fut.result()
+
+def shutdown() -> None:
+    global _io_pool, _llm_pool, _cpu_pool
+    with _lock:
+        for pool in (_io_pool, _llm_pool, _cpu_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _io_pool = _llm_pool = _cpu_pool = None
+
+# ---------------------------------------------------------------------
+# Admission control: bounded active set + bounded wait queue
+# ---------------------------------------------------------------------
+class Overloaded(Exception):
+    """Raised when the admission queue is full; mapped to 503 + Retry-After."""
+    def __init__(self, retry_after: int = RETRY_AFTER):
+        super().__init__("Server is busy, please retry shortly")
+        self.retry_after = retry_after
+
+class AdmissionGate:
+    def __init__(self, max_active: int, max_queue: int):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> None:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_active)
+        if self._sem.locked() and self.waiting >= self.max_queue:
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._sem.release()
+
+    async def __aenter__(self) -> "AdmissionGate":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
+
+    def snapshot(self) -> dict:
+        return {"active": self.active, "waiting": self.waiting,
+                "max_active": self.max_active, "max_queue": self.max_queue}
+
+gate = AdmissionGate(MAX_ACTIVE, MAX_QUEUE)